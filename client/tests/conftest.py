@@ -11,6 +11,25 @@ from temp_utils.contextmanagers import temp_dir, temp_file
 from tigerhost import settings
 
 
+def pytest_addoption(parser):
+    parser.addoption('--benchmark', action='store_true',
+                     help='Also check the wall-clock time budgets of the benchmarks.')
+
+
+@pytest.fixture(scope='function')
+def check_time(request):
+    """Check a wall-clock time budget, only with ``--benchmark``.
+    Timings depend on the machine, so by default only the behavior
+    of the benchmarks is tested.
+    """
+    enabled = request.config.getoption('--benchmark')
+
+    def check(seconds, budget):
+        if enabled:
+            assert seconds < budget, '{:.6f} seconds, the budget is {}'.format(seconds, budget)
+    return check
+
+
 @pytest.yield_fixture(scope='function')
 def runner():
     runner = CliRunner()
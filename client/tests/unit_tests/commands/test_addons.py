@@ -1,3 +1,6 @@
+import itertools
+import mock
+
 from tigerhost.entry import entry
 
 
@@ -57,6 +60,22 @@ def test_create_addons_with_config_customization(runner, saved_user, fake_api_cl
         'app', 'postgres', config_customization='TEST')
 
 
+def test_clone_addons(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    fake_api_client.clone_application_addon.return_value = {
+        'message': 'test message', 'addon': {'display_name': 'sad-bunny-12d'}}
+    result = runner.invoke(
+        entry, ['addons:clone', '--app', 'app', 'fun-monkey-12d', '--to-app', 'staging'])
+    assert result.exit_code == 0
+    assert 'test message' in result.output
+    assert 'sad-bunny-12d' in result.output
+    fake_api_client.clone_application_addon.assert_called_once_with(
+        'app', 'fun-monkey-12d', target_app_id='staging', config_customization=None)
+
+
 def test_wait_addons(runner, saved_user, fake_api_client):
     """
     @type runner: click.testing.CliRunner
@@ -88,6 +107,80 @@ def test_wait_addons(runner, saved_user, fake_api_client):
     assert 'ready' in result.output
 
 
+def test_wait_addons_backoff(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    fake_api_client.get_application_addon.side_effect = [
+        {'state': 'waiting_for_provision'},
+    ] * 5 + [
+        {'state': 'ready'},
+    ]
+    with mock.patch('tigerhost.commands.addons.time') as mock_time:
+        # the server answers right away, like a server that can't wait
+        mock_time.time.return_value = 0
+        result = runner.invoke(
+            entry, ['addons:wait', 'fun-monkey-12d', '--app', 'app', '--interval', '3'])
+    assert result.exit_code == 0
+    fake_api_client.get_application_addon.assert_called_with(
+        'app', 'fun-monkey-12d', wait_for='ready', timeout=25)
+    assert [c[0][0] for c in mock_time.sleep.call_args_list] == [1, 2, 3, 3]
+
+
+def test_wait_addons_long_poll(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    fake_api_client.get_application_addon.side_effect = [
+        {'state': 'waiting_for_provision'},
+        {'state': 'provisioned'},
+        {'state': 'ready'},
+    ]
+    with mock.patch('tigerhost.commands.addons.time') as mock_time:
+        result = runner.invoke(
+            entry, ['addons:wait', 'fun-monkey-12d', '--app', 'app'])
+    assert result.exit_code == 0
+    assert mock_time.sleep.call_count == 0
+
+
+def test_wait_addons_long_poll_timeout(runner, saved_user, fake_api_client):
+    """When the server waited without a change, ask again right away.
+
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    fake_api_client.get_application_addon.side_effect = [
+        {'state': 'waiting_for_provision'},
+    ] * 3 + [
+        {'state': 'ready'},
+    ]
+    with mock.patch('tigerhost.commands.addons.time') as mock_time:
+        # each request takes the whole timeout
+        mock_time.time.side_effect = itertools.count(0, 25)
+        result = runner.invoke(
+            entry, ['addons:wait', 'fun-monkey-12d', '--app', 'app'])
+    assert result.exit_code == 0
+    assert fake_api_client.get_application_addon.call_count == 4
+    assert mock_time.sleep.call_count == 0
+
+
+def test_wait_addons_error(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    fake_api_client.get_application_addon.side_effect = [
+        {'state': 'waiting_for_provision'},
+        {'state': 'error'},
+    ]
+    result = runner.invoke(
+        entry, ['addons:wait', 'fun-monkey-12d', '--app', 'app', '--interval', '0'])
+    assert result.exit_code == 2
+    assert 'error' in result.output
+
+
 def test_delete_addons(runner, saved_user, fake_api_client):
     """
     @type runner: click.testing.CliRunner
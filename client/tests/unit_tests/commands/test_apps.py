@@ -1,3 +1,5 @@
+import pytest
+
 from tigerhost.api_client import ApiClientResponseError
 from tigerhost.entry import entry
 from tigerhost.vcs.git import GitVcs
@@ -123,3 +125,35 @@ def test_transfer_app(runner, saved_user, fake_api_client):
     assert result.exit_code == 0
     # did not call set_application_owner again
     assert fake_api_client.set_application_owner.call_count == 1
+
+
+def test_list_apps_cached(runner, saved_user, fake_api_client):
+    fake_api_client.get_all_applications.return_value = {
+        'backend1': ['app1']
+    }
+    for _ in range(2):
+        result = runner.invoke(entry, ['apps'])
+        assert result.exit_code == 0
+        assert 'app1' in result.output
+    fake_api_client.get_all_applications.assert_called_once_with()
+
+    result = runner.invoke(entry, ['--refresh', 'apps'])
+    assert result.exit_code == 0
+    result = runner.invoke(entry, ['--no-cache', 'apps'])
+    assert result.exit_code == 0
+    assert fake_api_client.get_all_applications.call_count == 3
+
+
+@pytest.mark.parametrize('args', [
+    ['create', 'app1'],
+    ['apps:destroy', '--app', 'app1'],
+    ['apps:transfer', '--app', 'app1', 'other'],
+])
+def test_changes_invalidate_apps(args, runner, saved_user, fake_api_client):
+    fake_api_client.get_all_applications.return_value = {}
+    fake_api_client.get_application_addons.return_value = []
+    runner.invoke(entry, ['apps'])
+    result = runner.invoke(entry, args, input='y')
+    assert result.exit_code == 0
+    runner.invoke(entry, ['apps'])
+    assert fake_api_client.get_all_applications.call_count == 2
@@ -0,0 +1,80 @@
+import json
+import mock
+
+from tigerhost.entry import entry
+
+
+def test_bulk(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    operations = [
+        {'app': 'app1', 'operation': 'config'},
+        {'app': 'app2', 'operation': 'config'},
+    ]
+    fake_api_client.bulk.return_value = iter([
+        {'index': 1, 'app': 'app2', 'operation': 'config', 'status': 200, 'result': {'VAR': 'value'}},
+        {'index': 0, 'app': 'app1', 'operation': 'config', 'status': 200, 'result': {}},
+    ])
+    with open('operations.json', 'w') as f:
+        json.dump(operations, f)
+    result = runner.invoke(entry, ['bulk', 'operations.json'])
+    assert result.exit_code == 0
+    assert 'app2 config: {"VAR": "value"}' in result.output
+    assert 'app1 config: {}' in result.output
+    fake_api_client.bulk.assert_called_once_with(operations)
+
+
+def test_bulk_stdin(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    operations = [{'app': 'app1', 'operation': 'domains'}]
+    fake_api_client.bulk.return_value = iter([
+        {'index': 0, 'app': 'app1', 'operation': 'domains', 'status': 403, 'error': 'forbidden'},
+    ])
+    result = runner.invoke(entry, ['bulk', '-'], input=json.dumps(operations))
+    assert result.exit_code == 2
+    assert 'app1 domains: error 403: forbidden' in result.output
+    fake_api_client.bulk.assert_called_once_with(operations)
+
+
+def test_bulk_invalid_file(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    with open('operations.json', 'w') as f:
+        f.write('not json')
+    result = runner.invoke(entry, ['bulk', 'operations.json'])
+    assert result.exit_code == 2
+    assert fake_api_client.bulk.call_count == 0
+
+
+def test_bulk_chunks(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    operations = [{'app': 'app{}'.format(i), 'operation': 'addons'} for i in range(3)]
+    fake_api_client.bulk.side_effect = lambda chunk: iter([
+        {'index': i, 'app': op['app'], 'operation': 'addons', 'status': 200, 'result': []}
+        for i, op in enumerate(chunk)])
+    with mock.patch('tigerhost.settings.BULK_CHUNK_SIZE', 2):
+        result = runner.invoke(entry, ['bulk', '-'], input=json.dumps(operations))
+    assert result.exit_code == 0
+    assert [c[0][0] for c in fake_api_client.bulk.call_args_list] == [
+        operations[:2], operations[2:]]
+    assert 'app2 addons: []' in result.output
+
+
+def test_bulk_not_a_list(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    result = runner.invoke(entry, ['bulk', '-'], input=json.dumps({'app': 'app1'}))
+    assert result.exit_code == 2
+    assert fake_api_client.bulk.call_count == 0
@@ -64,3 +64,61 @@ def test_unset_config(runner, saved_user, fake_api_client):
         assert k in result.output
     fake_api_client.set_application_env_variables.assert_called_once_with(
         'app', {k: None for k in bindings})
+
+
+def test_set_config_from_file(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    with open('.env', 'w') as f:
+        f.write('# a comment\n\nTEST1=123\nexport TEST2="a b"\nTEST3=\n')
+    result = runner.invoke(entry, ['config:set', '--app', 'app', '--from-file', '.env', 'TEST4=4'])
+    assert result.exit_code == 0
+    fake_api_client.set_application_env_variables.assert_called_once_with('app', {
+        'TEST1': '123',
+        'TEST2': 'a b',
+        'TEST3': None,
+        'TEST4': '4',
+    })
+
+
+def test_set_config_no_variables(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    result = runner.invoke(entry, ['config:set', '--app', 'app'])
+    assert result.exit_code == 2
+    assert fake_api_client.set_application_env_variables.call_count == 0
+
+
+def test_set_config_diff(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    fake_api_client.get_application_env_variables.return_value = {
+        'TEST1': '123',
+    }
+    result = runner.invoke(entry, ['config:set', '--app', 'app', '--diff', 'TEST1=123', 'TEST2=abc'])
+    assert result.exit_code == 0
+    fake_api_client.set_application_env_variables.assert_called_once_with('app', {'TEST2': 'abc'})
+
+    result = runner.invoke(entry, ['config:set', '--app', 'app', '--diff', 'TEST1=123'])
+    assert result.exit_code == 0
+    assert 'No variables changed' in result.output
+    assert fake_api_client.set_application_env_variables.call_count == 1
+
+
+def test_unset_config_diff(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    fake_api_client.get_application_env_variables.return_value = {
+        'TEST1': '123',
+    }
+    result = runner.invoke(entry, ['config:unset', '--app', 'app', '--diff', 'TEST1', 'TEST2'])
+    assert result.exit_code == 0
+    fake_api_client.set_application_env_variables.assert_called_once_with('app', {'TEST1': None})
@@ -12,3 +12,11 @@ def test_add_remote(runner, make_git_repo, saved_user, fake_api_client):
     assert result.exit_code == 0
     assert remote_url in result.output
     fake_api_client.get_application_git_remote.assert_called_once_with('app')
+
+
+def test_add_remote_cached(runner, make_git_repo, saved_user, fake_api_client):
+    fake_api_client.get_application_git_remote.return_value = 'url'
+    runner.invoke(entry, ['git:remote', '--app', 'app'])
+    result = runner.invoke(entry, ['git:remote', '--app', 'app', '--remote', 'other'])
+    assert result.exit_code == 0
+    fake_api_client.get_application_git_remote.assert_called_once_with('app')
@@ -1,25 +1,83 @@
+import mock
+
+from click_extensions import exit_codes
+
 from tigerhost.entry import entry
 
 
-def test_run_command(runner, saved_user, fake_api_client):
+def test_run_command_old_server(runner, saved_user, fake_api_client):
     """
     @type runner: click.testing.CliRunner
     @type fake_api_client: mock.Mock
     """
     command = 'echo 1 2 3'
-    fake_api_client.run_command.return_value = {
+    fake_api_client.start_command.return_value = {
         'exit_code': 0,
         'output': '1 2 3\n',
     }
     result = runner.invoke(entry, ['run', '--app', 'app'] + command.split(' '))
     assert result.exit_code == 0
     assert '1 2 3' in result.output
-    fake_api_client.run_command.assert_called_once_with('app', command)
+    fake_api_client.start_command.assert_called_once_with('app', command)
 
-    fake_api_client.run_command.return_value = {
+    fake_api_client.start_command.return_value = {
         'exit_code': 1,
         'output': '1 2 3\n',
     }
     result = runner.invoke(entry, ['run', '--app', 'app'] + command.split(' '))
     assert result.exit_code == 1
     assert '1 2 3' in result.output
+
+
+def test_run_command(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    command = 'echo 1 2 3'
+    fake_api_client.start_command.return_value = {'job_id': 'job'}
+    # the first stream ends before the command is done
+    fake_api_client.get_command_output.side_effect = [
+        iter([{'output': '1 2 '}]),
+        iter([{'output': '3\n'}, {'exit_code': 4}]),
+    ]
+    with mock.patch('tigerhost.commands.run_command.time') as mock_time:
+        mock_time.time.return_value = 0
+        result = runner.invoke(entry, ['run', '--app', 'app'] + command.split(' '))
+    assert result.exit_code == 4
+    mock_time.sleep.assert_called_once_with(2)
+    assert '1 2 3\n' in result.output
+    fake_api_client.start_command.assert_called_once_with('app', command)
+    assert fake_api_client.get_command_output.call_args_list == [
+        mock.call('app', 'job', offset=0),
+        mock.call('app', 'job', offset=4),
+    ]
+
+
+def test_run_command_error(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    fake_api_client.start_command.return_value = {'job_id': 'job'}
+    fake_api_client.get_command_output.return_value = iter([{'error': 'no such app'}])
+    result = runner.invoke(entry, ['run', '--app', 'app', 'ls'])
+    assert result.exit_code == exit_codes.OTHER_FAILURE
+    assert 'no such app' in result.output
+
+
+def test_run_command_timeout(runner, saved_user, fake_api_client):
+    """
+    @type runner: click.testing.CliRunner
+    @type fake_api_client: mock.Mock
+    """
+    fake_api_client.start_command.return_value = {'job_id': 'job'}
+    # the command never finishes
+    fake_api_client.get_command_output.side_effect = lambda *args, **kwargs: iter([])
+    with mock.patch('tigerhost.commands.run_command.time') as mock_time:
+        mock_time.time.side_effect = [0, 60 * 60, 65 * 60]
+        result = runner.invoke(entry, ['run', '--app', 'app', 'ls'])
+    assert result.exit_code == exit_codes.OTHER_FAILURE
+    assert 'did not finish in time' in result.output
+    assert fake_api_client.get_command_output.call_count == 2
+    mock_time.sleep.assert_called_once_with(2)
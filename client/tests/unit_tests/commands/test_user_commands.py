@@ -1,3 +1,4 @@
+from tigerhost.api_client import ApiClientAuthenticationError
 from tigerhost.entry import entry
 from tigerhost.user import load_user
 
@@ -8,6 +9,14 @@ def test_user_info_success(runner, fake_api_client, saved_user):
     assert result.exit_code == 0
     assert user.username in result.output
     assert user.api_key in result.output
+    fake_api_client.test_api_key.assert_called_once_with()
+
+
+def test_user_info_invalid(runner, fake_api_client, saved_user):
+    fake_api_client.test_api_key.side_effect = ApiClientAuthenticationError(None)
+    result = runner.invoke(entry, ['user:info'])
+    assert result.exit_code == 2
+    assert 'Credentials no longer valid' in result.output
 
 
 def test_user_info_failure(runner, fake_api_client):
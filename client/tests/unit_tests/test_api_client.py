@@ -1,5 +1,9 @@
+import json
+import mock
 import pytest
 import responses
+import threading
+import time
 import urlparse
 
 from tigerhost.api_client import ApiClient, ApiClientResponseError, ApiClientAuthenticationError
@@ -156,6 +160,26 @@ def test_run_command(api_client, fake_api_server_url):
     assert result['output'] == '1 2 3\n'
 
 
+@responses.activate
+def test_start_command(api_client, fake_api_server_url):
+    responses.add(responses.POST, urlparse.urljoin(
+        fake_api_server_url, 'api/v1/apps/{}/run/'.format('testid')), status=202, json={'job_id': 'job'})
+    result = api_client.start_command('testid', 'ls')
+    assert result == {'job_id': 'job'}
+    assert json.loads(responses.calls[0].request.body) == {'command': 'ls', 'async': True}
+
+
+@responses.activate
+def test_get_command_output(api_client, fake_api_server_url):
+    lines = [{'output': '1 2 3\n'}, {'exit_code': 0}]
+    responses.add(responses.GET, urlparse.urljoin(
+        fake_api_server_url, 'api/v1/apps/{}/run/{}/'.format('testid', 'job')),
+        body=''.join(json.dumps(x) + '\n' for x in lines), status=200)
+    assert list(api_client.get_command_output('testid', 'job', offset=4)) == lines
+    query = urlparse.parse_qs(urlparse.urlparse(responses.calls[0].request.url).query)
+    assert query == {'offset': ['4']}
+
+
 @responses.activate
 def test_get_application_git_remote(api_client, fake_api_server_url):
     responses.add(responses.GET, urlparse.urljoin(
@@ -239,6 +263,23 @@ def test_get_application_addon(api_client, fake_api_server_url):
     assert result == addon
 
 
+@responses.activate
+def test_get_application_addon_wait_for(api_client, fake_api_server_url):
+    addon = {
+        'provider_name': 'postgres',
+        'display_name': 'fun-monkey-12d',
+        'state': 'ready',
+    }
+    responses.add(responses.GET,
+                  urlparse.urljoin(fake_api_server_url,
+                                   'api/v1/apps/{}/addons/{}/'.format('testid', 'fun-monkey-12d')),
+                  json=addon, status=200)
+    result = api_client.get_application_addon('testid', 'fun-monkey-12d', wait_for='ready', timeout=60)
+    assert result == addon
+    query = urlparse.parse_qs(urlparse.urlparse(responses.calls[0].request.url).query)
+    assert query == {'wait_for': ['ready'], 'timeout': ['60']}
+
+
 @responses.activate
 def test_create_application_addon(api_client, fake_api_server_url):
     addon = {
@@ -271,6 +312,23 @@ def test_create_application_addon_with_config_customization(api_client, fake_api
     assert result['addon'] == addon
 
 
+@responses.activate
+def test_clone_application_addon(api_client, fake_api_server_url):
+    addon = {
+        'provider_name': 'postgres',
+        'display_name': 'sad-bunny-12d',
+        'status': 'available',
+    }
+    responses.add(responses.POST,
+                  urlparse.urljoin(fake_api_server_url,
+                                   'api/v1/apps/{}/addons/{}/clone/'.format('testid', 'fun-monkey-12d')),
+                  json={'message': 'test message', 'addon': addon}, status=200)
+    result = api_client.clone_application_addon('testid', 'fun-monkey-12d', target_app_id='staging')
+    assert result['message'] == 'test message'
+    assert result['addon'] == addon
+    assert json.loads(responses.calls[0].request.body) == {'app_id': 'staging'}
+
+
 @responses.activate
 def test_delete_application_addon(api_client, fake_api_server_url):
     responses.add(responses.DELETE,
@@ -321,3 +379,109 @@ def test_remove_application_key(api_client, fake_api_server_url):
     responses.add(responses.DELETE, urlparse.urljoin(
         fake_api_server_url, 'api/v1/keys/backend1/{}/'.format(key_name)), status=204)
     api_client.remove_key(key_name, 'backend1')
+
+
+@responses.activate
+def test_requests_share_session(api_client, fake_api_server_url):
+    """
+    @type api_client: ApiClient
+    @type fake_api_server_url: str
+    """
+    responses.add(responses.GET, urlparse.urljoin(
+        fake_api_server_url, 'api/test_api_key/'), status=200)
+    with mock.patch.object(api_client._session, 'request', wraps=api_client._session.request) as mocked:
+        api_client.test_api_key()
+        api_client.test_api_key()
+    assert mocked.call_count == 2
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_request_sends_wsse_token(api_client, fake_api_server_url):
+    """The token is sent with the first request, without waiting
+    for a challenge.
+
+    @type api_client: ApiClient
+    @type fake_api_server_url: str
+    """
+    responses.add(responses.GET, urlparse.urljoin(
+        fake_api_server_url, 'api/test_api_key/'), status=200)
+    api_client.test_api_key()
+    assert len(responses.calls) == 1
+    headers = responses.calls[0].request.headers
+    assert headers['Authorization'] == 'WSSE profile="UsernameToken"'
+    assert headers['X-WSSE'].startswith('UsernameToken Username=""')
+
+
+@responses.activate
+def test_bulk(api_client, fake_api_server_url):
+    results = [
+        {'index': 1, 'app': 'app2', 'operation': 'config', 'status': 200, 'result': {}},
+        {'index': 0, 'app': 'app1', 'operation': 'config', 'status': 400, 'error': 'App app1 does not exist.'},
+    ]
+    responses.add(responses.POST,
+                  urlparse.urljoin(fake_api_server_url, 'api/v1/bulk/'),
+                  body=''.join(json.dumps(x) + '\n' for x in results), status=200)
+    operations = [{'app': 'app1', 'operation': 'config'}, {'app': 'app2', 'operation': 'config'}]
+    assert list(api_client.bulk(operations)) == results
+    assert json.loads(responses.calls[0].request.body) == operations
+
+
+@responses.activate
+def test_map(api_client, fake_api_server_url):
+    """
+    @type api_client: ApiClient
+    @type fake_api_server_url: str
+    """
+    app_ids = ['app{}'.format(i) for i in range(20)]
+    for app_id in app_ids:
+        responses.add(responses.GET, urlparse.urljoin(
+            fake_api_server_url, 'api/v1/apps/{}/env/'.format(app_id)), json={'APP': app_id}, status=200)
+    results = api_client.map(api_client.get_application_env_variables, app_ids)
+    assert results == [{'APP': app_id} for app_id in app_ids]
+    tokens = [c.request.headers['X-WSSE'] for c in responses.calls]
+    assert len(set(tokens)) == len(app_ids)
+
+
+def test_map_max_workers(api_client):
+    """
+    @type api_client: ApiClient
+    """
+    lock = threading.Lock()
+    state = {'in_flight': 0, 'max_in_flight': 0}
+
+    def func(item):
+        with lock:
+            state['in_flight'] += 1
+            state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+        time.sleep(0.01)
+        with lock:
+            state['in_flight'] -= 1
+        return item * 2
+
+    assert api_client.map(func, range(20), max_workers=3) == [x * 2 for x in range(20)]
+    assert 1 < state['max_in_flight'] <= 3
+
+
+@responses.activate
+def test_map_errors(api_client, fake_api_server_url):
+    """
+    @type api_client: ApiClient
+    @type fake_api_server_url: str
+    """
+    responses.add(responses.GET, urlparse.urljoin(
+        fake_api_server_url, 'api/v1/apps/app1/env/'), json={'VAR': 'value'}, status=200)
+    responses.add(responses.GET, urlparse.urljoin(
+        fake_api_server_url, 'api/v1/apps/app2/env/'), status=401)
+    with pytest.raises(ApiClientAuthenticationError):
+        api_client.map(api_client.get_application_env_variables, ['app1', 'app2'])
+    results = api_client.map(api_client.get_application_env_variables, ['app1', 'app2'], return_exceptions=True)
+    assert results[0] == {'VAR': 'value'}
+    assert isinstance(results[1], ApiClientAuthenticationError)
+
+
+def test_map_empty(api_client):
+    """
+    @type api_client: ApiClient
+    """
+    assert api_client.map(lambda x: x, []) == []
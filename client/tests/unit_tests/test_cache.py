@@ -0,0 +1,83 @@
+import mock
+import os
+import pytest
+
+from tigerhost.cache import Cache, NORMAL, NO_CACHE, REFRESH, _cache_path, delete_cache
+
+
+@pytest.yield_fixture(scope='function')
+def fake_time():
+    with mock.patch('tigerhost.cache.time.time') as mocked:
+        mocked.return_value = 1000.0
+        yield mocked
+
+
+def test_get_set(fake_private_dir):
+    cache = Cache('username')
+    assert cache.get('key') is None
+    cache.set('key', {'a': [1, 2]}, 60)
+    assert cache.get('key') == {'a': [1, 2]}
+    assert Cache('username').get('key') == {'a': [1, 2]}
+
+
+def test_expiry(fake_time):
+    cache = Cache('username')
+    cache.set('short', 'value', 10)
+    cache.set('long', 'value', 100)
+    fake_time.return_value = 1010.0
+    assert cache.get('short') is None
+    assert cache.get('long') == 'value'
+
+
+def test_other_user(fake_private_dir):
+    Cache('username').set('key', 'value', 60)
+    assert Cache('other').get('key') is None
+
+
+def test_fetch():
+    cache = Cache('username')
+    func = mock.Mock(return_value='value')
+    assert cache.fetch('key', 60, func) == 'value'
+    assert cache.fetch('key', 60, func) == 'value'
+    func.assert_called_once_with()
+
+
+def test_refresh():
+    Cache('username').set('key', 'old', 60)
+    cache = Cache('username', mode=REFRESH)
+    assert cache.fetch('key', 60, lambda: 'new') == 'new'
+    assert Cache('username', mode=NORMAL).get('key') == 'new'
+
+
+def test_no_cache():
+    Cache('username').set('key', 'old', 60)
+    cache = Cache('username', mode=NO_CACHE)
+    assert cache.fetch('key', 60, lambda: 'new') == 'new'
+    assert Cache('username').get('key') == 'old'
+
+
+def test_invalidate():
+    cache = Cache('username')
+    cache.set('key1', 'value', 60)
+    cache.set('key2', 'value', 60)
+    Cache('username', mode=NO_CACHE).invalidate('key1', 'missing')
+    assert cache.get('key1') is None
+    assert cache.get('key2') == 'value'
+
+
+def test_corrupt_file():
+    cache = Cache('username')
+    cache.set('key', 'value', 60)
+    with open(_cache_path(), 'w') as f:
+        f.write('{not json')
+    assert cache.get('key') is None
+    cache.set('key', 'value', 60)
+    assert cache.get('key') == 'value'
+
+
+def test_delete_cache():
+    Cache('username').set('key', 'value', 60)
+    delete_cache()
+    assert not os.path.exists(_cache_path())
+    # deleting again is fine
+    delete_cache()
@@ -0,0 +1,74 @@
+import json
+import pytest
+import subprocess32 as subprocess
+import sys
+
+from tigerhost.entry import entry
+
+# modules that only some commands need, and that are slow to import
+HEAVY_MODULES = ['requests', 'subprocess32', 'tigerhost.wsse', 'tigerhost.api_client']
+
+# seconds, generous so that slow machines pass. Importing the
+# commands up front took about 4 times longer than importing lazily.
+IMPORT_TIME_BUDGET = 0.25
+
+_STARTUP_SCRIPT = '''
+import json
+import sys
+import time
+
+start = time.time()
+from tigerhost.entry import entry
+import_time = time.time() - start
+try:
+    entry(sys.argv[1:], prog_name='tigerhost')
+except SystemExit:
+    pass
+json.dump({
+    'import_time': import_time,
+    'modules': [m for m in %r if m in sys.modules],
+}, sys.stderr)
+''' % HEAVY_MODULES
+
+
+def _startup(*args):
+    """Run tigerhost in a new interpreter, so that the modules
+    imported by other tests don't count.
+
+    :rtype: dict
+    :returns: with the import time of tigerhost.entry, and which of
+        the heavy modules were imported
+    """
+    process = subprocess.Popen(
+        [sys.executable, '-c', _STARTUP_SCRIPT] + list(args),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    _, err = process.communicate()
+    return json.loads(err)
+
+
+@pytest.mark.parametrize('args', [[], ['--help'], ['bash-complete']])
+def test_startup_does_not_import_commands(check_time, args):
+    result = _startup(*args)
+    assert result['modules'] == []
+    check_time(result['import_time'], IMPORT_TIME_BUDGET)
+
+
+def test_command_imported_when_used():
+    result = _startup('apps', '--help')
+    assert 'tigerhost.api_client' in result['modules']
+
+
+@pytest.mark.parametrize('name', sorted(entry.lazy_commands))
+def test_lazy_short_help(name):
+    """The short help in entry.py must match the command's own.
+    """
+    cmd = entry.get_command(None, name)
+    assert cmd is not None
+    assert cmd.short_help == entry.lazy_commands[name][1]
+
+
+def test_help_lists_commands(runner):
+    result = runner.invoke(entry, ['--help'])
+    assert result.exit_code == 0
+    for name in entry.list_commands(None):
+        assert name in result.output
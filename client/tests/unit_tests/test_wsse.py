@@ -0,0 +1,68 @@
+"""Tests of the WSSE token builders. Run with -s to see the timings of
+the benchmark.
+"""
+import base64
+import hashlib
+import mock
+import re
+import timeit
+
+from tigerhost.wsse import PrecomputedWSSETokenBuilder, WSSETokenBuilder
+
+NUMBER = 10000
+
+# the format the server's parse_wsse_header expects
+_token_regexp = re.compile(
+    r'^Username="([^"]*)", PasswordDigest="([^"]*)", Nonce="([^"]*)", Created="([^"]*)"$')
+
+
+def _check_token(token, username, password):
+    # the server gets the header as bytes
+    match = _token_regexp.match(str(token))
+    assert match is not None
+    token_username, digest, nonce, timestamp = match.groups()
+    assert token_username == username
+    # the way the server computes the digest
+    expected = hashlib.sha256(base64.standard_b64decode(nonce) + timestamp + password).digest()
+    assert base64.standard_b64decode(digest) == expected
+    return nonce, timestamp
+
+
+def test_precomputed_token():
+    builder = PrecomputedWSSETokenBuilder('username', 'password')
+    nonce, timestamp = _check_token(builder.make_token(), 'username', 'password')
+    assert len(base64.standard_b64decode(nonce)) == 16
+    assert re.match(r'^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ$', timestamp)
+
+
+def test_precomputed_token_unicode_password():
+    builder = PrecomputedWSSETokenBuilder(u'username', u'password')
+    _check_token(builder.make_token(), 'username', 'password')
+
+
+def test_precomputed_token_unique_nonces():
+    builder = PrecomputedWSSETokenBuilder('username', 'password')
+    nonces = {_check_token(builder.make_token(), 'username', 'password')[0] for _ in range(100)}
+    assert len(nonces) == 100
+
+
+def test_precomputed_token_timestamp():
+    builder = PrecomputedWSSETokenBuilder('username', 'password', drift_seconds=10)
+    with mock.patch('tigerhost.wsse.time.time') as mock_time:
+        mock_time.return_value = 1431960627.5
+        _, timestamp = _check_token(builder.make_token(), 'username', 'password')
+        assert timestamp == '2015-05-18T14:50:17Z'
+        mock_time.return_value = 1431960628.1
+        _, timestamp = _check_token(builder.make_token(), 'username', 'password')
+        assert timestamp == '2015-05-18T14:50:18Z'
+
+
+def test_benchmark_make_token(check_time):
+    builder = WSSETokenBuilder('username', 'password')
+    precomputed_builder = PrecomputedWSSETokenBuilder('username', 'password')
+    seconds = timeit.timeit(builder.make_token, number=NUMBER)
+    precomputed_seconds = timeit.timeit(precomputed_builder.make_token, number=NUMBER)
+    print('\nWSSETokenBuilder.make_token: {:.1f} us per token'.format(seconds / NUMBER * 1e6))
+    print('PrecomputedWSSETokenBuilder.make_token: {:.1f} us per token'.format(precomputed_seconds / NUMBER * 1e6))
+    check_time(precomputed_seconds, seconds)
+    check_time(precomputed_seconds / NUMBER, 0.0001)
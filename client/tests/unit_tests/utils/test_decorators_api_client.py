@@ -37,16 +37,25 @@ def sample_cmd():
     pass
 
 
+@click.command()
+@decorators.store_api_client
+@click.pass_context
+def sample_cmd_backends(ctx):
+    ctx.obj['api_client'].get_backends()
+
+
 def test_no_user(runner):
     result = runner.invoke(sample_cmd)
     assert result.exit_code == 2
 
 
 def test_failed_auth(runner, fake_api_client, saved_user):
-    fake_api_client.test_api_key.side_effect = ApiClientAuthenticationError(
+    fake_api_client.get_backends.side_effect = ApiClientAuthenticationError(
         None)
-    result = runner.invoke(sample_cmd)
+    result = runner.invoke(sample_cmd_backends)
     assert result.exit_code == 2
+    assert fake_api_client.get_backends.call_count == 1
+    assert not fake_api_client.test_api_key.called
 
 
 def test_success(runner, fake_api_client, saved_user):
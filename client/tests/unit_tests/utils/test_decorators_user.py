@@ -38,16 +38,28 @@ def sample_cmd(ctx):
     pass
 
 
+@click.command()
+@decorators.store_user
+@click.pass_context
+def sample_cmd_rejected(ctx):
+    raise ApiClientAuthenticationError(None)
+
+
 def test_no_user(runner):
     result = runner.invoke(sample_cmd)
     assert result.exit_code == 2
 
 
 def test_failed_auth(runner, fake_api_client, saved_user):
-    fake_api_client.test_api_key.side_effect = ApiClientAuthenticationError(
-        None)
-    result = runner.invoke(sample_cmd)
+    result = runner.invoke(sample_cmd_rejected)
     assert result.exit_code == 2
+    assert 'Credentials no longer valid' in result.output
+
+
+def test_no_preflight(runner, fake_api_client, saved_user):
+    result = runner.invoke(sample_cmd)
+    assert result.exit_code == 0
+    assert not fake_api_client.test_api_key.called
 
 
 def test_success(runner, fake_api_client, saved_user):
@@ -1,4 +1,7 @@
+import json
 import requests
+import sys
+import threading
 import urlparse
 
 from wsse import WSSEAuth
@@ -42,6 +45,20 @@ class ApiClient(object):
         self.api_server_url = api_server_url
         self.username = username
         self.api_key = api_key
+        # one session, so connections are kept alive and reused
+        # across the requests of a command
+        self._session = self._make_session()
+        # the threads of :py:meth:`map` each have their own session,
+        # since neither sessions nor WSSEAuth are thread-safe
+        self._local = threading.local()
+
+    def _make_session(self):
+        """
+        :rtype: requests.Session
+        """
+        session = requests.Session()
+        session.auth = WSSEAuth(self.username, self.api_key, preempt=True)
+        return session
 
     def _request_and_raise(self, method, path, **kwargs):
         """Sends a request to the api server.
@@ -57,8 +74,9 @@ class ApiClient(object):
         :raises tigerhost.api_client.ApiClientResponseError:
             if the response status code is not 401 and not in the [200, 300) range.
         """
-        resp = requests.request(method, urlparse.urljoin(
-            self.api_server_url, path), auth=WSSEAuth(self.username, self.api_key), **kwargs)
+        session = getattr(self._local, 'session', None) or self._session
+        resp = session.request(method, urlparse.urljoin(
+            self.api_server_url, path), **kwargs)
 
         if resp.status_code == 401:
             raise ApiClientAuthenticationError(resp)
@@ -66,6 +84,62 @@ class ApiClient(object):
             raise ApiClientResponseError(resp)
         return resp
 
+    def map(self, func, items, max_workers=8, return_exceptions=False):
+        """Call ``func`` on every item concurrently, with at most
+        ``max_workers`` requests in flight. ``func`` is usually a method
+        of this client, e.g.
+
+            api_client.map(api_client.get_application_env_variables, app_ids)
+
+        :param func: a function taking one item
+        :param list items:
+        :param int max_workers: how many calls to run at a time
+        :param bool return_exceptions: if True, an exception raised by
+            ``func`` is returned in place of its result
+
+        :rtype: list
+        :returns: the results, in the order of ``items``
+
+        :raises tigerhost.api_client.ApiClientResponseError:
+            or whatever else ``func`` raised for the first item it failed
+            on, unless ``return_exceptions`` is True
+        """
+        # only scripts use this, don't make every command import it
+        from multiprocessing.pool import ThreadPool
+
+        items = list(items)
+        if not items:
+            return []
+        sessions = []
+        sessions_lock = threading.Lock()
+
+        def start_thread():
+            self._local.session = self._make_session()
+            with sessions_lock:
+                sessions.append(self._local.session)
+
+        def call(item):
+            try:
+                return True, func(item)
+            except Exception:
+                return False, sys.exc_info()
+
+        pool = ThreadPool(min(max_workers, len(items)), initializer=start_thread)
+        try:
+            results = []
+            for success, result in pool.imap(call, items):
+                if success:
+                    results.append(result)
+                elif return_exceptions:
+                    results.append(result[1])
+                else:
+                    raise result[0], result[1], result[2]
+            return results
+        finally:
+            pool.terminate()
+            for session in sessions:
+                session.close()
+
     def test_api_key(self):
         """Hit the test end point for API key
 
@@ -206,6 +280,49 @@ class ApiClient(object):
         }, timeout=None)
         return resp.json()
 
+    def start_command(self, app_id, command):
+        """Start a one-off command in the background. Read its output
+        with :py:meth:`get_command_output`.
+
+        Servers that cannot run commands in the background run it right
+        away, and return what :py:meth:`run_command` would.
+
+        :param str app_id:
+        :param str command:
+
+        :rtype: dict
+        :returns: a dictionary with the key 'job_id', or with keys
+            'exit_code' and 'output' on older servers
+
+        :raises tigerhost.api_client.ApiClientResponseError:
+        """
+        resp = self._request_and_raise('POST', 'api/v1/apps/{}/run/'.format(app_id), json={
+            'command': command,
+            'async': True,
+        }, timeout=None)
+        return resp.json()
+
+    def get_command_output(self, app_id, job_id, offset=0):
+        """Stream the output of a command started with
+        :py:meth:`start_command`. The server ends the stream after a
+        while even if the command is still running, ask again with the
+        length of the output received so far as ``offset``.
+
+        :param str app_id:
+        :param str job_id:
+        :param int offset: how much of the output to skip
+
+        :rtype: iterator
+        :returns: dicts, {'output': str} as the output comes in, then
+            {'exit_code': int} or {'error': str} once the command is done
+
+        :raises tigerhost.api_client.ApiClientResponseError:
+        """
+        resp = self._request_and_raise(
+            'GET', 'api/v1/apps/{}/run/{}/'.format(app_id, job_id),
+            params={'offset': offset}, stream=True, timeout=None)
+        return (json.loads(line) for line in resp.iter_lines() if line)
+
     def get_application_git_remote(self, app_id):
         """Get the git remote for the specified app ID.
 
@@ -297,19 +414,30 @@ class ApiClient(object):
             'GET', 'api/v1/apps/{}/addons/'.format(app_id))
         return resp.json()['results']
 
-    def get_application_addon(self, app_id, addon_name):
+    def get_application_addon(self, app_id, addon_name, wait_for=None, timeout=None):
         """Return a specific addon installed for this app.
 
+        If ``wait_for`` is given, the server waits until the addon is in
+        that state or its state changes, for up to ``timeout`` seconds,
+        before responding.
+
         :param str app_id:
         :param str addon_name:
+        :param str wait_for: the name of a state, like 'ready'
+        :param int timeout: how long the server should wait, in seconds
 
         :rtype: dict
         :returns: same as the return type for ``get_application_addons``
 
         :raises tigerhost.api_client.ApiClientResponseError:
         """
+        params = {}
+        if wait_for is not None:
+            params['wait_for'] = wait_for
+            if timeout is not None:
+                params['timeout'] = timeout
         resp = self._request_and_raise(
-            'GET', 'api/v1/apps/{}/addons/{}/'.format(app_id, addon_name))
+            'GET', 'api/v1/apps/{}/addons/{}/'.format(app_id, addon_name), params=params)
         return resp.json()
 
     def create_application_addon(self, app_id, addon, config_customization=None):
@@ -334,6 +462,29 @@ class ApiClient(object):
             'POST', 'api/v1/apps/{}/addons/'.format(app_id), json=data)
         return resp.json()
 
+    def clone_application_addon(self, app_id, addon_name, target_app_id=None, config_customization=None):
+        """Create a new addon that starts out as a copy of an existing addon.
+
+        :param str app_id:
+        :param str addon_name: the addon to clone
+        :param str target_app_id: the app for the new addon, defaults to ``app_id``
+        :param str config_customization:
+
+        :rtype: dict
+        :returns: dict with keys 'message' and 'addon'.
+            'addon' contains a dictionary representation of the created addon.
+
+        :raises tigerhost.api_client.ApiClientResponseError:
+        """
+        data = {}
+        if target_app_id is not None:
+            data['app_id'] = target_app_id
+        if config_customization is not None:
+            data['config_customization'] = config_customization
+        resp = self._request_and_raise(
+            'POST', 'api/v1/apps/{}/addons/{}/clone/'.format(app_id, addon_name), json=data)
+        return resp.json()
+
     def delete_application_addon(self, app_id, addon_name):
         """Delete the addon from this app.
 
@@ -429,3 +580,23 @@ class ApiClient(object):
         """
         self._request_and_raise(
             'DELETE', 'api/v1/keys/{}/{}/'.format(backend, key_name))
+
+    def bulk(self, operations):
+        """Run operations on many apps at once. The server runs them
+        concurrently, and sends back each result as soon as it is done.
+
+        :param list operations: list of dicts, like
+            [{'app': 'app-id', 'operation': 'config:set', 'data': {'VAR': 'value'}}, ...]
+            'data' is only needed by some operations.
+
+        :rtype: iterator
+        :returns: the results, in the order they finish, like
+            {'index': 0, 'app': 'app-id', 'operation': 'config:set', 'status': 200, 'result': ...}
+            with 'error' instead of 'result' if the operation failed.
+            'index' is the position of the operation in ``operations``.
+
+        :raises tigerhost.api_client.ApiClientResponseError:
+        """
+        resp = self._request_and_raise(
+            'POST', 'api/v1/bulk/', json=operations, stream=True)
+        return (json.loads(line) for line in resp.iter_lines() if line)
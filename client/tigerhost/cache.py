@@ -0,0 +1,135 @@
+"""A module to cache slow-changing server data on disk, so that
+repeated commands (e.g. in a shell loop) don't ask the server again.
+"""
+import json
+import os
+import tempfile
+import time
+
+from click_extensions import private_dir
+
+from tigerhost import settings
+
+# how to use the cache
+NORMAL = 'normal'
+# ignore the cache entirely
+NO_CACHE = 'no_cache'
+# don't read the cache, but store the fresh values in it
+REFRESH = 'refresh'
+
+
+def _cache_path():
+    """Returns the path to the cache file
+
+    :rtype: str
+    :returns: path
+    """
+    return os.path.join(private_dir.private_dir_path(settings.APP_NAME), 'cache.json')
+
+
+def delete_cache():
+    """Delete the cache file, if any, e.g. when the user changes.
+    """
+    try:
+        os.remove(_cache_path())
+    except OSError:
+        pass
+
+
+class Cache(object):
+    """Values from the server, each with its own expiry time, stored in
+    the private dir of the app.
+    """
+
+    def __init__(self, username, mode=NORMAL):
+        """Create a new :code:`Cache` for this user. Entries stored
+        for another user are ignored.
+
+        :param str username:
+        :param str mode: one of NORMAL, NO_CACHE and REFRESH
+        """
+        self.username = username
+        self.mode = mode
+
+    def _load(self):
+        """Load the unexpired entries of this user.
+
+        :rtype: dict
+        :returns: key => {'expires': timestamp, 'value': value}
+        """
+        try:
+            with open(_cache_path(), 'r') as f:
+                data = json.load(f)
+        except (IOError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('username') != self.username:
+            return {}
+        now = time.time()
+        entries = data.get('entries', {})
+        return {k: v for k, v in entries.iteritems() if v['expires'] > now}
+
+    def _save(self, entries):
+        """Write the entries, replacing the file atomically, so that
+        concurrent commands never read half a file.
+
+        :param dict entries:
+        """
+        private_dir.ensure_private_dir_exists(settings.APP_NAME)
+        path = _cache_path()
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'username': self.username, 'entries': entries}, f)
+        os.rename(temp_path, path)
+
+    def get(self, key):
+        """Get a value from the cache.
+
+        :param str key:
+
+        :returns: the value, or None if it is not cached or expired
+        """
+        if self.mode != NORMAL:
+            return None
+        entry = self._load().get(key)
+        return entry['value'] if entry is not None else None
+
+    def set(self, key, value, ttl):
+        """Store a value in the cache.
+
+        :param str key:
+        :param value: a json-serializable value, not None
+        :param int ttl: how long the value stays valid, in seconds
+        """
+        if self.mode == NO_CACHE:
+            return
+        entries = self._load()
+        entries[key] = {'expires': time.time() + ttl, 'value': value}
+        self._save(entries)
+
+    def fetch(self, key, ttl, func):
+        """Get a value from the cache, or call :code:`func` to get it
+        and store it in the cache.
+
+        :param str key:
+        :param int ttl: how long the value stays valid, in seconds
+        :param func: a function with no arguments, returning the value
+
+        :returns: the value
+        """
+        value = self.get(key)
+        if value is None:
+            value = func()
+            self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, *keys):
+        """Remove values from the cache, e.g. after changing them
+        on the server.
+
+        :param keys: the keys to remove (str)
+        """
+        entries = self._load()
+        if any(key in entries for key in keys):
+            for key in keys:
+                entries.pop(key, None)
+            self._save(entries)
@@ -2,11 +2,16 @@ import click
 import datetime
 import time
 
+from click_extensions import exit_codes
 from click_extensions.decorators import catch_exception, print_markers
 
+from tigerhost import settings
 from tigerhost.api_client import ApiClientResponseError
 from tigerhost.utils import decorators
 
+# the states of an addon that is on its way to ready
+_waiting_states = ('waiting_for_provision', 'provisioned')
+
 
 @click.command()
 @print_markers
@@ -45,9 +50,32 @@ def create_addon(ctx, addon, attach_as):
     click.echo(result['message'])
 
 
+@click.command()
+@click.argument('addon_name', required=True)
+@click.option('--to-app', default=None, help='The app to attach the copy to. Defaults to this app.')
+@click.option('--attach-as', '-as', default=None, help='Attachment name, used to customize the name of the config var(s)')
+@print_markers
+@catch_exception(ApiClientResponseError)
+@decorators.store_api_client
+@decorators.store_app
+@click.pass_context
+def clone_addon(ctx, addon_name, to_app, attach_as):
+    """Create a new addon with a copy of an existing addon's data.
+    The copy uses the same database credentials as the original,
+    so everyone with access to the app it is added to can also
+    connect to the original.
+    """
+    app = ctx.obj['app']
+    api_client = ctx.obj['api_client']
+    result = api_client.clone_application_addon(
+        app, addon_name, target_app_id=to_app, config_customization=attach_as)
+    click.echo('Name: {}'.format(result['addon']['display_name']))
+    click.echo(result['message'])
+
+
 @click.command()
 @click.argument('addon', required=True)
-@click.option('--interval', '-i', type=int, default=30, help='The polling interval in seconds.')
+@click.option('--interval', '-i', type=int, default=30, help='The longest time between polls in seconds.')
 @print_markers
 @catch_exception(ApiClientResponseError)
 @decorators.store_api_client
@@ -58,16 +86,27 @@ def wait_addon(ctx, addon, interval):
     """
     app = ctx.obj['app']
     api_client = ctx.obj['api_client']
-    ready = False
-    while not ready:
-        addon_obj = api_client.get_application_addon(app, addon)
-        if addon_obj['state'] == 'ready':
-            ready = True
+    delay = min(settings.ADDON_WAIT_BACKOFF_BASE, interval)
+    previous_state = None
+    while True:
+        start = time.time()
+        addon_obj = api_client.get_application_addon(
+            app, addon, wait_for='ready', timeout=settings.ADDON_WAIT_TIMEOUT)
+        state = addon_obj['state']
+        if state == 'ready':
+            break
+        timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        click.echo('{} - Current status: {}'.format(timestamp, state))
+        if state not in _waiting_states:
+            ctx.exit(code=exit_codes.OTHER_FAILURE)
+        if state == previous_state and time.time() - start < settings.ADDON_WAIT_TIMEOUT / 2.0:
+            # the server did not wait for a change, e.g. an older server.
+            # Otherwise, ask again right away, so no change is missed
+            time.sleep(delay)
+            delay = min(delay * 2, interval)
         else:
-            timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            click.echo(
-                '{} - Current status: {}'.format(timestamp, addon_obj['state']))
-            time.sleep(interval)
+            delay = min(settings.ADDON_WAIT_BACKOFF_BASE, interval)
+        previous_state = state
     click.echo('{} is ready for use!'.format(addon))
 
 
@@ -12,15 +12,16 @@ from tigerhost.utils import decorators
 @print_markers
 @catch_exception(ApiClientResponseError)
 @decorators.store_api_client
+@decorators.store_cache
 @click.pass_context
 def list_apps(ctx):
-    """List apps for this user
-
-    @type api_client: tigerhost.api_client.ApiClient
+    """List apps for this user.
     """
     api_client = ctx.obj['api_client']
+    all_apps = ctx.obj['cache'].fetch(
+        'apps', settings.CACHE_TTL_APPS, api_client.get_all_applications)
     first = True
-    for backend, apps in api_client.get_all_applications().iteritems():
+    for backend, apps in all_apps.iteritems():
         if first:
             first = False
         else:
@@ -36,6 +37,7 @@ def list_apps(ctx):
 @print_markers
 @catch_exception(ApiClientResponseError)
 @decorators.store_api_client
+@decorators.store_cache
 @decorators.store_vcs
 @click.pass_context
 def create_app(ctx, name, backend):
@@ -43,12 +45,16 @@ def create_app(ctx, name, backend):
     """
     vcs = ctx.obj['vcs']
     api_client = ctx.obj['api_client']
+    cache = ctx.obj['cache']
     api_client.create_application(name, backend)
+    cache.invalidate('apps')
     click.echo('App {} created.'.format(name))
     click.echo()
     if vcs is not None:
         try:
-            remote = api_client.get_application_git_remote(name)
+            remote = cache.fetch(
+                'git_remote:{}'.format(name), settings.CACHE_TTL_GIT_REMOTE,
+                lambda: api_client.get_application_git_remote(name))
         except ApiClientResponseError:
             click.echo('''Cannot connect to the server to retrieve git remote URL. To add git remote to your project manually, run the following command:
 
@@ -83,6 +89,7 @@ This can happen if you created multiple {app_name} apps for your project.'''.for
 @print_markers
 @catch_exception(ApiClientResponseError)
 @decorators.store_api_client
+@decorators.store_cache
 @decorators.store_app
 @click.pass_context
 def destroy_app(ctx):
@@ -97,6 +104,7 @@ def destroy_app(ctx):
         api_client.delete_application_addon(app, x['display_name'])
     click_extensions.echo_heading('Destroying app.', marker_color='magenta')
     api_client.delete_application(app)
+    ctx.obj['cache'].invalidate('apps', 'git_remote:{}'.format(app))
     click.echo('App {} destroyed.'.format(app))
 
 
@@ -105,6 +113,7 @@ def destroy_app(ctx):
 @print_markers
 @catch_exception(ApiClientResponseError)
 @decorators.store_api_client
+@decorators.store_cache
 @decorators.store_app
 @click.pass_context
 def transfer_app(ctx, username):
@@ -116,6 +125,7 @@ def transfer_app(ctx, username):
     click.echo('Will transfer {app} to {username}. YOU WILL LOSE ACCESS to this app, unless {username} adds you back as a collaborator.'.format(app=app, username=username))
     if click.confirm('Are you sure?'):
         api_client.set_application_owner(app, username)
+        ctx.obj['cache'].invalidate('apps', 'git_remote:{}'.format(app))
         click.echo('Transfer complete.')
     else:
         click.echo('Did not transfer.')
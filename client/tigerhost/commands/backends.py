@@ -2,6 +2,7 @@ import click
 
 from click_extensions.decorators import catch_exception, print_markers
 
+from tigerhost import settings
 from tigerhost.api_client import ApiClientResponseError
 from tigerhost.utils import decorators
 
@@ -11,13 +12,15 @@ from tigerhost.utils import decorators
 @catch_exception(ApiClientResponseError)
 @decorators.store_user
 @decorators.store_api_client
+@decorators.store_cache
 @click.pass_context
 def list_backends(ctx):
-    """Show the list of keys for this user.
+    """Show the list of backends for this user.
     """
     api_client = ctx.obj['api_client']
     user = ctx.obj['user']
-    backends_info = api_client.get_backends()
+    backends_info = ctx.obj['cache'].fetch(
+        'backends', settings.CACHE_TTL_BACKENDS, api_client.get_backends)
     click.echo('{} has access to the following backends:'.format(user.username))
     for p in backends_info['backends']:
         click.echo(p)
@@ -0,0 +1,45 @@
+import click
+import json
+
+from click_extensions import exit_codes
+from click_extensions.decorators import catch_exception, print_markers
+
+from tigerhost import settings
+from tigerhost.api_client import ApiClientResponseError
+from tigerhost.utils import decorators
+
+
+@click.command()
+@click.argument('operations_file', type=click.File('r'))
+@print_markers
+@catch_exception(ApiClientResponseError)
+@decorators.store_api_client
+@click.pass_context
+def run_bulk(ctx, operations_file):
+    """Run operations on many apps at once. OPERATIONS_FILE is a JSON list
+    like [{"app": "app1", "operation": "config:set", "data": {"VAR": "value"}}],
+    or - to read it from stdin. The operations are config, config:set,
+    domains, collaborators and addons. Exits with 2 if any of them failed.
+    """
+    try:
+        operations = json.load(operations_file)
+    except ValueError:
+        click.echo('{} is not valid JSON.'.format(operations_file.name))
+        ctx.exit(code=exit_codes.OTHER_FAILURE)
+    if not isinstance(operations, list):
+        click.echo('The operations must be a JSON list.')
+        ctx.exit(code=exit_codes.OTHER_FAILURE)
+    api_client = ctx.obj['api_client']
+    failed = False
+    # the server only takes a few operations per request
+    for start in xrange(0, len(operations), settings.BULK_CHUNK_SIZE):
+        chunk = operations[start:start + settings.BULK_CHUNK_SIZE]
+        for result in api_client.bulk(chunk):
+            if 'error' in result:
+                failed = True
+                click.echo('{app} {operation}: error {status}: {error}'.format(**result))
+            else:
+                click.echo('{app} {operation}: {result}'.format(
+                    app=result['app'], operation=result['operation'], result=json.dumps(result['result'])))
+    if failed:
+        ctx.exit(code=exit_codes.OTHER_FAILURE)
@@ -23,29 +23,94 @@ def list_config(ctx):
         click.echo('{name}={value}'.format(name=name, value=value))
 
 
+def _parse_binding(pair):
+    """Parse a NAME=value pair. An empty value means unset.
+
+    :param str pair:
+
+    :rtype: tuple
+    :returns: (name, value), value is None to unset, or None if the pair is malformed
+    """
+    pair = pair.split('=', 1)
+    if len(pair) != 2 or not pair[0]:
+        return None
+    name, value = pair
+    return name, value if value != '' else None
+
+
+def _read_env_file(f):
+    """Read the NAME=value lines of a .env file. Blank lines and
+    lines starting with # are skipped, an ``export`` before the name
+    and quotes around the value are removed.
+
+    :param file f: the open file
+
+    :rtype: list
+    :returns: the NAME=value pairs (str)
+    """
+    pairs = []
+    for line in f:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('export '):
+            line = line[len('export '):].lstrip()
+        name, sep, value = line.partition('=')
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '\'"':
+            value = value[1:-1]
+        pairs.append(name.strip() + sep + value)
+    return pairs
+
+
+def _only_changed(api_client, app, bindings):
+    """Drop the bindings that would not change the app's config.
+
+    :param tigerhost.api_client.ApiClient api_client:
+    :param str app:
+    :param dict bindings: name => value, None to unset
+
+    :rtype: dict
+    :returns: the bindings that differ from the current config
+    """
+    current = api_client.get_application_env_variables(app)
+    return {k: v for k, v in bindings.iteritems() if current.get(k) != v}
+
+
 @click.command()
-@click.argument('variables', nargs=-1, required=True)
+@click.argument('variables', nargs=-1)
+@click.option('--from-file', type=click.File('r'), help='Read NAME=value lines from a .env file.')
+@click.option('--diff', is_flag=True, default=False, help='Only send the variables that changed.')
 @print_markers
 @catch_exception(ApiClientResponseError)
 @decorators.store_api_client
 @decorators.store_app
 @click.pass_context
-def set_config(ctx, variables):
+def set_config(ctx, variables, from_file, diff):
     """Set config variables. Variables are passed in the form NAME=value.
     Multiple variables can be set at once; they are passed in space separated.
+    Every change restarts the app, so set them all in one command.
     """
+    pairs = list(variables)
+    if from_file is not None:
+        pairs = _read_env_file(from_file) + pairs
+    if not pairs:
+        click.echo('No variables given.')
+        ctx.exit(code=exit_codes.OTHER_FAILURE)
     bindings = {}
-    for pair in variables:
-        pair = pair.split('=', 1)
-        if len(pair) != 2:
+    for pair in pairs:
+        binding = _parse_binding(pair)
+        if binding is None:
             click.echo('Variables must be passed in the format NAME=value.')
             ctx.exit(code=exit_codes.OTHER_FAILURE)
-        name, value = pair
-        if value == '':
-            value = None
+        name, value = binding
         bindings[name] = value
     app = ctx.obj['app']
     api_client = ctx.obj['api_client']
+    if diff:
+        bindings = _only_changed(api_client, app, bindings)
+        if not bindings:
+            click.echo('No variables changed.')
+            return
     api_client.set_application_env_variables(app, bindings)
     click.echo('The following variables set successfully:')
     for name, value in bindings.iteritems():
@@ -55,18 +120,24 @@ def set_config(ctx, variables):
 
 @click.command()
 @click.argument('variables', nargs=-1, required=True)
+@click.option('--diff', is_flag=True, default=False, help='Only send the variables that are set.')
 @print_markers
 @catch_exception(ApiClientResponseError)
 @decorators.store_api_client
 @decorators.store_app
 @click.pass_context
-def unset_config(ctx, variables):
+def unset_config(ctx, variables, diff):
     """Unset config variables. Multiple variables can be unset at
     the same time, passed in space separated.
     """
     bindings = {key: None for key in variables}
     app = ctx.obj['app']
     api_client = ctx.obj['api_client']
+    if diff:
+        bindings = _only_changed(api_client, app, bindings)
+        if not bindings:
+            click.echo('No variables changed.')
+            return
     api_client.set_application_env_variables(app, bindings)
     click.echo('The following variables unset successfully:')
     for name, value in bindings.iteritems():
@@ -15,6 +15,7 @@ from tigerhost.vcs.base import CommandError
 @catch_exception(ApiClientResponseError)
 @catch_exception(CommandError)
 @decorators.store_api_client
+@decorators.store_cache
 @decorators.store_vcs
 @click.pass_context
 def add_remote(ctx, app, remote):
@@ -24,7 +25,9 @@ def add_remote(ctx, app, remote):
         remote = settings.APP_NAME
     api_client = ctx.obj['api_client']
     vcs = ctx.obj['vcs']
-    remote_url = api_client.get_application_git_remote(app)
+    remote_url = ctx.obj['cache'].fetch(
+        'git_remote:{}'.format(app), settings.CACHE_TTL_GIT_REMOTE,
+        lambda: api_client.get_application_git_remote(app))
     vcs.add_remote(remote, remote_url)
     click.echo('Successfully set remote {remote} to {url}'.format(
         remote=remote, url=remote_url))
@@ -1,7 +1,10 @@
 import click
+import time
 
+from click_extensions import exit_codes
 from click_extensions.decorators import catch_exception, print_markers
 
+from tigerhost import settings
 from tigerhost.api_client import ApiClientResponseError
 from tigerhost.utils import decorators
 
@@ -20,6 +23,27 @@ def run_one_off(ctx, command):
     api_client = ctx.obj['api_client']
     command = ' '.join(command)
     click.echo('Running {command} on {app}. This may take a while.'.format(command=command, app=app))
-    result = api_client.run_command(app, command)
-    click.echo(result['output'])
-    ctx.exit(code=result['exit_code'])
+    result = api_client.start_command(app, command)
+    if 'job_id' not in result:
+        # older servers run the command right away
+        click.echo(result['output'])
+        ctx.exit(code=result['exit_code'])
+
+    offset = 0
+    deadline = time.time() + settings.RUN_OUTPUT_MAX_TIME
+    while True:
+        for line in api_client.get_command_output(app, result['job_id'], offset=offset):
+            if 'output' in line:
+                click.echo(line['output'], nl=False)
+                offset += len(line['output'])
+            elif 'error' in line:
+                click.echo(line['error'], err=True)
+                ctx.exit(code=exit_codes.OTHER_FAILURE)
+            else:
+                ctx.exit(code=line['exit_code'])
+        if time.time() >= deadline:
+            click.echo('The command did not finish in time.', err=True)
+            ctx.exit(code=exit_codes.OTHER_FAILURE)
+        # the server answers for a few seconds at a time, so that it does
+        # not keep a worker busy, pause before asking again
+        time.sleep(settings.RUN_OUTPUT_RETRY_DELAY)
@@ -6,6 +6,7 @@ from click_extensions.decorators import catch_exception, print_markers
 
 from tigerhost import settings
 from tigerhost.api_client import ApiClient, ApiClientAuthenticationError, ApiClientResponseError
+from tigerhost.cache import delete_cache
 from tigerhost.user import User, save_user, delete_user, has_saved_user
 from tigerhost.utils import decorators
 
@@ -44,12 +45,13 @@ def login(ctx, username, api_key):
         click.secho('OK', bg='green', fg='black')
         user = User(username=username, api_key=api_key)
         save_user(user)
+        delete_cache()
 
 
 @click.command()
 @print_markers
 @catch_exception(ApiClientResponseError)
-@decorators.store_user
+@decorators.store_api_client
 @click.pass_context
 def user_info(ctx):
     """Display information about the logged in user.
@@ -58,6 +60,7 @@ def user_info(ctx):
     click.echo('Username: {}'.format(user.username))
     click.echo('API key: {}'.format(user.api_key))
     click.echo()
+    ctx.obj['api_client'].test_api_key()
     click.echo('Credentials still valid.')
 
 
@@ -73,4 +76,5 @@ def logout(ctx):
         ctx.exit(code=exit_codes.OTHER_FAILURE)
     else:
         delete_user()
+        delete_cache()
         click.echo('Logged out.')
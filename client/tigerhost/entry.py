@@ -2,58 +2,101 @@ import click
 
 from click_extensions import private_dir
 from click_extensions.commands import bash_complete_command
+from click_extensions.decorators import ensure_obj
 
 import tigerhost
 
-from tigerhost import settings
-from tigerhost.commands import access, addons, apps, config, domains, git, keys, backends, run_command, logs
-from tigerhost.commands.user import login, user_info, logout
+from tigerhost import cache, settings
+from tigerhost.utils.lazy_group import LazyGroup
 
 
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
 
 
-@click.group(context_settings=CONTEXT_SETTINGS)
+@click.group(cls=LazyGroup, context_settings=CONTEXT_SETTINGS)
 @click.version_option(version=tigerhost.__version__, prog_name='TigerHost')
-def entry():
+@click.option('--no-cache', is_flag=True, help='Don\'t use or update the local cache of server data.')
+@click.option('--refresh', is_flag=True, help='Fetch fresh server data and update the local cache.')
+@ensure_obj
+@click.pass_context
+def entry(ctx, no_cache, refresh):
     private_dir.ensure_private_dir_exists(settings.APP_NAME)
+    if no_cache:
+        ctx.obj['cache_mode'] = cache.NO_CACHE
+    elif refresh:
+        ctx.obj['cache_mode'] = cache.REFRESH
 
 entry.add_command(bash_complete_command(settings.APP_NAME))
 
-entry.add_command(login)
-entry.add_command(logout)
-entry.add_command(user_info, name='user:info')
-
-entry.add_command(apps.list_apps, name='apps')
-entry.add_command(apps.create_app, name='create')
-entry.add_command(apps.destroy_app, name='apps:destroy')
-entry.add_command(apps.transfer_app, name='apps:transfer')
-
-entry.add_command(access.get_users, name='access')
-entry.add_command(access.add_access, name='access:add')
-entry.add_command(access.remove_access, name='access:remove')
-
-entry.add_command(addons.list_addons, name='addons')
-entry.add_command(addons.create_addon, name='addons:create')
-entry.add_command(addons.wait_addon, name='addons:wait')
-entry.add_command(addons.delete_addon, name='addons:destroy')
-
-entry.add_command(config.list_config, name='config')
-entry.add_command(config.set_config, name='config:set')
-entry.add_command(config.unset_config, name='config:unset')
-
-entry.add_command(domains.list_domains, name='domains')
-entry.add_command(domains.add_domain, name='domains:add')
-entry.add_command(domains.remove_domain, name='domains:remove')
-
-entry.add_command(logs.get_logs, name='logs')
-
-entry.add_command(run_command.run_one_off, name='run')
-
-entry.add_command(git.add_remote, name='git:remote')
-
-entry.add_command(backends.list_backends, name='backends')
-
-entry.add_command(keys.add_key, name='keys:add')
-entry.add_command(keys.list_keys, name='keys')
-entry.add_command(keys.remove_key, name='keys:remove')
+# The command modules pull in requests, subprocess32 and wsse, so they are
+# only imported when their command runs. The short help is repeated here
+# so that --help does not import them either.
+entry.add_lazy_command('tigerhost.commands.user.login', 'login',
+                       'Logs the user in by asking for username and...')
+entry.add_lazy_command('tigerhost.commands.user.logout', 'logout',
+                       'Log the user out, deleting the API key.')
+entry.add_lazy_command('tigerhost.commands.user.user_info', 'user:info',
+                       'Display information about the logged in user.')
+
+entry.add_lazy_command('tigerhost.commands.apps.list_apps', 'apps',
+                       'List apps for this user.')
+entry.add_lazy_command('tigerhost.commands.apps.create_app', 'create',
+                       'Create a new app with the specified NAME.')
+entry.add_lazy_command('tigerhost.commands.apps.destroy_app', 'apps:destroy',
+                       'Delete the current application.')
+entry.add_lazy_command('tigerhost.commands.apps.transfer_app', 'apps:transfer',
+                       'Transfer the ownership of this app to another...')
+
+entry.add_lazy_command('tigerhost.commands.access.get_users', 'access',
+                       'List the users with access to this app')
+entry.add_lazy_command('tigerhost.commands.access.add_access', 'access:add',
+                       'Add a user as a collaborator to this app')
+entry.add_lazy_command('tigerhost.commands.access.remove_access', 'access:remove',
+                       'Remove a collaborator from this app')
+
+entry.add_lazy_command('tigerhost.commands.addons.list_addons', 'addons',
+                       'List addons installed for this app.')
+entry.add_lazy_command('tigerhost.commands.addons.create_addon', 'addons:create',
+                       'Create a new addon for this app.')
+entry.add_lazy_command('tigerhost.commands.addons.clone_addon', 'addons:clone',
+                       'Create a new addon with a copy of an existing...')
+entry.add_lazy_command('tigerhost.commands.addons.wait_addon', 'addons:wait',
+                       'Waits until an addon becomes ready to use.')
+entry.add_lazy_command('tigerhost.commands.addons.delete_addon', 'addons:destroy',
+                       'Delete an addon from this app.')
+
+entry.add_lazy_command('tigerhost.commands.config.list_config', 'config',
+                       'List the config variables for this app.')
+entry.add_lazy_command('tigerhost.commands.config.set_config', 'config:set',
+                       'Set config variables.')
+entry.add_lazy_command('tigerhost.commands.config.unset_config', 'config:unset',
+                       'Unset config variables.')
+
+entry.add_lazy_command('tigerhost.commands.domains.list_domains', 'domains',
+                       'List the domains associated with this app.')
+entry.add_lazy_command('tigerhost.commands.domains.add_domain', 'domains:add',
+                       'Add a new domain to this application')
+entry.add_lazy_command('tigerhost.commands.domains.remove_domain', 'domains:remove',
+                       'Remove a domain from this application')
+
+entry.add_lazy_command('tigerhost.commands.logs.get_logs', 'logs',
+                       'Display the application logs.')
+
+entry.add_lazy_command('tigerhost.commands.run_command.run_one_off', 'run',
+                       'Run a one-off command for this application.')
+
+entry.add_lazy_command('tigerhost.commands.git.add_remote', 'git:remote',
+                       'Add a git remote to an app repo.')
+
+entry.add_lazy_command('tigerhost.commands.backends.list_backends', 'backends',
+                       'Show the list of backends for this user.')
+
+entry.add_lazy_command('tigerhost.commands.keys.add_key', 'keys:add',
+                       'Add a public key.')
+entry.add_lazy_command('tigerhost.commands.keys.list_keys', 'keys',
+                       'Show the list of keys for this user.')
+entry.add_lazy_command('tigerhost.commands.keys.remove_key', 'keys:remove',
+                       'Removes the key with label NAME.')
+
+entry.add_lazy_command('tigerhost.commands.bulk.run_bulk', 'bulk',
+                       'Run operations on many apps at once.')
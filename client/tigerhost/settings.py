@@ -1,2 +1,24 @@
 API_SERVER_URL = 'http://tigerhostapp.com'
 APP_NAME = 'tigerhost'
+
+# how long cached server data stays valid, in seconds
+CACHE_TTL_APPS = 5 * 60
+CACHE_TTL_BACKENDS = 24 * 60 * 60
+CACHE_TTL_GIT_REMOTE = 24 * 60 * 60
+
+# addons:wait asks the server to wait this long for the addon's state to
+# change, in seconds, and asks again right away when it did. If the server
+# answers much sooner without a change, it polls with exponential backoff
+# instead, starting at ADDON_WAIT_BACKOFF_BASE
+ADDON_WAIT_TIMEOUT = 25
+ADDON_WAIT_BACKOFF_BASE = 1
+
+# bulk sends at most this many operations per request, the server's limit
+BULK_CHUNK_SIZE = 50
+
+# run asks the server for more output this many seconds after the last
+# answer ended before the command was done
+RUN_OUTPUT_RETRY_DELAY = 2
+# and gives up waiting for the command after this many seconds, a bit
+# longer than the server lets it run
+RUN_OUTPUT_MAX_TIME = 65 * 60
@@ -7,6 +7,7 @@ from functools import update_wrapper
 
 from tigerhost import settings
 from tigerhost.api_client import ApiClient, ApiClientAuthenticationError
+from tigerhost.cache import Cache, NORMAL
 from tigerhost.user import load_user, has_saved_user
 from tigerhost.vcs.base import CommandError
 from tigerhost.vcs.git import GitVcs
@@ -36,7 +37,9 @@ def store_vcs(f):
 def store_user(f):
     """A decorator that store the user object in context.obj.
 
-    If the user does not exist, then exit with an error message
+    If the user does not exist, then exit with an error message.
+    The credentials are not checked up front, but if the server
+    rejects them, exit with an error message too.
     """
     @click.pass_context
     @ensure_obj
@@ -48,20 +51,13 @@ def store_user(f):
                 app_name=settings.APP_NAME))
             ctx.exit(code=exit_codes.OTHER_FAILURE)
         else:
-            user = load_user()
-            client = ApiClient(
-                api_server_url=settings.API_SERVER_URL,
-                username=user.username,
-                api_key=user.api_key,
-            )
+            ctx.obj['user'] = load_user()
             try:
-                client.test_api_key()
+                return ctx.invoke(f, *args, **kwargs)
             except ApiClientAuthenticationError:
                 click.echo(
                     'Credentials no longer valid. Please run `{app_name} login` again.'.format(app_name=settings.APP_NAME))
                 ctx.exit(code=exit_codes.OTHER_FAILURE)
-            ctx.obj['user'] = user
-            return ctx.invoke(f, *args, **kwargs)
     return update_wrapper(new_func, f)
 
 
@@ -85,6 +81,23 @@ def store_api_client(f):
     return update_wrapper(new_func, f)
 
 
+def store_cache(f):
+    """A decorator that stores the cache of the logged in user
+    in context.obj. The cache mode comes from context.obj['cache_mode'],
+    set by the --no-cache and --refresh options.
+    """
+    @store_user
+    @click.pass_context
+    @ensure_obj
+    def new_func(ctx, *args, **kwargs):
+        if 'cache' in ctx.obj:
+            return ctx.invoke(f, *args, **kwargs)
+        ctx.obj['cache'] = Cache(
+            ctx.obj['user'].username, mode=ctx.obj.get('cache_mode', NORMAL))
+        return ctx.invoke(f, *args, **kwargs)
+    return update_wrapper(new_func, f)
+
+
 def store_app(f):
     """A decorator that stores the app name in context.obj
 
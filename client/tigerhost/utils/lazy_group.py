@@ -0,0 +1,52 @@
+import click
+import importlib
+
+
+class LazyGroup(click.Group):
+    """A click group that imports the module of a command only when the
+    command is used. Listing the commands, e.g. for ``--help`` or bash
+    completion, does not import anything.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(LazyGroup, self).__init__(*args, **kwargs)
+        # name => (import path, short help)
+        self.lazy_commands = {}
+
+    def add_lazy_command(self, import_path, name, short_help):
+        """Register a command without importing it.
+
+        :param str import_path: the dotted path to the command,
+            like tigerhost.commands.apps.list_apps
+        :param str name: the name of the command
+        :param str short_help: the help shown in the list of commands.
+            This must match the command's own short help.
+        """
+        self.lazy_commands[name] = (import_path, short_help)
+
+    def list_commands(self, ctx):
+        return sorted(set(self.commands) | set(self.lazy_commands))
+
+    def get_command(self, ctx, name):
+        if name not in self.commands and name in self.lazy_commands:
+            module_name, attr = self.lazy_commands[name][0].rsplit('.', 1)
+            module = importlib.import_module(module_name)
+            self.commands[name] = getattr(module, attr)
+        return self.commands.get(name)
+
+    def format_commands(self, ctx, formatter):
+        """Same as :code:`click.MultiCommand.format_commands`, but takes the
+        help of the commands not imported yet from :code:`lazy_commands`.
+        """
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in self.commands:
+                cmd = self.commands[name]
+                if getattr(cmd, 'hidden', False):
+                    continue
+                rows.append((name, cmd.short_help or ''))
+            else:
+                rows.append((name, self.lazy_commands[name][1]))
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
@@ -202,6 +202,52 @@ class WSSETokenBuilder(object):
     return str_fields
 
 
+class PrecomputedWSSETokenBuilder(object):
+
+  def __init__(self, username, password, drift_seconds = 10, nonce_length = 16):
+    """
+    Create a token builder for many requests with the same `username`
+    and `password`. The tokens are the same as `WSSETokenBuilder`'s,
+    but the parts that never change are built once, the timestamp is
+    formatted once per second, and the nonce is `nonce_length` random
+    bytes from `os.urandom`, used as is instead of base64-encoded first.
+    """
+    if isinstance(password, unicode):
+      # the raw nonce is not ASCII, so the password can't stay unicode
+      password = password.encode('utf-8')
+    self.__password = password
+    self.__drift_seconds = drift_seconds
+    self.__nonce_length = nonce_length
+    self.__prefix = 'Username="%s", PasswordDigest="' % username
+    self.__second = None
+    self.__timestamp = None
+
+  def __get_timestamp(self):
+    """
+    The current UTC time minus the drift, like `WSSETokenBuilder`'s,
+    formatted only when the second changes.
+    """
+    second = int(time.time()) - self.__drift_seconds
+    if second != self.__second:
+      # assign the timestamp first, in case another thread reads them
+      self.__timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ",
+                                       time.gmtime(second))
+      self.__second = second
+    return self.__timestamp
+
+  def make_token(self):
+    """
+    Create a WSSE token, in the same format as
+    `WSSETokenBuilder.make_token`.
+    """
+    timestamp = self.__get_timestamp()
+    nonce = os.urandom(self.__nonce_length)
+    digest = hashlib.sha256(nonce + timestamp + self.__password).digest()
+    return (self.__prefix + base64.b64encode(digest) +
+            '", Nonce="' + base64.b64encode(nonce) +
+            '", Created="' + timestamp + '"')
+
+
 def make_token(username, password, profile = None):
   """
   Create a UsernameToken token for the given combination of `username`
@@ -411,12 +457,15 @@ try:
     if several requests will be made with the same username+password pair.
     """
 
-    def __init__(self, username, password):
+    def __init__(self, username, password, preempt = False):
       self.username = username
       self.password = password
+      self.preempt = preempt
       self.chal = {}
       self.pos = None
       self.num_401_calls = 1
+      if preempt:
+        self.__builder = PrecomputedWSSETokenBuilder(username, password)
 
     def handle_redirect(self, r, **kwargs):
       """Reset num_401_calls counter on redirects."""
@@ -472,6 +521,11 @@ try:
             # file position of the previous body. Ensure it's set to
             # None.
             self.pos = None
+        if self.preempt:
+          # send the token right away, instead of waiting for the
+          # server's challenge, saving a round trip per request
+          r.headers['Authorization'] = 'WSSE profile="UsernameToken"'
+          r.headers['X-WSSE'] = 'UsernameToken ' + self.__builder.make_token()
         r.register_hook('response', self.handle_401)
         r.register_hook('response', self.handle_redirect)
         return r
@@ -1,4 +1,3 @@
-import boto3
 import click
 import subprocess32 as subprocess
 
@@ -6,6 +5,7 @@ from click_extensions import echo_heading
 from click_extensions.decorators import print_markers
 
 from deploy import docker_machine, settings
+from deploy.utils import aws
 from deploy.utils.decorators import ensure_project_path, require_docker_machine, require_docker_compose, option_hosted_zone_id
 from deploy.utils.utils import random_string
 
@@ -36,7 +36,7 @@ def create(elastic_ip_id, email, rds_database, secret, hosted_zone_id):
     if elastic_ip_id is None:
         if not settings.DEBUG:
             echo_heading('Allocating a new Elastic IP.', marker='-', marker_color='magenta')
-            client = boto3.client('ec2')
+            client = aws.client('ec2')
             elastic_ip_id = client.allocate_address(Domain='vpc')['AllocationId']
             click.echo('Done. Allocation ID: {}'.format(elastic_ip_id))
         else:
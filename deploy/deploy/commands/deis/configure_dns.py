@@ -1,10 +1,10 @@
-import boto3
 import click
 
 from click_extensions import echo_heading
 from click_extensions.decorators import print_markers
 
 from deploy import settings
+from deploy.utils import aws
 from deploy.utils.decorators import option_hosted_zone_id, skip_if_debug
 
 
@@ -19,7 +19,7 @@ def configure_dns(stack, hosted_zone_id):
     This points *.tigerhostapp.com to Deis.
     """
     echo_heading('Creating A record.', marker='-', marker_color='magenta')
-    cloudformation = boto3.resource('cloudformation')
+    cloudformation = aws.resource('cloudformation')
     stack_instance = cloudformation.Stack(stack)
 
     dns_name = None
@@ -30,13 +30,13 @@ def configure_dns(stack, hosted_zone_id):
 
     # TODO this fails on accounts with more than 400 load balancers
     elb_hosted_zone_id = None
-    elb_client = boto3.client('elb')
+    elb_client = aws.client('elb')
     for x in elb_client.describe_load_balancers()['LoadBalancerDescriptions']:
         if x['DNSName'] == dns_name:
             elb_hosted_zone_id = x['CanonicalHostedZoneNameID']
     assert elb_hosted_zone_id is not None
 
-    client = boto3.client('route53')
+    client = aws.client('route53')
     client.change_resource_record_sets(
         HostedZoneId=hosted_zone_id,
         ChangeBatch={
@@ -1,4 +1,3 @@
-import boto3
 import click
 import os
 import subprocess32 as subprocess
@@ -8,7 +7,7 @@ from click_extensions.decorators import print_markers
 
 from deploy import settings
 from deploy.project import get_project_path
-from deploy.utils import path_utils
+from deploy.utils import aws, path_utils
 from deploy.utils.decorators import ensure_project_path, ensure_key_pair, skip_if_debug, ensure_deisctl_exists
 
 
@@ -29,7 +28,7 @@ def create(stack):
         click.echo('Provisioning machines.')
         with contextmanagers.chdir('contrib/aws'):
             subprocess.check_call(['./provision-aws-cluster.sh', stack])
-        ec2 = boto3.resource('ec2')
+        ec2 = aws.resource('ec2')
         instances = ec2.instances.filter(
             Filters=[
                 {
@@ -1,10 +1,10 @@
-import boto3
 import click
 
 from click_extensions import echo_heading
 from click_extensions.decorators import print_markers
 
 from deploy import settings
+from deploy.utils import aws
 from deploy.utils.decorators import option_hosted_zone_id, skip_if_debug
 
 
@@ -19,8 +19,8 @@ def configure_dns(elastic_ip_id, hosted_zone_id):
     This points tigerhost.com (not a subdomain) to the main server
     """
     echo_heading('Creating A record.', marker='-', marker_color='magenta')
-    ec2 = boto3.resource('ec2')
-    client = boto3.client('route53')
+    ec2 = aws.resource('ec2')
+    client = aws.client('route53')
     client.change_resource_record_sets(
         HostedZoneId=hosted_zone_id,
         ChangeBatch={
@@ -1,4 +1,3 @@
-import boto3
 import click
 import json
 import os
@@ -11,7 +10,7 @@ from click_extensions.decorators import print_markers
 from deploy import docker_machine, settings
 from deploy.project import get_project_path
 from deploy.secret import store
-from deploy.utils import path_utils
+from deploy.utils import aws, path_utils
 from deploy.utils.decorators import ensure_project_path, require_docker_machine, require_docker_compose
 from deploy.utils.utils import parse_shell_for_exports, set_aws_security_group_ingress_rule
 
@@ -19,7 +18,8 @@ from deploy.utils.utils import parse_shell_for_exports, set_aws_security_group_i
 def _generate_compose_file(project_path, database_url, addon_docker_host, secret):
     with open(os.path.join(project_path, 'docker-compose.prod.template.yml'), 'r') as f:
         data = yaml.safe_load(f)
-    for d in (data['services']['web'], data['services']['worker']):
+    for name in ('web', 'worker', 'run_worker', 'beat'):
+        d = data['services'][name]
         d['environment']['DOCKER_HOST'] = addon_docker_host
         d['environment']['DATABASE_URL'] = database_url
         d['environment']['SECRET'] = secret
@@ -28,7 +28,7 @@ def _generate_compose_file(project_path, database_url, addon_docker_host, secret
 
 
 def _associate_elastic_ip(machine_name, elastic_ip_id):
-    ec2 = boto3.resource('ec2')
+    ec2 = aws.resource('ec2')
     instance = list(ec2.instances.filter(Filters=[
         {
             'Name': 'tag:Name',
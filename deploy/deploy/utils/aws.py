@@ -0,0 +1,43 @@
+import boto3
+import threading
+
+# one client and one resource per service, shared by the whole process
+_clients = {}
+_resources = {}
+_lock = threading.Lock()
+
+
+def client(service_name):
+    """Get the boto3 client for this service. The client is created
+    on first use and reused afterwards, along with its connections.
+
+    :param str service_name: e.g. 'ec2'
+
+    :rtype: botocore.client.BaseClient
+    """
+    with _lock:
+        if service_name not in _clients:
+            _clients[service_name] = boto3.client(service_name)
+        return _clients[service_name]
+
+
+def resource(service_name):
+    """Get the boto3 resource for this service. The resource is created
+    on first use and reused afterwards, along with its connections.
+
+    :param str service_name: e.g. 'ec2'
+
+    :rtype: boto3.resources.base.ServiceResource
+    """
+    with _lock:
+        if service_name not in _resources:
+            _resources[service_name] = boto3.resource(service_name)
+        return _resources[service_name]
+
+
+def reset():
+    """Forget all cached clients and resources.
+    """
+    with _lock:
+        _clients.clear()
+        _resources.clear()
@@ -1,4 +1,3 @@
-import boto3
 import botocore
 import click
 import os
@@ -13,7 +12,7 @@ from click_extensions import echo_heading, exit_codes, private_dir
 
 from deploy import settings
 from deploy.project import get_project_path, save_project_path, default_project_path, clone_project
-from deploy.utils import click_utils, path_utils, utils
+from deploy.utils import aws, click_utils, path_utils, utils
 
 
 def ensure_project_path(f):
@@ -94,7 +93,7 @@ def option_hosted_zone_id(f):
         """
         if hosted_zone_id is None:
             echo_heading('Trying to find hosted zone for {}.'.format(settings.DOMAIN_NAME), marker='-', marker_color='magenta')
-            client = boto3.client('route53')
+            client = aws.client('route53')
             response = client.list_hosted_zones_by_name(
                 DNSName=settings.DOMAIN_NAME
             )
@@ -121,7 +120,7 @@ def ensure_key_pair(name):
     def decorator(old_func):
         @click.pass_context
         def new_func(ctx, *args, **kwargs):
-            ec2 = boto3.resource('ec2')
+            ec2 = aws.resource('ec2')
             key_path = os.path.expanduser(_ssh_path(name))
             exists_on_aws = True
             key_pair = ec2.KeyPair(name)
@@ -139,7 +138,7 @@ def ensure_key_pair(name):
                 click.confirm('Create a new key on AWS and save it?',
                               default=True, abort=True)
                 key_pair.delete()
-                client = boto3.client('ec2')
+                client = aws.client('ec2')
                 key_info = client.create_key_pair(KeyName=name)
                 with open(key_path, 'w') as f:
                     f.write(key_info['KeyMaterial'])
@@ -152,7 +151,7 @@ def ensure_key_pair(name):
                         key_path), default=True, abort=True)
                     with open(key_path + '.pub', 'r') as f:
                         public_key = f.read()
-                    client = boto3.client('ec2')
+                    client = aws.client('ec2')
                     client.import_key_pair(
                         KeyName=name,
                         PublicKeyMaterial=public_key,
@@ -1,9 +1,10 @@
-import boto3
 import os
 import random
 import string
 import sys
 
+from deploy.utils import aws
+
 
 def random_string(length, allowed_chars=string.ascii_letters + string.digits):
     rand = random.SystemRandom()
@@ -48,7 +49,7 @@ def set_aws_security_group_ingress_rule(group_name, fromPort, toPort, cidrIp):
     :param int toPort:
     :param str cidrIp:
     """
-    ec2 = boto3.resource('ec2')
+    ec2 = aws.resource('ec2')
     group = list(ec2.security_groups.filter(
         GroupNames=[group_name]).limit(1))[0]
     found = False
@@ -8,6 +8,7 @@ from click_extensions import private_dir
 
 from deploy import settings
 from deploy.secret.secret_dir import ensure_secret_dir_exists
+from deploy.utils import aws
 
 
 @pytest.yield_fixture(scope='function', autouse=True)
@@ -29,6 +30,13 @@ def ensure_secret_dir(fake_private_dir):
     ensure_secret_dir_exists()
 
 
+@pytest.yield_fixture(scope='function', autouse=True)
+def reset_aws():
+    aws.reset()
+    yield
+    aws.reset()
+
+
 @pytest.yield_fixture(scope='function')
 def runner():
     runner = CliRunner()
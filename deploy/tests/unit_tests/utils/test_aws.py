@@ -0,0 +1,29 @@
+import mock
+
+from deploy.utils import aws
+
+
+def test_client_reused():
+    with mock.patch('boto3.client') as mocked:
+        mocked.side_effect = lambda name: mock.Mock()
+        client = aws.client('ec2')
+        assert aws.client('ec2') is client
+        assert aws.client('route53') is not client
+    assert mocked.call_count == 2
+    mocked.assert_any_call('ec2')
+    mocked.assert_any_call('route53')
+
+
+def test_resource_reused():
+    with mock.patch('boto3.resource') as mocked:
+        resource = aws.resource('ec2')
+        assert aws.resource('ec2') is resource
+    mocked.assert_called_once_with('ec2')
+
+
+def test_reset():
+    with mock.patch('boto3.client') as mocked:
+        aws.client('ec2')
+        aws.reset()
+        aws.client('ec2')
+    assert mocked.call_count == 2
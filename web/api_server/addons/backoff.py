@@ -0,0 +1,62 @@
+import math
+import random
+
+from django.conf import settings
+
+
+def get_provision_timeout(provider):
+    """Get how long to wait for this provider's provision to complete.
+
+    :param api_server.addons.providers.base_provider.BaseAddonProvider provider:
+
+    :rtype: float
+    :returns: the timeout, in seconds
+    """
+    if provider.provision_timeout is not None:
+        return provider.provision_timeout
+    return settings.ADDON_PROVISION_TIMEOUT
+
+
+def provision_check_delay(attempt, elapsed, expected_time=0, min_delay=0):
+    """Get how long to wait before checking on provision again.
+
+    Until the expected provision time has passed, wait for the rest of
+    it in one go. After that, back off exponentially, with jitter so
+    addons that started together don't all get checked together.
+
+    :param int attempt: how many times provision has been checked already
+    :param float elapsed: seconds since provision started
+    :param float expected_time: how long the provider expects provision
+        to take, in seconds
+    :param float min_delay: the delay the provider asked for, if any.
+        We never check sooner than this.
+
+    :rtype: float
+    :returns: the delay, in seconds
+    """
+    if elapsed < expected_time:
+        delay = expected_time - elapsed
+    else:
+        delay = min(settings.ADDON_PROVISION_BACKOFF_MAX,
+                    settings.ADDON_PROVISION_BACKOFF_BASE * 2 ** attempt)
+        delay = delay / 2.0 + random.uniform(0, delay / 2.0)
+    return max(delay, min_delay or 0)
+
+
+def provision_check_attempt(elapsed, expected_time=0):
+    """Estimate how many times provision has been checked with backoff,
+    for callers that don't count the checks, like the bulk driver. This
+    assumes each check came right on time after the one before it.
+
+    :param float elapsed: seconds since provision started
+    :param float expected_time: how long the provider expects provision
+        to take, in seconds
+
+    :rtype: int
+    :returns: the attempt, to pass to :py:func:`provision_check_delay`
+    """
+    base = settings.ADDON_PROVISION_BACKOFF_BASE
+    if elapsed <= expected_time or base <= 0:
+        return 0
+    # checks after the expected time are base * (2 ** n - 1) seconds in
+    return int(math.log((elapsed - expected_time) / float(base) + 1, 2))
@@ -0,0 +1,127 @@
+"""Tell requests waiting on an addon that its state changed.
+
+:py:meth:`StateMachineManager.transition` calls :py:func:`notify_state_changed`
+once the new state is committed, and the long-polling addon details view
+waits on a listener. Without ``ADDON_STATE_NOTIFY_URL``, only waiters in
+the same process are woken, so waiters also check the database every
+``ADDON_WAIT_POLL_INTERVAL`` seconds to see transitions made by workers.
+"""
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+class LocalStateNotifier(object):
+    """Wakes waiters in this process only.
+    """
+
+    def __init__(self):
+        self._events = defaultdict(set)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def listen(self, addon_id):
+        """Listen for state changes of an addon. Changes that happen
+        after entering the block are not missed, even if they happen
+        before :code:`wait` is called.
+
+        :param int addon_id:
+
+        :returns: a function taking a timeout in seconds, that returns
+            True if the state changed since the last call, False on timeout
+        """
+        event = threading.Event()
+        with self._lock:
+            self._events[addon_id].add(event)
+
+        def wait(timeout):
+            changed = event.wait(timeout)
+            event.clear()
+            return changed
+
+        try:
+            yield wait
+        finally:
+            with self._lock:
+                self._events[addon_id].discard(event)
+                if not self._events[addon_id]:
+                    del self._events[addon_id]
+
+    def notify(self, addon_id):
+        """Wake everyone listening to this addon.
+
+        :param int addon_id:
+        """
+        with self._lock:
+            for event in self._events.get(addon_id, ()):
+                event.set()
+
+
+class RedisStateNotifier(object):
+    """Wakes waiters in all processes, using redis pub/sub.
+    """
+
+    def __init__(self, url, prefix='addon:state:'):
+        """
+        :param str url: the redis URL, like redis://localhost:6379/1
+        :param str prefix: the prefix of the redis channels
+        """
+        import redis
+        self.prefix = prefix
+        self._redis = redis.StrictRedis.from_url(url)
+
+    @contextmanager
+    def listen(self, addon_id):
+        """Same as :py:meth:`LocalStateNotifier.listen`.
+
+        :param int addon_id:
+        """
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.prefix + str(addon_id))
+
+        def wait(timeout):
+            return pubsub.get_message(timeout=timeout) is not None
+
+        try:
+            yield wait
+        finally:
+            pubsub.close()
+
+    def notify(self, addon_id):
+        """Wake everyone listening to this addon.
+
+        :param int addon_id:
+        """
+        self._redis.publish(self.prefix + str(addon_id), 1)
+
+
+_notifier = None
+_notifier_lock = threading.Lock()
+
+
+def get_state_notifier():
+    """Get this process's notifier. It uses redis if
+    ``ADDON_STATE_NOTIFY_URL`` is set, otherwise memory.
+
+    :rtype: LocalStateNotifier or RedisStateNotifier
+    """
+    global _notifier
+    if _notifier is None:
+        with _notifier_lock:
+            if _notifier is None:
+                url = getattr(settings, 'ADDON_STATE_NOTIFY_URL', None)
+                if url:
+                    _notifier = RedisStateNotifier(url)
+                else:
+                    _notifier = LocalStateNotifier()
+    return _notifier
+
+
+def notify_state_changed(addon_id):
+    """Wake the requests waiting for this addon's state to change.
+
+    :param int addon_id:
+    """
+    get_state_notifier().notify(addon_id)
@@ -1,6 +1,21 @@
+from api_server.addons.providers.exceptions import AddonProviderInvalidOperationError
+
+
 class BaseAddonProvider(object):
     """The base class for all addon providers."""
 
+    # how long provision usually takes, in seconds. Provision is not
+    # checked on again until this much time has passed
+    expected_provision_time = 0
+
+    # give up on provision and move the addon to the error state after
+    # this many seconds. None means settings.ADDON_PROVISION_TIMEOUT
+    provision_timeout = None
+
+    # True if provision is complete as soon as begin_provision returns.
+    # The addon is then provisioned and configured in a single task
+    synchronous = False
+
     def begin_provision(self, app_id):
         """Kick off the provision process and return a UUID
         for the new addon. This method MUST return immediately.
@@ -30,9 +45,9 @@ class BaseAddonProvider(object):
         :rtype: tuple
         :return: (bool, int) - The first value should be True if provision is
             complete. The second value is an optional value to
-            tell the server how long (in seconds) to wait before
-            checking in again. Note that this is only looked at
-            if the first value is False
+            tell the server the minimum time (in seconds) to wait before
+            checking in again, on top of the server's own backoff.
+            Note that this is only looked at if the first value is False
 
         :raises api_server.addons.providers.exceptions.AddonProviderError: If provision failed.
         """
@@ -78,3 +93,21 @@ class BaseAddonProvider(object):
             If deprovision cannot start, or if it has already started.
         """
         raise NotImplementedError
+
+    def clone(self, uuid, app_id):
+        """Kick off the provision process for a new addon that starts out
+        as a copy of an existing addon. This method MUST return immediately.
+        Providers that cannot clone do not need to override this.
+
+        :param uuid.UUID uuid: The UUID of the addon to clone, returned from :py:meth:`begin_provision`
+        :param str app_id: the ID of the app that the new addon will be for
+
+        :rtype: dict
+        :return: Same as :py:meth:`begin_provision`
+
+        :raises api_server.addons.providers.exceptions.AddonProviderInvalidOperationError:
+            If this provider does not support cloning.
+        :raises api_server.addons.providers.exceptions.AddonProviderError: If the resource cannot be allocated.
+        """
+        raise AddonProviderInvalidOperationError(
+            'This addon does not support cloning.')
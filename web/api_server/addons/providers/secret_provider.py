@@ -9,6 +9,7 @@ class SecretAddonProvider(BaseAddonProvider):
     key and store it in the environmental variable SECRET_KEY"""
 
     config_name = 'SECRET_KEY'
+    synchronous = True
 
     def _get_config_name(self, config_customization=None):
         if config_customization is None:
@@ -1,7 +1,15 @@
+import logging
+
+from celery.exceptions import Retry
 from contextlib import contextmanager
+from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 
 from api_server.addons.event import AddonEvent
+from api_server.addons.notifications import notify_state_changed
+from api_server.addons.providers.exceptions import AddonProviderError
+from api_server.addons.providers.utils import get_provider_from_provider_name
 from api_server.addons.state import AddonState
 from api_server.celery import app
 from api_server.models import Addon
@@ -23,6 +31,12 @@ def _continue_state_machine(addon_id):
     state_machine_manager.start_task(addon_id)
 
 
+@app.task
+def _run_state_machine(addon_id):
+    state_machine_manager = StateMachineManager()
+    state_machine_manager.run_tasks(addon_id)
+
+
 class StateMachineManager(object):
 
     def __init__(self):
@@ -54,6 +68,13 @@ class StateMachineManager(object):
             AddonState.error_should_deprovision: deprovision,
         }
 
+        # how long to wait before running the task, in seconds. set_config
+        # waits so the configs of addons attached together are set together,
+        # see _get_countdown
+        self.countdown_table = {
+            AddonState.provisioned: settings.ADDON_CONFIG_BATCH_WINDOW,
+        }
+
     def _transition_helper(self, addon, event):
         """Transition to a different state. Doesn't actually save.
 
@@ -68,6 +89,7 @@ class StateMachineManager(object):
             raise StateMachineTransitionError(
                 'Invalid transition for state {} with event {}.'.format(addon.state.name, event.name))
         addon.state = final_state
+        addon.state_changed_at = timezone.now()
 
     @contextmanager
     def transition(self, addon_id, event):
@@ -81,6 +103,9 @@ class StateMachineManager(object):
         If the transition is  invalid, the yield still
         happens, but the result will be rolled back.
 
+        Once the new state is committed, requests waiting on the
+        addon are woken.
+
         :param int addon_id: the addon ID
         :param AddonEvent event: the event that triggered this transition
 
@@ -95,14 +120,101 @@ class StateMachineManager(object):
             yield addon
             self._transition_helper(addon, event)
             addon.save()
+            transaction.on_commit(lambda: notify_state_changed(addon_id))
 
-    def start_task(self, addon_id):
+    def start_task(self, addon_id, synchronous=None):
         """Kick off a task for this addon, if necessary.
 
-        Uses the tasks table.
+        Uses the tasks table. If the addon's provider is synchronous,
+        all the remaining tasks are run in one task instead. Otherwise,
+        if settings.ADDON_BULK_DRIVER is set, nothing is started, the
+        periodic advance_addons task takes care of the addon.
 
         :param Addon addon: the addon to start a task for
+        :param bool synchronous: whether to run all the tasks in one task.
+            By default, this is decided by the provider.
+        """
+        addon = Addon.objects.get(pk=addon_id)
+        if addon.state not in self.tasks_table:
+            return
+        if synchronous is None:
+            synchronous = self._is_synchronous(addon)
+        if synchronous:
+            _run_state_machine.delay(addon.id)
+        elif settings.ADDON_BULK_DRIVER:
+            # the periodic advance_addons task picks it up
+            return
+        else:
+            options = {'link': _continue_state_machine.s()}
+            countdown = self._get_countdown(addon)
+            if countdown:
+                options['countdown'] = countdown
+            self.tasks_table[addon.state].apply_async((addon.id,), **options)
+
+    def _get_countdown(self, addon):
+        """Get how long to wait before running the task for this addon.
+
+        The wait only helps if another addon of the same app is still
+        being provisioned, and could have its config set along with this
+        one. Otherwise, the task runs right away.
+
+        :param api_server.models.Addon addon:
+
+        :rtype: int
+        :returns: the countdown in seconds, 0 to run right away
+        """
+        countdown = self.countdown_table.get(addon.state, 0)
+        if countdown and addon.app_id is not None:
+            pending = Addon.objects.filter(
+                app_id=addon.app_id,
+                state=AddonState.waiting_for_provision,
+            ).exclude(pk=addon.pk).exists()
+            if pending:
+                return countdown
+        return 0
+
+    def _is_synchronous(self, addon):
+        """Check if the addon's provider is synchronous.
+
+        :param api_server.models.Addon addon:
+
+        :rtype: bool
+        """
+        try:
+            provider = get_provider_from_provider_name(addon.provider_name)
+        except AddonProviderError:
+            # let the task deal with it
+            return False
+        return provider.synchronous
+
+    def run_tasks(self, addon_id):
+        """Run the tasks for this addon one after another in this process,
+        until the addon reaches a state without a task. This is how addons
+        of synchronous providers go from provision to ready in one task.
+
+        If a task asks to be retried, or should wait before running
+        (see :py:meth:`_get_countdown`), fall back to :py:meth:`start_task`.
+
+        :param int addon_id: the addon ID
         """
+        logger = logging.getLogger(__name__)
         addon = Addon.objects.get(pk=addon_id)
-        if addon.state in self.tasks_table:
-            self.tasks_table[addon.state].apply_async((addon.id,), link=_continue_state_machine.s())
+        state = addon.state
+        while state in self.tasks_table:
+            if self._get_countdown(addon):
+                self.start_task(addon_id, synchronous=False)
+                return
+            try:
+                self.tasks_table[state](addon_id)
+            except Retry:
+                logger.warning('Addon ID {addon_id}: Task for state {state} needs to be retried, running it asynchronously.'.format(
+                    addon_id=addon_id,
+                    state=state,
+                ))
+                self.start_task(addon_id, synchronous=False)
+                return
+            addon = Addon.objects.get(pk=addon_id)
+            if addon.state is state:
+                # the task didn't do anything, don't loop forever
+                return
+            state = addon.state
@@ -1,10 +1,18 @@
+import datetime
 import logging
 
+from collections import defaultdict
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from api_server.addons.backoff import get_provision_timeout, provision_check_attempt, provision_check_delay
 from api_server.addons.event import AddonEvent
 from api_server.addons.providers.exceptions import AddonProviderError
 from api_server.addons.providers.utils import get_provider_from_provider_name
 from api_server.addons.state import AddonState
-from api_server.addons.state_machine_manager import StateMachineManager
+from api_server.addons.state_machine_manager import StateMachineManager, StateMachineTransitionError
 from api_server.celery import app
 from api_server.clients.exceptions import ClientError
 from api_server.models import Addon
@@ -26,12 +34,217 @@ def _valid_config(config):
     return True
 
 
+def _provision_complete(manager, addon, provider):
+    """Check if provision of this addon is complete. If it is, store
+    its config and transition it.
+
+    :param StateMachineManager manager:
+    :param api_server.models.Addon addon:
+    :param api_server.addons.providers.base_provider.BaseAddonProvider provider:
+
+    :rtype: tuple
+    :returns: (bool, int) - False and the provider's delay if provision
+        is still in progress, (True, 0) otherwise
+    """
+    try:
+        ready, delay = provider.provision_complete(addon.provider_uuid)
+    except AddonProviderError:
+        with manager.transition(addon.id, AddonEvent.provision_failure):
+            pass
+        return True, 0
+    if not ready:
+        return False, delay
+
+    # provision is done, store result
+    try:
+        result = provider.get_config(
+            addon.provider_uuid, config_customization=addon.config_customization)
+    except AddonProviderError:
+        with manager.transition(addon.id, AddonEvent.provision_failure):
+            pass
+        return True, 0
+
+    if 'config' not in result or not _valid_config(result['config']):
+        with manager.transition(addon.id, AddonEvent.provision_failure):
+            pass
+    else:
+        with manager.transition(addon.id, AddonEvent.provision_success) as locked_addon:
+            locked_addon.config = result['config']
+    return True, 0
+
+
+def _provision_elapsed(addon):
+    """Get how long ago provision started, which is when the addon
+    entered the waiting_for_provision state.
+
+    :param api_server.models.Addon addon:
+
+    :rtype: float
+    :returns: the time, in seconds
+    """
+    return (timezone.now() - addon.state_changed_at).total_seconds()
+
+
+def _provision_timed_out(manager, addon, timeout):
+    """Give up on provision of this addon.
+
+    :param StateMachineManager manager:
+    :param api_server.models.Addon addon:
+    :param float timeout: the timeout that was exceeded, in seconds
+    """
+    logger = logging.getLogger(__name__)
+    logger.error('Addon ID {addon_id}: Provision did not complete in {timeout} seconds.'.format(
+        addon_id=addon.id,
+        timeout=timeout,
+    ))
+    with manager.transition(addon.id, AddonEvent.provision_failure):
+        pass
+
+
+def _deprovision(manager, addon, provider):
+    """Kick off the deprovision of this addon and transition it.
+
+    :param StateMachineManager manager:
+    :param api_server.models.Addon addon:
+    :param api_server.addons.providers.base_provider.BaseAddonProvider provider:
+    """
+    try:
+        provider.deprovision(addon.provider_uuid)
+    except AddonProviderError:
+        # TODO retry?
+        with manager.transition(addon.id, AddonEvent.deprovision_failure):
+            pass
+        return
+    with manager.transition(addon.id, AddonEvent.deprovision_success):
+        pass
+
+
+def _claim_addons(addons):
+    """Claim these addons for ADDON_CLAIM_TIMEOUT seconds, so other workers
+    leave them alone while this one calls their provider or backend.
+    The rows are only locked while they are claimed, not during the calls.
+
+    :param django.db.models.query.QuerySet addons: the addons to claim,
+        the ones claimed by someone else are skipped
+
+    :rtype: list
+    :returns: the IDs of the addons claimed
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = [addon.id for addon in addons.select_for_update().filter(
+            Q(claimed_until__isnull=True) | Q(claimed_until__lte=now)).only('id')]
+        Addon.objects.filter(pk__in=ids).update(
+            claimed_until=now + datetime.timedelta(seconds=settings.ADDON_CLAIM_TIMEOUT))
+    return ids
+
+
+def _release_addons(ids):
+    """Release addons claimed with :py:func:`_claim_addons`.
+
+    :param list ids: the addon IDs
+    """
+    Addon.objects.filter(pk__in=ids).update(claimed_until=timezone.now())
+
+
+def _set_config(manager, addon, batch=None):
+    """Set the config of this provisioned addon, along with the config of
+    every other provisioned addon of the same app, so the app only gets
+    one new release. Each addon is transitioned.
+
+    The batch is claimed first, and the backend is called without
+    holding any lock, since a release can take a while.
+
+    :param StateMachineManager manager:
+    :param api_server.models.Addon addon:
+    :param list batch: the addons to set the config of, already claimed
+        by the caller. By default, the provisioned addons of the app that
+        no one else claimed.
+
+    :rtype: bool
+    :returns: False if the addon was left alone, because another
+        worker claimed it
+    """
+    logger = logging.getLogger(__name__)
+    if not addon.app or not addon.user or addon.config is None:
+        logger.error('''Addon ID {addon_id}: One of the following is invalid for set_config task:
+app: {app}
+user: {user}
+config: {config}
+'''.format(
+            addon_id=addon.id,
+            app=addon.app,
+            user=addon.user,
+            config=addon.config,
+        ))
+        with manager.transition(addon.id, AddonEvent.config_variables_set_failure):
+            pass
+        return True
+
+    try:
+        backend_client = get_backend_authenticated_client(
+            addon.user.username, addon.app.backend)
+    except BackendsError:
+        logger.exception('Addon ID {addon_id}: Could not get backend client for {backend}.'.format(
+            addon_id=addon.id,
+            backend=addon.app.backend,
+        ))
+        with manager.transition(addon.id, AddonEvent.config_variables_set_failure):
+            pass
+        return True
+
+    claimed = []
+    if batch is None:
+        claimed = _claim_addons(Addon.objects.filter(
+            app=addon.app,
+            state=AddonState.provisioned,
+            user__isnull=False,
+            config__isnull=False,
+        ))
+        batch = list(Addon.objects.filter(pk__in=claimed).order_by('id'))
+    try:
+        if not batch:
+            # another worker is setting them
+            return False
+
+        # later addons win on conflicting names, same as setting them in order
+        config = {}
+        for batch_addon in batch:
+            config.update(batch_addon.config)
+
+        try:
+            backend_client.set_application_env_variables(
+                addon.app.app_id, config)
+        except ClientError:
+            # TODO retriable
+            logger.exception('Addon IDs {addon_ids}: Could not set config.'.format(
+                addon_ids=[x.id for x in batch],
+            ))
+            event = AddonEvent.config_variables_set_failure
+        else:
+            event = AddonEvent.config_variables_set_success
+
+        for batch_addon in batch:
+            try:
+                with manager.transition(batch_addon.id, event):
+                    pass
+            except StateMachineTransitionError:
+                # e.g. it was deprovisioned meanwhile
+                logger.exception('Addon ID {addon_id}: Could not transition after setting config.'.format(
+                    addon_id=batch_addon.id,
+                ))
+        return any(batch_addon.id == addon.id for batch_addon in batch)
+    finally:
+        _release_addons(claimed)
+
+
 # NOTE: all tasks MUST return the same ID back out, so they can be chained
 
 
 @app.task(bind=True, max_retries=None)
 def check_provision(self, addon_id):
-    """A task that checks if provision is complete
+    """A task that checks if provision is complete. Retries with
+    backoff until it is, or until the provider's provision timeout.
     """
     logger = logging.getLogger(__name__)
     try:
@@ -59,30 +272,19 @@ def check_provision(self, addon_id):
         raise
 
     # check if provision is done
-    try:
-        ready, delay = provider.provision_complete(addon.provider_uuid)
-    except AddonProviderError:
-        with manager.transition(addon_id, AddonEvent.provision_failure):
-            pass
-        return addon_id
-    if not ready:
-        raise self.retry(countdown=delay)
-
-    # provision is done, store result
-    try:
-        result = provider.get_config(
-            addon.provider_uuid, config_customization=addon.config_customization)
-    except AddonProviderError:
-        with manager.transition(addon_id, AddonEvent.provision_failure):
-            pass
-        return addon_id
-
-    if 'config' not in result or not _valid_config(result['config']):
-        with manager.transition(addon_id, AddonEvent.provision_failure):
-            pass
-    else:
-        with manager.transition(addon_id, AddonEvent.provision_success) as addon:
-            addon.config = result['config']
+    done, delay = _provision_complete(manager, addon, provider)
+    if not done:
+        elapsed = _provision_elapsed(addon)
+        timeout = get_provision_timeout(provider)
+        if elapsed >= timeout:
+            _provision_timed_out(manager, addon, timeout)
+            return addon_id
+        countdown = provision_check_delay(
+            self.request.retries, elapsed,
+            expected_time=provider.expected_provision_time, min_delay=delay)
+        # check one last time right at the deadline
+        countdown = min(countdown, timeout - elapsed)
+        raise self.retry(countdown=countdown)
     return addon_id
 
 
@@ -96,6 +298,12 @@ def deprovision(addon_id):
     except Addon.DoesNotExist:
         logger.exception('Addon with ID {} does not exist.'.format(addon_id))
         raise
+    if addon.state is not AddonState.error_should_deprovision:
+        logger.warning('Addon ID {addon_id}: State {state} is invalid for deprovision task.'.format(
+            addon_id=addon_id,
+            state=addon.state,
+        ))
+        return addon_id
 
     manager = StateMachineManager()
     try:
@@ -110,21 +318,20 @@ def deprovision(addon_id):
             pass
         raise
 
-    try:
-        provider.deprovision(addon.provider_uuid)
-    except AddonProviderError:
-        # TODO retry?
-        with manager.transition(addon_id, AddonEvent.deprovision_failure):
-            pass
-        return addon_id
-    with manager.transition(addon_id, AddonEvent.deprovision_success):
-        pass
+    _deprovision(manager, addon, provider)
     return addon_id
 
 
-@app.task
-def set_config(addon_id):
-    """The addon has been provisioned. Now set the config"""
+@app.task(bind=True, max_retries=None)
+def set_config(self, addon_id):
+    """The addon has been provisioned. Now set the config.
+
+    The config of every other provisioned addon of the same app is set
+    along with it, so the app only gets one new release. The tasks for
+    those addons then find them already ready and do nothing. If another
+    worker claimed the addon, retries after ADDON_CLAIM_RETRY_DELAY
+    seconds, by then it is usually ready.
+    """
     logger = logging.getLogger(__name__)
     try:
         addon = Addon.objects.get(pk=addon_id)
@@ -132,8 +339,6 @@ def set_config(addon_id):
         logger.exception('Addon with ID {} does not exist.'.format(addon_id))
         raise
 
-    manager = StateMachineManager()
-
     if addon.state is not AddonState.provisioned:
         logger.warning('Addon ID {addon_id}: State {state} is invalid for set_config task.'.format(
             addon_id=addon_id,
@@ -141,44 +346,195 @@ def set_config(addon_id):
         ))
         return addon_id
 
-    if not addon.app or not addon.user or addon.config is None:
-        logger.error('''Addon ID {addon_id}: One of the following is invalid for set_config task:
-app: {app}
-user: {user}
-config: {config}
-'''.format(
-            app=addon.app,
-            user=addon.user,
-            config=addon.config,
-        ))
-        with manager.transition(addon_id, AddonEvent.config_variables_set_failure):
-            pass
-        return addon_id
+    if not _set_config(StateMachineManager(), addon):
+        raise self.retry(countdown=settings.ADDON_CLAIM_RETRY_DELAY)
+    return addon_id
 
-    try:
-        backend_client = get_backend_authenticated_client(
-            addon.user.username, addon.app.backend)
-    except BackendsError:
-        logger.exception('Addon ID {addon_id}: Could not get backend client for {backend}.'.format(
-            addon_id=addon_id,
-            backend=addon.app.backend,
-        ))
-        with manager.transition(addon_id, AddonEvent.config_variables_set_failure):
-            pass
-        return addon_id
 
+def _claim_addons_to_advance(states, limit):
+    """Claim up to ``limit`` addons in these states, skipping the ones
+    locked or claimed by someone else. The ones that waited the longest
+    since they were last claimed go first, so addons that stay pending
+    for a long time don't keep newer ones out of the batch.
+
+    Django does not support SKIP LOCKED before 1.11, so the IDs are
+    selected with raw SQL on PostgreSQL. Other databases lock normally.
+
+    :param list states: a list of AddonState
+    :param int limit:
+
+    :rtype: list
+    :returns: the addons, with app and user selected
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT id FROM {table} WHERE state IN %s AND (claimed_until IS NULL OR claimed_until <= %s) '
+                    'ORDER BY claimed_until NULLS FIRST, state_changed_at LIMIT %s FOR UPDATE SKIP LOCKED'.format(
+                        table=connection.ops.quote_name(Addon._meta.db_table)),
+                    [tuple(state.value for state in states), now, limit])
+                ids = [row[0] for row in cursor.fetchall()]
+        else:
+            # NULLs sort first here too
+            ids = [addon.id for addon in Addon.objects.select_for_update().filter(
+                Q(claimed_until__isnull=True) | Q(claimed_until__lte=now),
+                state__in=states,
+            ).order_by('claimed_until', 'state_changed_at').only('id')[:limit]]
+        Addon.objects.filter(pk__in=ids).update(
+            claimed_until=now + datetime.timedelta(seconds=settings.ADDON_CLAIM_TIMEOUT))
+    return list(Addon.objects.select_related('app', 'user').filter(pk__in=ids).order_by('id'))
+
+
+def _check_provision_once(manager, addon, provider):
+    """Check if provision of this addon is complete, giving up if it
+    has taken too long.
+
+    :param StateMachineManager manager:
+    :param api_server.models.Addon addon:
+    :param api_server.addons.providers.base_provider.BaseAddonProvider provider:
+
+    :rtype: float
+    :returns: how long to wait before checking again, in seconds, with
+        the same backoff as :py:func:`check_provision`. None if provision
+        is over.
+    """
+    done, delay = _provision_complete(manager, addon, provider)
+    if done:
+        return None
+    elapsed = _provision_elapsed(addon)
+    timeout = get_provision_timeout(provider)
+    if elapsed >= timeout:
+        _provision_timed_out(manager, addon, timeout)
+        return None
+    expected_time = provider.expected_provision_time
+    countdown = provision_check_delay(
+        provision_check_attempt(elapsed, expected_time), elapsed,
+        expected_time=expected_time, min_delay=delay)
+    # check one last time right at the deadline
+    return min(countdown, timeout - elapsed)
+
+
+@app.task
+def advance_addons():
+    """Advance every addon in a state that has a task, in bulk. This runs
+    periodically when settings.ADDON_BULK_DRIVER is set, instead of one
+    chain of tasks per addon.
+
+    Addons are claimed in one short transaction, skipping any that
+    another worker is working on, and the providers and backends are
+    called without holding locks. The provider is loaded once per group
+    of addons, and the config is set once per app. An addon still being
+    provisioned stays claimed until its next check is due.
+    """
+    logger = logging.getLogger(__name__)
+    manager = StateMachineManager()
+    failure_events = {
+        AddonState.waiting_for_provision: AddonEvent.provision_failure,
+        AddonState.error_should_deprovision: AddonEvent.deprovision_failure,
+    }
+    steps = {
+        AddonState.waiting_for_provision: _check_provision_once,
+        AddonState.error_should_deprovision: _deprovision,
+    }
+
+    addons = _claim_addons_to_advance(
+        list(manager.tasks_table), settings.ADDON_BULK_DRIVER_BATCH_SIZE)
+    # addon ID => seconds until provision should be checked again
+    next_checks = {}
     try:
-        backend_client.set_application_env_variables(
-            addon.app.app_id, addon.config)
-    except ClientError:
-        # TODO retriable
-        logger.exception('Addon ID {addon_id}: Could not set config.'.format(
+        groups = defaultdict(list)
+        for addon in addons:
+            if addon.state in steps:
+                groups[(addon.state, addon.provider_name)].append(addon)
+        for (state, provider_name), group in groups.iteritems():
+            try:
+                provider = get_provider_from_provider_name(provider_name)
+            except AddonProviderError:
+                logger.exception('Could not get provider for {name}.'.format(
+                    name=provider_name))
+                provider = None
+            for addon in group:
+                try:
+                    if provider is None:
+                        with manager.transition(addon.id, failure_events[state]):
+                            pass
+                    else:
+                        delay = steps[state](manager, addon, provider)
+                        if state is AddonState.waiting_for_provision and delay is not None:
+                            next_checks[addon.id] = delay
+                except Exception:
+                    # don't let one addon hold up the rest
+                    logger.exception('Addon ID {addon_id}: Could not advance from state {state}.'.format(
+                        addon_id=addon.id,
+                        state=state,
+                    ))
+
+        # including the addons provisioned above, but only the ones claimed
+        # here. The others are set by whoever claimed them
+        provisioned = Addon.objects.select_related('app', 'user').filter(
+            pk__in=[addon.id for addon in addons],
+            state=AddonState.provisioned,
+        ).order_by('id')
+        batches = defaultdict(list)
+        invalid = []
+        for addon in provisioned:
+            if addon.app and addon.user and addon.config is not None:
+                batches[addon.app_id].append(addon)
+            else:
+                invalid.append(addon)
+        # _set_config moves the invalid ones to an error state
+        for batch in [[addon] for addon in invalid] + batches.values():
+            try:
+                _set_config(manager, batch[0], batch=batch)
+            except Exception:
+                logger.exception('Addon IDs {addon_ids}: Could not set config.'.format(
+                    addon_ids=[x.id for x in batch],
+                ))
+    finally:
+        _release_addons([addon.id for addon in addons if addon.id not in next_checks])
+        now = timezone.now()
+        for addon_id, delay in next_checks.iteritems():
+            Addon.objects.filter(pk=addon_id).update(
+                claimed_until=now + datetime.timedelta(seconds=delay))
+
+
+@app.task
+def reconcile_addons():
+    """Start the task again for every addon that has been in a state
+    with a task for too long, in case its worker died or its message was
+    lost. The tasks check the state first, so starting one twice is safe.
+
+    Provision is given until its timeout, since check_provision moves
+    the addon to error after that.
+
+    :rtype: dict
+    :returns: the number of addons started again, by state name
+    """
+    logger = logging.getLogger(__name__)
+    manager = StateMachineManager()
+    now = timezone.now()
+    after = datetime.timedelta(seconds=settings.ADDON_RECONCILE_AFTER)
+    provision_after = datetime.timedelta(
+        seconds=settings.ADDON_PROVISION_TIMEOUT) + after
+    other_states = [state for state in manager.tasks_table
+                    if state is not AddonState.waiting_for_provision]
+    stuck = list(Addon.objects.filter(
+        Q(state=AddonState.waiting_for_provision, state_changed_at__lt=now - provision_after) |
+        Q(state__in=other_states, state_changed_at__lt=now - after)
+    ).values_list('id', 'state'))
+    if not stuck:
+        return {}
+
+    Addon.objects.filter(pk__in=[addon_id for addon_id, _ in stuck]).update(
+        reconcile_count=F('reconcile_count') + 1)
+    counts = defaultdict(int)
+    for addon_id, state in stuck:
+        logger.warning('Addon ID {addon_id}: Stuck in state {state}, starting its task again.'.format(
             addon_id=addon_id,
+            state=state,
         ))
-        with manager.transition(addon_id, AddonEvent.config_variables_set_failure):
-            pass
-        return addon_id
-
-    with manager.transition(addon_id, AddonEvent.config_variables_set_success):
-        pass
-    return addon_id
+        manager.start_task(addon_id)
+        counts[state.name] += 1
+    return dict(counts)
@@ -0,0 +1,92 @@
+import json
+
+from django.utils.decorators import method_decorator
+
+from api_server.addons.providers.exceptions import AddonProviderInvalidOperationError
+from api_server.addons.providers.utils import get_provider_from_provider_name
+from api_server.addons.state import AddonState, visible_states
+from api_server.addons.state_machine_manager import StateMachineManager
+from api_server.api.addons_api_view import clean_config_customization
+from api_server.api.api_base_view import ApiBaseView, ErrorResponse
+from api_server.models import Addon, App
+from api_server.paas_backends import get_backend_authenticated_client
+from wsse.decorators import check_wsse_token
+
+
+@method_decorator(check_wsse_token, 'dispatch')
+class AddonCloneApiView(ApiBaseView):
+
+    def post(self, request, app_id, addon_name):
+        """Create a new addon that starts out as a copy of this addon,
+        without a dump and restore of the data. The copy keeps the
+        database credentials of this addon, so the collaborators of the
+        target app can connect to this addon too.
+
+        The body of the request should be a JSON with the following format:
+        {
+            'app_id': 'optional, the app for the new addon. Defaults to this app.',
+            'config_customization': 'optional, either a string or None'
+        }
+
+        Returns a JSON with the following format:
+        {
+            'message': 'message to be displayed to user',
+            'addon': {
+                (the new addon object)
+            }
+        }
+
+        :param django.http.HttpRequest request: the request object
+        :param str app_id: the ID of the app
+        :param str addon_name: the name of the addon to clone
+
+        :rtype: django.http.HttpResponse
+        """
+        try:
+            source = Addon.objects.select_related('app').get(
+                app__app_id=app_id, display_name=addon_name, state__in=visible_states)
+        except Addon.DoesNotExist:
+            raise ErrorResponse(message='Addon {} does not exist.'.format(addon_name), status=404)
+        data = json.loads(request.body)
+        target_app_id = data.get('app_id', app_id)
+        try:
+            target_app = App.objects.get(app_id=target_app_id)
+        except App.DoesNotExist:
+            raise ErrorResponse(message='App {} does not exist.'.format(target_app_id), status=400)
+        # the data is copied from one app to the other, so the user must
+        # have access to both
+        self._check_access(request, source.app)
+        if target_app != source.app:
+            self._check_access(request, target_app)
+        config_customization = clean_config_customization(
+            data.get('config_customization', None))
+
+        provider = get_provider_from_provider_name(source.provider_name)
+        try:
+            result = provider.clone(source.provider_uuid, target_app.app_id)
+        except AddonProviderInvalidOperationError as e:
+            raise ErrorResponse(message='{}'.format(e), status=400)
+        addon = Addon.objects.create(
+            provider_name=source.provider_name,
+            provider_uuid=result['uuid'],
+            app=target_app,
+            state=AddonState.waiting_for_provision,
+            user=request.user,
+            config_customization=config_customization,
+        )
+        manager = StateMachineManager()
+        manager.start_task(addon.id)
+        return self.respond({'message': result['message'], 'addon': addon.to_dict()})
+
+    def _check_access(self, request, app):
+        """Make sure the user can access this app, by asking the PaaS
+        backend about it as the user.
+
+        :param django.http.HttpRequest request: the request object
+        :param api_server.models.App app: the app
+
+        :raises api_server.clients.exceptions.ClientResponseError:
+            if the user cannot access the app
+        """
+        auth_client = get_backend_authenticated_client(request.user.username, app.backend)
+        auth_client.get_application_owner(app.app_id)
@@ -1,10 +1,14 @@
+import time
+
+from django.conf import settings
 from django.utils.decorators import method_decorator
 
 from api_server.addons.event import AddonEvent
+from api_server.addons.notifications import get_state_notifier
 from api_server.addons.providers.utils import get_provider_from_provider_name
-from api_server.addons.state import visible_states
+from api_server.addons.state import AddonState, visible_states
 from api_server.addons.state_machine_manager import StateMachineManager
-from api_server.api.api_base_view import ApiBaseView
+from api_server.api.api_base_view import ApiBaseView, ErrorResponse
 from api_server.models import Addon
 from wsse.decorators import check_wsse_token
 
@@ -13,16 +17,76 @@ from wsse.decorators import check_wsse_token
 class AddonDetailsApiView(ApiBaseView):
 
     def get(self, request, app_id, addon_name):
-        """Return all the addons installed for this application.
+        """Return the addon.
+
+        With ``?wait_for=ready``, wait until the addon is in that state,
+        or its state changes, before responding. ``timeout`` is how long
+        to wait at most, in seconds, and defaults to (and is capped at)
+        ``ADDON_WAIT_MAX_TIMEOUT``.
 
         :param django.http.HttpRequest request: the request object
         :param str app_id: the ID of the app
+        :param str addon_name: the name of the addon
 
         :rtype: django.http.HttpResponse
         """
         addon = Addon.objects.get(app__app_id=app_id, display_name=addon_name, state__in=visible_states)
+        wait_for = request.GET.get('wait_for')
+        if wait_for is not None:
+            addon = self._wait(addon, self._get_state(wait_for), self._get_timeout(request))
         return self.respond(addon.to_dict())
 
+    def _get_state(self, name):
+        """
+        :param str name: the name of a state
+
+        :rtype: api_server.addons.state.AddonState
+
+        :raises api_server.api.api_base_view.ErrorResponse:
+        """
+        try:
+            return AddonState[name]
+        except KeyError:
+            raise ErrorResponse(message='Invalid state {}.'.format(name), status=400)
+
+    def _get_timeout(self, request):
+        """
+        :param django.http.HttpRequest request: the request object
+
+        :rtype: float
+        :returns: how long to wait, in seconds
+
+        :raises api_server.api.api_base_view.ErrorResponse:
+        """
+        try:
+            timeout = float(request.GET.get('timeout', settings.ADDON_WAIT_MAX_TIMEOUT))
+        except ValueError:
+            raise ErrorResponse(message='timeout must be a number of seconds.', status=400)
+        return max(0, min(timeout, settings.ADDON_WAIT_MAX_TIMEOUT))
+
+    def _wait(self, addon, state, timeout):
+        """Wait until the addon is in this state, or its state changes.
+
+        :param api_server.models.Addon addon:
+        :param api_server.addons.state.AddonState state:
+        :param float timeout: in seconds
+
+        :rtype: api_server.models.Addon
+        :returns: the addon, reloaded
+        """
+        if addon.state is state:
+            return addon
+        initial_state = addon.state
+        deadline = time.time() + timeout
+        with get_state_notifier().listen(addon.id) as wait:
+            while addon.state is initial_state:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                wait(min(remaining, settings.ADDON_WAIT_POLL_INTERVAL))
+                addon = Addon.objects.get(pk=addon.id)
+        return addon
+
     def delete(self, request, app_id, addon_name):
         """Return all the addons installed for this application.
 
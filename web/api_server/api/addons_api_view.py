@@ -16,6 +16,23 @@ _valid_chars = r'[0-9a-zA-Z_]'
 _value_regexp = re.compile(r'^{}*$'.format(_valid_chars))
 
 
+def clean_config_customization(config_customization):
+    """Validate and normalize a config customization string.
+
+    :param str config_customization: the string, or None
+
+    :rtype: str
+    :returns: the uppercased string, or None
+
+    :raises api_server.api.api_base_view.ErrorResponse:
+    """
+    if config_customization is None:
+        return None
+    if not _value_regexp.match(config_customization):
+        raise ErrorResponse(message='The customization string {} is invalid. Valid characters are {}.'.format(config_customization, _valid_chars), status=400)
+    return config_customization.upper()
+
+
 @method_decorator(check_wsse_token, 'dispatch')
 class AddonsApiView(ApiBaseView):
 
@@ -58,11 +75,8 @@ class AddonsApiView(ApiBaseView):
         provider_name = data['provider_name']
         provider = get_provider_from_provider_name(provider_name)
 
-        config_customization = data.get('config_customization', None)
-        if config_customization is not None and not _value_regexp.match(config_customization):
-            raise ErrorResponse(message='The customization string {} is invalid. Valid characters are {}.'.format(config_customization, _valid_chars), status=400)
-        if config_customization is not None:
-            config_customization = config_customization.upper()
+        config_customization = clean_config_customization(
+            data.get('config_customization', None))
 
         result = provider.begin_provision(app_id)
         addon = Addon.objects.create(
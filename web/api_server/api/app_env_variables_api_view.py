@@ -13,6 +13,28 @@ _valid_chars = r'[0-9a-zA-Z_\-@:/+.]'
 _value_regexp = re.compile(r'^{}*$'.format(_valid_chars))
 
 
+def set_env_variables(auth_client, app_id, env_vars):
+    """Validate the variables, and set the ones that differ from the
+    current ones. Nothing is set if none differ.
+
+    :param api_server.clients.base_authenticated_client.BaseAuthenticatedClient auth_client:
+    :param str app_id: the ID of the app
+    :param dict env_vars: name to value, None to unset
+
+    :raises api_server.api.api_base_view.ErrorResponse:
+    :raises api_server.clients.exceptions.ClientError:
+    """
+    for v in env_vars.itervalues():
+        if v is not None and not _value_regexp.match(v):
+            raise ErrorResponse(message='Variable values must be one of {}. Invalid character(s) in {}'.format(_valid_chars, v), status=400)
+
+    current = auth_client.get_application_env_variables(app_id)
+    changed = {k: v for k, v in env_vars.iteritems()
+               if current.get(k) != v}
+    if changed:
+        auth_client.set_application_env_variables(app_id, changed)
+
+
 @method_decorator(check_wsse_token, 'dispatch')
 class AppEnvVariablesApiView(ApiBaseView):
 
@@ -42,6 +64,10 @@ class AppEnvVariablesApiView(ApiBaseView):
         }
         To unset a variable, set its value to ``null``.
 
+        Only the variables that differ from the current ones are sent to
+        the backend, and nothing is sent if none differ, since every change
+        creates a new release of the app.
+
         :param django.http.HttpRequest request: the request object
         :param str app_id: the ID of the app
 
@@ -52,10 +78,5 @@ class AppEnvVariablesApiView(ApiBaseView):
         backend = self.get_backend_for_app(app_id)
         auth_client = get_backend_authenticated_client(
             request.user.username, backend)
-
-        for v in env_vars.itervalues():
-            if v is not None and not _value_regexp.match(v):
-                raise ErrorResponse(message='Variable values must be one of {}. Invalid character(s) in {}'.format(_valid_chars, v), status=400)
-
-        auth_client.set_application_env_variables(app_id, env_vars)
+        set_env_variables(auth_client, app_id, env_vars)
         return self.respond()
@@ -0,0 +1,179 @@
+import json
+import logging
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from multiprocessing.pool import ThreadPool
+
+from api_server.addons.state import visible_states
+from api_server.api.api_base_view import ApiBaseView, ErrorResponse
+from api_server.api.app_env_variables_api_view import set_env_variables
+from api_server.clients.exceptions import ClientResponseError, ClientError, ClientTimeoutError
+from api_server.models import Addon, App
+from api_server.paas_backends import get_backend_authenticated_client, BackendsError, BackendsUserError
+from wsse.decorators import check_wsse_token
+
+
+# operations run against the PaaS backend, in a thread pool.
+# (authenticated client, app ID, data) => json-serializable result
+BACKEND_OPERATIONS = {
+    'config': lambda client, app_id, data: client.get_application_env_variables(app_id),
+    'config:set': lambda client, app_id, data: set_env_variables(client, app_id, data),
+    'domains': lambda client, app_id, data: client.get_application_domains(app_id),
+    'collaborators': lambda client, app_id, data: client.get_application_collaborators(app_id),
+}
+
+# operations that only read the database, in the request's thread.
+# (app ID, data) => json-serializable result
+LOCAL_OPERATIONS = {
+    'addons': lambda app_id, data: [
+        x.to_dict() for x in Addon.objects.filter(app__app_id=app_id, state__in=visible_states)],
+}
+
+
+def _run_operation(func, *args):
+    """Run an operation, turning its errors into a status and a message
+    the way :py:class:`ApiBaseView` would for a single request.
+
+    :param func: the operation
+    :param args: the arguments for the operation
+
+    :rtype: tuple
+    :returns: (status, result or None, error message or None)
+    """
+    try:
+        return 200, func(*args), None
+    except ErrorResponse as e:
+        return e.status, None, '{}'.format(e)
+    except ClientResponseError as e:
+        try:
+            return e.response.status_code, None, e.response.json()
+        except ValueError:
+            return e.response.status_code, None, e.response.text
+    except ClientTimeoutError:
+        return 500, None, 'PaaS server timeout'
+    except BackendsUserError as e:
+        return 400, None, '{}'.format(e)
+    except (ClientError, BackendsError) as e:
+        return 500, None, '{}'.format(e)
+    except Exception as e:
+        logging.getLogger(__name__).exception('Bulk operation failed')
+        return 500, None, '{}'.format(e)
+
+
+@method_decorator(check_wsse_token, 'dispatch')
+class BulkApiView(ApiBaseView):
+
+    def post(self, request):
+        """Run operations on many apps at once.
+
+        The body of the request must be a JSON with the format
+        [
+            {"app": "app-id", "operation": "config"},
+            {"app": "app-id2", "operation": "config:set", "data": {"VAR": "value"}},
+            ...
+        ]
+        Operations on the PaaS backend run concurrently, with one
+        authenticated client per backend. The response streams one JSON
+        object per line, as each operation finishes:
+        {"index": 0, "app": "app-id", "operation": "config", "status": 200, "result": ...}
+        or, if it failed, with "error" instead of "result".
+
+        :param django.http.HttpRequest request: the request object
+
+        :rtype: django.http.HttpResponse
+        """
+        try:
+            items = json.loads(request.body)
+        except ValueError:
+            raise ErrorResponse(message='The body must be JSON.', status=400)
+        self._validate(items)
+
+        app_ids = {item['app'] for item in items}
+        backends = dict(App.objects.filter(
+            app_id__in=app_ids).values_list('app_id', 'backend'))
+        clients = {}
+        for backend in set(backends.itervalues()):
+            clients[backend] = _run_operation(
+                get_backend_authenticated_client, request.user.username, backend)
+
+        return StreamingHttpResponse(
+            self._stream(items, backends, clients), content_type='application/x-ndjson')
+
+    def _validate(self, items):
+        """
+        :param items: the parsed body
+
+        :raises api_server.api.api_base_view.ErrorResponse:
+        """
+        if not isinstance(items, list):
+            raise ErrorResponse(message='The body must be a list of operations.', status=400)
+        if len(items) > settings.BULK_MAX_OPERATIONS:
+            raise ErrorResponse(message='At most {} operations are allowed at once.'.format(
+                settings.BULK_MAX_OPERATIONS), status=400)
+        operations = set(BACKEND_OPERATIONS) | set(LOCAL_OPERATIONS)
+        for item in items:
+            if not isinstance(item, dict) or not isinstance(item.get('app'), basestring):
+                raise ErrorResponse(message='Every operation must have an app.', status=400)
+            if item.get('operation') not in operations:
+                raise ErrorResponse(message='Invalid operation {}. Valid operations are {}.'.format(
+                    item.get('operation'), ', '.join(sorted(operations))), status=400)
+            if item['operation'] == 'config:set' and not isinstance(item.get('data'), dict):
+                raise ErrorResponse(message='config:set needs the variables as data.', status=400)
+
+    def _stream(self, items, backends, clients):
+        """Run the operations, yielding their results as they finish.
+
+        :param list items: the operations
+        :param dict backends: app ID to backend, for the apps that exist
+        :param dict clients: backend to the result of logging in,
+            as returned by :py:func:`_run_operation`
+
+        :rtype: generator
+        :returns: one JSON line (str) per operation
+        """
+        def line(index, status, result, error):
+            item = items[index]
+            out = {'index': index, 'app': item['app'], 'operation': item['operation'], 'status': status}
+            if error is None:
+                out['result'] = result
+            else:
+                out['error'] = error
+            return json.dumps(out) + '\n'
+
+        def run_backend_operation(args):
+            index, client = args
+            item = items[index]
+            func = BACKEND_OPERATIONS[item['operation']]
+            return (index,) + _run_operation(func, client, item['app'], item.get('data'))
+
+        jobs = []
+        others = []
+        for index, item in enumerate(items):
+            if item['app'] in backends and item['operation'] in BACKEND_OPERATIONS:
+                status, client, error = clients[backends[item['app']]]
+                if error is None:
+                    jobs.append((index, client))
+                    continue
+            others.append(index)
+
+        # start the backend operations first, the others run meanwhile
+        pool = ThreadPool(min(settings.BULK_MAX_WORKERS, len(jobs))) if jobs else None
+        try:
+            results = pool.imap_unordered(run_backend_operation, jobs) if jobs else []
+            for index in others:
+                item = items[index]
+                if item['app'] not in backends:
+                    yield line(index, 400, None, 'App {} does not exist.'.format(item['app']))
+                elif item['operation'] in LOCAL_OPERATIONS:
+                    func = LOCAL_OPERATIONS[item['operation']]
+                    yield line(index, *_run_operation(func, item['app'], item.get('data')))
+                else:
+                    status, _, error = clients[backends[item['app']]]
+                    yield line(index, status, None, error)
+            for result in results:
+                yield line(*result)
+        finally:
+            if pool is not None:
+                pool.terminate()
@@ -1,9 +1,16 @@
+import datetime
 import json
+import time
 
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 
-from api_server.api.api_base_view import ApiBaseView
+from api_server.api.api_base_view import ApiBaseView, ErrorResponse
+from api_server.models import App, RunJob
 from api_server.paas_backends import get_backend_authenticated_client
+from api_server.tasks import run_command_job
 from wsse.decorators import check_wsse_token
 
 
@@ -15,17 +22,98 @@ class RunCommandApiView(ApiBaseView):
 
         The request body must be a JSON with the following fields:
         {
-            "command": "echo 1 2 3"
+            "command": "echo 1 2 3",
+            "async": true
         }
+        Without "async", the command is run right away, and the response
+        is its exit code and output. With "async", it is run in the
+        background, and the response is
+        {
+            "job_id": "..."
+        }
+        The output is then read from :py:class:`RunCommandOutputApiView`.
 
         :param django.http.HttpRequest request: the request object
         :param str app_id: the ID of the app
 
         :rtype: django.http.HttpResponse
         """
-        command = json.loads(request.body)['command']
+        body = json.loads(request.body)
+        command = body['command']
+        if body.get('async'):
+            try:
+                app = App.objects.get(app_id=app_id)
+            except App.DoesNotExist:
+                raise ErrorResponse(
+                    message='App {} does not exist.'.format(app_id), status=400)
+            job = RunJob.objects.create(app=app, user=request.user, command=command)
+            run_command_job.delay(job.id)
+            return self.respond({'job_id': str(job.job_id)}, status=202)
+
         backend = self.get_backend_for_app(app_id)
         auth_client = get_backend_authenticated_client(
             request.user.username, backend)
 
         return self.respond(auth_client.run_command(app_id, command))
+
+
+@method_decorator(check_wsse_token, 'dispatch')
+class RunCommandOutputApiView(ApiBaseView):
+
+    def get(self, request, app_id, job_id):
+        """Stream the output of a command started with "async".
+
+        The response has one JSON object per line:
+        {"output": "..."} for each new piece of output, then
+        {"exit_code": 0} once the command is done, or {"error": "..."}
+        if it could not be run or did not finish within RUN_JOB_MAX_TIME
+        seconds. The response ends after at most
+        RUN_STREAM_MAX_TIME seconds, even if the command is still running.
+        Ask again with ``?offset=`` the length of the output so far to
+        get the rest.
+
+        :param django.http.HttpRequest request: the request object
+        :param str app_id: the ID of the app
+        :param str job_id: the job ID
+
+        :rtype: django.http.HttpResponse
+        """
+        try:
+            offset = int(request.GET.get('offset', 0))
+        except ValueError:
+            raise ErrorResponse(message='offset must be a number.', status=400)
+        try:
+            job = RunJob.objects.only('id').get(
+                job_id=job_id, app__app_id=app_id, user=request.user)
+        except (RunJob.DoesNotExist, ValueError):
+            raise ErrorResponse(message='Job {} does not exist.'.format(job_id), status=404)
+        return StreamingHttpResponse(self._stream(job.id, offset), content_type='application/x-ndjson')
+
+    def _stream(self, pk, offset):
+        """
+        :param int pk: the primary key of the job
+        :param int offset: how much of the output to skip
+
+        :rtype: generator
+        :returns: JSON lines (str)
+        """
+        deadline = time.time() + settings.RUN_STREAM_MAX_TIME
+        max_age = datetime.timedelta(seconds=settings.RUN_JOB_MAX_TIME)
+        while True:
+            job = RunJob.objects.get(pk=pk)
+            if len(job.output) > offset:
+                yield json.dumps({'output': job.output[offset:]}) + '\n'
+                offset = len(job.output)
+            if job.finished_at is not None:
+                if job.error is not None:
+                    yield json.dumps({'error': job.error}) + '\n'
+                else:
+                    yield json.dumps({'exit_code': job.exit_code}) + '\n'
+                return
+            if timezone.now() - job.created_at > max_age:
+                # the worker running it died or lost it
+                yield json.dumps({'error': 'The command did not finish in time.'}) + '\n'
+                return
+            if time.time() >= deadline:
+                return
+            time.sleep(settings.RUN_STREAM_POLL_INTERVAL)
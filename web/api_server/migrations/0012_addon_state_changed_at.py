@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.2 on 2026-10-19 02:37
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_server', '0011_auto_20160429_1844'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='addon',
+            name='reconcile_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='addon',
+            name='state_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterIndexTogether(
+            name='addon',
+            index_together=set([('state', 'state_changed_at')]),
+        ),
+    ]
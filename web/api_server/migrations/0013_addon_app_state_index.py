@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.2 on 2026-10-19 03:05
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_server', '0012_addon_state_changed_at'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='addon',
+            index_together=set([('app', 'state'), ('state', 'state_changed_at')]),
+        ),
+    ]
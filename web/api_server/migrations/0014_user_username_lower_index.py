@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Index lower(username), so looking up a user's credentials
+    by case-insensitive username does not scan the user table.
+    """
+
+    dependencies = [
+        # after auth's migrations, sqlite drops the index if they rebuild the table
+        ('auth', '0007_alter_validators_add_error_messages'),
+        ('api_server', '0013_addon_app_state_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            ['CREATE INDEX api_server_auth_user_username_lower ON auth_user (lower(username))'],
+            reverse_sql=['DROP INDEX api_server_auth_user_username_lower'],
+        ),
+    ]
@@ -1,12 +1,17 @@
 from __future__ import unicode_literals
 
+import uuid
+
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.signing import Signer
 from django.core.validators import RegexValidator
-from django.db.models.signals import post_save
+from django.db.models import Value
+from django.db.models.functions import Concat
+from django.db.models.signals import post_delete, post_save
 from django.db import models
-from django.utils import crypto
+from django.utils import crypto, timezone
 from haikunator import haikunate
 from jsonfield import JSONField
 
@@ -30,13 +35,27 @@ class PaasCredential(models.Model):
     password_seed = models.CharField(default=make_secret, max_length=50)
 
     def get_password(self):
-        """Get the password for this user/backend combination
+        """Get the password for this user/backend combination.
+        Signing is slow, so the password is cached by profile ID
+        and backend.
 
         :rtype: str
         :returns: the password
         """
+        key = self.get_password_cache_key(self.profile_id, self.backend)
+        cached = cache.get(key)
+        # the seed is cached too, so a changed seed is never missed,
+        # even if another process changed it
+        if cached is not None and cached[0] == self.password_seed:
+            return cached[1]
         signer = Signer()
-        return signer.sign(self.password_seed)
+        password = signer.sign(self.password_seed)
+        cache.set(key, (self.password_seed, password), None)
+        return password
+
+    @staticmethod
+    def get_password_cache_key(profile_id, backend):
+        return 'paas_password:{}:{}'.format(profile_id, backend)
 
     class Meta:
         unique_together = ('profile', 'backend')
@@ -153,6 +172,14 @@ def make_default_credential(sender, instance, created, **kwargs):
 post_save.connect(make_default_credential, sender=Profile)
 
 
+def clear_cached_password(sender, instance, **kwargs):
+    cache.delete(PaasCredential.get_password_cache_key(
+        instance.profile_id, instance.backend))
+
+post_save.connect(clear_cached_password, sender=PaasCredential)
+post_delete.connect(clear_cached_password, sender=PaasCredential)
+
+
 def _make_display_name():
     return haikunate(tokenhex=True, tokenlength=6)
 
@@ -170,6 +197,21 @@ class Addon(models.Model):
         max_length=100, unique=True, default=_make_display_name)
     config_customization = models.CharField(max_length=100, null=True, blank=True, validators=[
         RegexValidator(regex=r'^[A-Z0-9_]+$')])
+    # set on every transition, used to find addons stuck in a state
+    state_changed_at = models.DateTimeField(default=timezone.now, editable=False)
+    # how many times a stuck addon's task was started again
+    reconcile_count = models.PositiveIntegerField(default=0, editable=False)
+    # a worker claimed the addon and is calling its provider or backend,
+    # others leave it alone until then. Null or past means unclaimed
+    claimed_until = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        index_together = [
+            # listing the addons of an app
+            ('app', 'state'),
+            # finding stuck addons
+            ('state', 'state_changed_at'),
+        ]
 
     def to_dict(self):
         return {
@@ -184,3 +226,35 @@ class Addon(models.Model):
         # TODO there is a validation bug with EnumField
         self.full_clean(exclude=['state'])
         super(self.__class__, self).save(*args, **kwargs)
+
+
+class RunJob(models.Model):
+    """A one-off command, run in the background. Its output is appended
+    as it comes in, so it can be streamed to the user.
+    """
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    app = models.ForeignKey(App, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    command = models.TextField()
+    output = models.TextField(default='', blank=True)
+    # set when the job finishes, exit_code if the command ran, error otherwise
+    exit_code = models.IntegerField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def append_output(self, chunk):
+        """Append to the output in the database, without reading it.
+
+        :param str chunk:
+        """
+        RunJob.objects.filter(pk=self.pk).update(output=Concat('output', Value(chunk)))
+
+    def finish(self, exit_code=None, error=None):
+        """Mark the job as finished.
+
+        :param int exit_code: the exit code of the command, if it ran
+        :param str error: why the command could not be run, otherwise
+        """
+        RunJob.objects.filter(pk=self.pk).update(
+            exit_code=exit_code, error=error, finished_at=timezone.now())
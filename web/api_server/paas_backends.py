@@ -1,9 +1,18 @@
+import threading
+
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.signals import request_finished, request_started
+from django.db.models.functions import Lower
+from django.db.models.signals import post_delete, post_save
 from django.utils.module_loading import import_string
 
 from api_server.clients.base_client import BaseClient
-from api_server.models import Profile
+from api_server.models import PaasCredential
+
+# credentials already resolved in the current request, by lowercased
+# username. None outside of requests, e.g. in celery tasks.
+_request_local = threading.local()
 
 
 class BackendsError(Exception):
@@ -66,6 +75,61 @@ def get_backend_client(backend):
         raise BackendsConfigError
 
 
+def _start_request_cache(**kwargs):
+    _request_local.credentials = {}
+
+
+def _end_request_cache(**kwargs):
+    _request_local.credentials = None
+
+
+def _clear_request_cache(**kwargs):
+    if getattr(_request_local, 'credentials', None):
+        _request_local.credentials = {}
+
+
+request_started.connect(_start_request_cache)
+request_finished.connect(_end_request_cache)
+post_save.connect(_clear_request_cache, sender=PaasCredential)
+post_delete.connect(_clear_request_cache, sender=PaasCredential)
+
+
+def get_user_credentials(username):
+    """Get all the PaaS credentials of a user, with the profile and
+    the user loaded along with them, in one query. The username is
+    case-insensitive. Within a request, the result is memoized.
+
+    :param str username: the username
+
+    :rtype: dict
+    :returns: backend name (str) to credential
+        (api_server.models.PaasCredential), or None if the user
+        does not exist
+    """
+    key = username.lower()
+    cache = getattr(_request_local, 'credentials', None)
+    if cache is not None and key in cache:
+        return cache[key]
+
+    # filtering on lower(username) uses the index added in
+    # migration 0014, username__iexact would not
+    credentials = list(PaasCredential.objects.select_related('profile__user').annotate(
+        username_lower=Lower('profile__user__username')).filter(
+        username_lower=key).order_by('profile__user_id'))
+    if credentials:
+        # usernames are only unique case-sensitively, pick the first user
+        user_id = credentials[0].profile.user_id
+        result = {c.backend: c for c in credentials if c.profile.user_id == user_id}
+    elif User.objects.annotate(username_lower=Lower('username')).filter(username_lower=key).exists():
+        result = {}
+    else:
+        return None
+
+    if cache is not None:
+        cache[key] = result
+    return result
+
+
 def get_backend_authenticated_client(username, backend):
     """Creates a new authenticated client for the user
     and backend
@@ -78,16 +142,17 @@ def get_backend_authenticated_client(username, backend):
     @raises e: ClientError
     @raises e: BackendsError
     """
-    try:
-        user = User.objects.get(username__iexact=username)
-    except User.DoesNotExist:
+    credentials = get_user_credentials(username)
+    if credentials is None:
         raise BackendsUserError('{} does not exist.'.format(username))
     client = get_backend_client(backend)
     try:
-        password = user.profile.get_credential(backend).get_password()
-    except Profile.NoCredentials:
+        credential = credentials[backend]
+    except KeyError:
         raise BackendsUserError('{user} does not have access to {backend}.'.format(
             user=username, backend=backend))
+    user = credential.profile.user
+    password = credential.get_password()
     c, _ = client.login_or_register(
         user.username, password, user.email)
     return c
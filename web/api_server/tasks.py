@@ -0,0 +1,48 @@
+from __future__ import absolute_import
+
+import datetime
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+from api_server.celery import app
+from api_server.clients.exceptions import ClientError, ClientResponseError
+from api_server.models import RunJob
+from api_server.paas_backends import get_backend_authenticated_client, BackendsError
+
+
+@app.task
+def run_command_job(run_job_id):
+    """Run a one-off command on the backend, storing its output and
+    exit code in the job.
+
+    :param int run_job_id: the primary key of the api_server.models.RunJob
+    """
+    job = RunJob.objects.select_related('app', 'user').get(pk=run_job_id)
+    try:
+        auth_client = get_backend_authenticated_client(
+            job.user.username, job.app.backend)
+        result = auth_client.run_command(job.app.app_id, job.command)
+        # the backend only returns the output once the command is done
+        job.append_output(result['output'])
+        job.finish(exit_code=result['exit_code'])
+    except ClientResponseError as e:
+        job.finish(error=e.response.text)
+    except (ClientError, BackendsError):
+        logging.getLogger(__name__).exception('Run job {} failed'.format(run_job_id))
+        job.finish(error='The command could not be run.')
+    except Exception:
+        # the CLI waits for the job to finish, so it must never be left
+        # running
+        logging.getLogger(__name__).exception('Run job {} failed'.format(run_job_id))
+        job.finish(error='The command could not be run.')
+
+
+@app.task
+def delete_old_run_jobs():
+    """Delete the one-off commands that started more than
+    ``RUN_JOB_RETENTION`` seconds ago, with their output.
+    """
+    cutoff = timezone.now() - datetime.timedelta(seconds=settings.RUN_JOB_RETENTION)
+    RunJob.objects.filter(created_at__lt=cutoff).delete()
@@ -0,0 +1,66 @@
+import mock
+import pytest
+
+from api_server.addons.backoff import get_provision_timeout, provision_check_attempt, provision_check_delay
+from api_server.addons.providers.base_provider import BaseAddonProvider
+
+
+@pytest.fixture(scope='function')
+def backoff_settings(settings):
+    settings.ADDON_PROVISION_BACKOFF_BASE = 1
+    settings.ADDON_PROVISION_BACKOFF_MAX = 60
+    return settings
+
+
+def test_provision_check_delay_waits_for_expected_time(backoff_settings):
+    assert provision_check_delay(0, 10, expected_time=300) == 290
+
+
+@pytest.mark.parametrize('attempt,low,high', [
+    (0, 0.5, 1),
+    (1, 1, 2),
+    (3, 4, 8),
+    (10, 30, 60),
+    (100, 30, 60),
+])
+def test_provision_check_delay_backoff(backoff_settings, attempt, low, high):
+    for _ in range(20):
+        delay = provision_check_delay(attempt, 1000, expected_time=300)
+        assert low <= delay <= high
+
+
+def test_provision_check_delay_jitter(backoff_settings):
+    with mock.patch('api_server.addons.backoff.random.uniform') as mocked:
+        mocked.return_value = 0.25
+        assert provision_check_delay(1, 0) == 1.25
+    mocked.assert_called_once_with(0, 1)
+
+
+def test_provision_check_delay_min_delay(backoff_settings):
+    assert provision_check_delay(0, 0, min_delay=30) == 30
+    assert provision_check_delay(0, 0, min_delay=None) <= 1
+
+
+@pytest.mark.parametrize('elapsed,attempt', [
+    (100, 0),
+    (300, 0),
+    (301, 1),
+    (303, 2),
+    (307, 3),
+    (1000, 9),
+])
+def test_provision_check_attempt(backoff_settings, elapsed, attempt):
+    assert provision_check_attempt(elapsed, expected_time=300) == attempt
+
+
+def test_provision_check_attempt_no_backoff(backoff_settings):
+    backoff_settings.ADDON_PROVISION_BACKOFF_BASE = 0
+    assert provision_check_attempt(1000) == 0
+
+
+def test_get_provision_timeout(settings):
+    settings.ADDON_PROVISION_TIMEOUT = 100
+    provider = BaseAddonProvider()
+    assert get_provision_timeout(provider) == 100
+    provider.provision_timeout = 10
+    assert get_provision_timeout(provider) == 10
@@ -0,0 +1,46 @@
+import mock
+import threading
+
+from api_server.addons import notifications
+from api_server.addons.notifications import LocalStateNotifier, get_state_notifier
+
+
+def test_local_notify_wakes_listener():
+    notifier = LocalStateNotifier()
+    with notifier.listen(1) as wait:
+        thread = threading.Thread(target=notifier.notify, args=(1,))
+        thread.start()
+        assert wait(5)
+        thread.join()
+
+
+def test_local_notify_before_wait():
+    notifier = LocalStateNotifier()
+    with notifier.listen(1) as wait:
+        notifier.notify(1)
+        assert wait(0)
+        # each notification is seen once
+        assert not wait(0)
+
+
+def test_local_other_addon():
+    notifier = LocalStateNotifier()
+    with notifier.listen(1) as wait:
+        notifier.notify(2)
+        assert not wait(0)
+
+
+def test_local_stops_listening():
+    notifier = LocalStateNotifier()
+    with notifier.listen(1):
+        pass
+    assert not notifier._events
+    notifier.notify(1)
+
+
+def test_get_state_notifier(settings):
+    settings.ADDON_STATE_NOTIFY_URL = None
+    with mock.patch.object(notifications, '_notifier', None):
+        notifier = get_state_notifier()
+        assert isinstance(notifier, LocalStateNotifier)
+        assert get_state_notifier() is notifier
@@ -3,10 +3,14 @@ from __future__ import absolute_import
 import celery
 import mock
 import pytest
+import uuid
+
+from celery.exceptions import Retry
 
 from api_server.addons.event import AddonEvent
 from api_server.addons.state import AddonState
 from api_server.addons.state_machine_manager import StateMachineManager, StateMachineTransitionError, _continue_state_machine
+from api_server.models import Addon
 
 
 @pytest.fixture(scope='function')
@@ -19,6 +23,15 @@ def mock_task():
     return mock.Mock(spec=celery.app.task.Task)
 
 
+@pytest.fixture(scope='function')
+def other_addon(addon):
+    """Another addon of the same app, still being provisioned.
+    """
+    return Addon.objects.create(
+        provider_name=addon.provider_name, provider_uuid=uuid.uuid4(), app=addon.app,
+        state=AddonState.waiting_for_provision, user=addon.user)
+
+
 @pytest.mark.django_db
 def test_transition_helper_success(addon, manager):
     """
@@ -30,8 +43,10 @@ def test_transition_helper_success(addon, manager):
             AddonEvent.provision_success: AddonState.provisioned
         }
     }
+    old_state_changed_at = addon.state_changed_at
     manager._transition_helper(addon, AddonEvent.provision_success)
     assert addon.state == AddonState.provisioned
+    assert addon.state_changed_at > old_state_changed_at
 
 
 @pytest.mark.django_db
@@ -100,3 +115,214 @@ def test_start_task(addon, manager, mock_task):
     manager.start_task(addon.id)
     mock_task.apply_async.assert_called_once_with(
         (addon.id,), link=_continue_state_machine.s())
+
+
+@pytest.mark.django_db
+def test_start_task_synchronous(addon, manager, mock_task):
+    """
+    @type addon: api_server.models.Addon
+    @type manager: StateMachineManager
+    """
+    manager.tasks_table = {
+        AddonState.waiting_for_provision: mock_task
+    }
+    with mock.patch('api_server.addons.state_machine_manager.get_provider_from_provider_name') as mock_get_provider, \
+            mock.patch('api_server.addons.state_machine_manager._run_state_machine') as mock_run:
+        mock_get_provider.return_value.synchronous = True
+        manager.start_task(addon.id)
+    mock_get_provider.assert_called_once_with(addon.provider_name)
+    mock_run.delay.assert_called_once_with(addon.id)
+    assert mock_task.apply_async.call_count == 0
+
+
+@pytest.mark.django_db
+def test_start_task_no_task(addon, manager, mock_task):
+    """
+    @type addon: api_server.models.Addon
+    @type manager: StateMachineManager
+    """
+    manager.tasks_table = {
+        AddonState.provisioned: mock_task
+    }
+    with mock.patch('api_server.addons.state_machine_manager.get_provider_from_provider_name') as mock_get_provider:
+        manager.start_task(addon.id)
+    assert mock_get_provider.call_count == 0
+    assert mock_task.apply_async.call_count == 0
+
+
+def _set_state(state):
+    def side_effect(addon_id):
+        Addon.objects.filter(pk=addon_id).update(state=state)
+        return addon_id
+    return side_effect
+
+
+@pytest.mark.django_db
+def test_run_tasks(addon, manager):
+    """
+    @type addon: api_server.models.Addon
+    @type manager: StateMachineManager
+    """
+    check_provision = mock.Mock(side_effect=_set_state(AddonState.provisioned))
+    set_config = mock.Mock(side_effect=_set_state(AddonState.ready))
+    manager.tasks_table = {
+        AddonState.waiting_for_provision: check_provision,
+        AddonState.provisioned: set_config,
+    }
+    manager.countdown_table = {}
+    manager.run_tasks(addon.id)
+    check_provision.assert_called_once_with(addon.id)
+    set_config.assert_called_once_with(addon.id)
+    addon.refresh_from_db()
+    assert addon.state is AddonState.ready
+
+
+@pytest.mark.django_db
+def test_run_tasks_no_progress(addon, manager):
+    """
+    @type addon: api_server.models.Addon
+    @type manager: StateMachineManager
+    """
+    check_provision = mock.Mock()
+    manager.tasks_table = {
+        AddonState.waiting_for_provision: check_provision,
+    }
+    manager.run_tasks(addon.id)
+    check_provision.assert_called_once_with(addon.id)
+
+
+@pytest.mark.django_db
+def test_run_tasks_retry(addon, manager, mock_task):
+    """
+    @type addon: api_server.models.Addon
+    @type manager: StateMachineManager
+    """
+    mock_task.side_effect = Retry()
+    manager.tasks_table = {
+        AddonState.waiting_for_provision: mock_task,
+    }
+    manager.run_tasks(addon.id)
+    mock_task.assert_called_once_with(addon.id)
+    mock_task.apply_async.assert_called_once_with(
+        (addon.id,), link=_continue_state_machine.s())
+
+
+@pytest.mark.django_db
+def test_start_task_countdown(addon, other_addon, manager, mock_task):
+    """
+    @type addon: api_server.models.Addon
+    @type manager: StateMachineManager
+    """
+    manager.tasks_table = {
+        AddonState.waiting_for_provision: mock_task
+    }
+    manager.countdown_table = {
+        AddonState.waiting_for_provision: 5
+    }
+    manager.start_task(addon.id)
+    mock_task.apply_async.assert_called_once_with(
+        (addon.id,), link=_continue_state_machine.s(), countdown=5)
+
+
+@pytest.mark.django_db
+def test_start_task_countdown_alone(addon, manager, mock_task):
+    """Without another addon of the app to wait for, the task runs right away.
+
+    @type addon: api_server.models.Addon
+    @type manager: StateMachineManager
+    """
+    manager.tasks_table = {
+        AddonState.waiting_for_provision: mock_task
+    }
+    manager.countdown_table = {
+        AddonState.waiting_for_provision: 5
+    }
+    manager.start_task(addon.id)
+    mock_task.apply_async.assert_called_once_with(
+        (addon.id,), link=_continue_state_machine.s())
+
+
+@pytest.mark.django_db
+def test_run_tasks_countdown_alone(addon, manager, mock_task):
+    """
+    @type addon: api_server.models.Addon
+    @type manager: StateMachineManager
+    """
+    check_provision = mock.Mock(side_effect=_set_state(AddonState.provisioned))
+    manager.tasks_table = {
+        AddonState.waiting_for_provision: check_provision,
+        AddonState.provisioned: mock_task,
+    }
+    manager.countdown_table = {
+        AddonState.provisioned: 5
+    }
+    manager.run_tasks(addon.id)
+    check_provision.assert_called_once_with(addon.id)
+    mock_task.assert_called_once_with(addon.id)
+    assert mock_task.apply_async.call_count == 0
+
+
+@pytest.mark.django_db
+def test_run_tasks_countdown(addon, other_addon, manager, mock_task):
+    """
+    @type addon: api_server.models.Addon
+    @type manager: StateMachineManager
+    """
+    check_provision = mock.Mock(side_effect=_set_state(AddonState.provisioned))
+    manager.tasks_table = {
+        AddonState.waiting_for_provision: check_provision,
+        AddonState.provisioned: mock_task,
+    }
+    manager.countdown_table = {
+        AddonState.provisioned: 5
+    }
+    manager.run_tasks(addon.id)
+    check_provision.assert_called_once_with(addon.id)
+    assert mock_task.call_count == 0
+    mock_task.apply_async.assert_called_once_with(
+        (addon.id,), link=_continue_state_machine.s(), countdown=5)
+
+
+@pytest.mark.django_db
+def test_start_task_bulk_driver(addon, manager, mock_task, settings):
+    """
+    @type addon: api_server.models.Addon
+    @type manager: StateMachineManager
+    """
+    settings.ADDON_BULK_DRIVER = True
+    manager.tasks_table = {
+        AddonState.waiting_for_provision: mock_task
+    }
+    manager.start_task(addon.id)
+    assert mock_task.apply_async.call_count == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transition_notifies_after_commit(addon, manager):
+    """
+    @type addon: api_server.models.Addon
+    @type manager: StateMachineManager
+    """
+    manager.transition_table = {
+        AddonState.waiting_for_provision: {
+            AddonEvent.provision_success: AddonState.provisioned
+        }
+    }
+    with mock.patch('api_server.addons.state_machine_manager.notify_state_changed') as mocked:
+        with manager.transition(addon.id, AddonEvent.provision_success):
+            pass
+        mocked.assert_called_once_with(addon.id)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transition_failure_does_not_notify(addon, manager):
+    """
+    @type addon: api_server.models.Addon
+    @type manager: StateMachineManager
+    """
+    manager.transition_table = {}
+    with mock.patch('api_server.addons.state_machine_manager.notify_state_changed') as mocked:
+        with pytest.raises(StateMachineTransitionError):
+            with manager.transition(addon.id, AddonEvent.provision_success):
+                pass
+        assert mocked.call_count == 0
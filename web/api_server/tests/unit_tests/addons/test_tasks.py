@@ -1,20 +1,28 @@
+import datetime
 import mock
 import pytest
+import uuid
 
 from celery.exceptions import Retry
+from django.db import connection
+from django.utils import timezone
 
 from api_server.addons.providers.base_provider import BaseAddonProvider
 from api_server.addons.providers.exceptions import AddonProviderError
 from api_server.addons.state import AddonState
-from api_server.addons.tasks import check_provision, set_config, deprovision
+from api_server.addons.tasks import advance_addons, check_provision, deprovision, reconcile_addons, set_config
 from api_server.celery import app
 from api_server.clients.exceptions import ClientError
+from api_server.models import Addon
 from api_server.paas_backends import BackendsError
 
 
 @pytest.fixture(scope='function')
 def fake_provider():
-    return mock.Mock(spec=BaseAddonProvider)
+    provider = mock.Mock(spec=BaseAddonProvider)
+    provider.expected_provision_time = 0
+    provider.provision_timeout = None
+    return provider
 
 
 @pytest.mark.django_db
@@ -114,6 +122,78 @@ def test_check_provision_retry(addon, fake_provider):
         addon.provider_uuid, config_customization=None)
 
 
+NOW = datetime.datetime(2016, 5, 1, tzinfo=timezone.utc)
+
+
+def _provision_started(addon, seconds_ago):
+    addon.state_changed_at = NOW - datetime.timedelta(seconds=seconds_ago)
+    addon.save()
+
+
+@pytest.mark.django_db
+def test_check_provision_retry_backoff(addon, fake_provider):
+    """
+    @type addon: api_server.models.Addon
+    @type fake_provider: mock.Mock
+    """
+    _provision_started(addon, seconds_ago=100)
+    fake_provider.provision_complete.return_value = (False, 5)
+    fake_provider.expected_provision_time = 300
+    with mock.patch('api_server.addons.tasks.get_provider_from_provider_name') as mocked, \
+            mock.patch('api_server.addons.tasks.timezone.now') as mock_now, \
+            mock.patch.object(check_provision, 'retry') as mock_retry:
+        mocked.return_value = fake_provider
+        mock_now.return_value = NOW
+        mock_retry.return_value = Retry()
+        with pytest.raises(Retry):
+            check_provision.apply(args=(addon.id,), throw=True)
+    mock_retry.assert_called_once_with(countdown=200.0)
+    addon.refresh_from_db()
+    assert addon.state is AddonState.waiting_for_provision
+
+
+@pytest.mark.django_db
+def test_check_provision_retry_until_deadline(addon, fake_provider, settings):
+    """
+    @type addon: api_server.models.Addon
+    @type fake_provider: mock.Mock
+    """
+    settings.ADDON_PROVISION_TIMEOUT = 100
+    fake_provider.provision_complete.return_value = (False, 0)
+    fake_provider.expected_provision_time = 300
+    _provision_started(addon, seconds_ago=10)
+    with mock.patch('api_server.addons.tasks.get_provider_from_provider_name') as mocked, \
+            mock.patch('api_server.addons.tasks.timezone.now') as mock_now, \
+            mock.patch.object(check_provision, 'retry') as mock_retry:
+        mocked.return_value = fake_provider
+        mock_now.return_value = NOW
+        mock_retry.return_value = Retry()
+        with pytest.raises(Retry):
+            check_provision.apply(args=(addon.id,), throw=True)
+    _, kwargs = mock_retry.call_args
+    assert kwargs['countdown'] == 90.0
+
+
+@pytest.mark.django_db
+def test_check_provision_timeout(addon, fake_provider, settings):
+    """
+    @type addon: api_server.models.Addon
+    @type fake_provider: mock.Mock
+    """
+    settings.ADDON_PROVISION_TIMEOUT = 100
+    _provision_started(addon, seconds_ago=200)
+    fake_provider.provision_complete.return_value = (False, 0)
+    with mock.patch('api_server.addons.tasks.get_provider_from_provider_name') as mocked, \
+            mock.patch('api_server.addons.tasks.timezone.now') as mock_now:
+        mocked.return_value = fake_provider
+        mock_now.return_value = NOW
+        result = check_provision.delay(addon.id)
+    assert result.get() == addon.id
+    addon.refresh_from_db()
+    assert addon.state is AddonState.error
+    assert fake_provider.get_config.call_count == 0
+
+
 @pytest.mark.django_db
 def test_check_provision_wrong_state(addon, fake_provider):
     """
@@ -253,6 +333,138 @@ def test_set_config_simple(addon, mock_backend_authenticated_client):
         addon.app.app_id, addon.config)
 
 
+@pytest.mark.django_db
+def test_set_config_batch(addon, make_app, user, mock_backend_authenticated_client):
+    """
+    @type addon: api_server.models.Addon
+    @type mock_backend_authenticated_client: mock.Mock
+    """
+    addon.state = AddonState.provisioned
+    addon.config = {
+        'DATABASE_URL': 'fake://fake',
+        'ENV_VAR1': 'var1',
+    }
+    addon.save()
+    other = Addon.objects.create(
+        provider_name='test_provider', provider_uuid=uuid.uuid4(), app=make_app, user=user,
+        state=AddonState.provisioned, config={'SECRET_KEY': 'secret', 'ENV_VAR1': 'var2'})
+    pending = Addon.objects.create(
+        provider_name='test_provider', provider_uuid=uuid.uuid4(), app=make_app, user=user,
+        state=AddonState.waiting_for_provision)
+    with mock.patch('api_server.addons.tasks.get_backend_authenticated_client') as mocked:
+        mocked.return_value = mock_backend_authenticated_client
+        assert set_config.delay(addon.id).get() == addon.id
+        assert set_config.delay(other.id).get() == other.id
+    mock_backend_authenticated_client.set_application_env_variables.assert_called_once_with(
+        addon.app.app_id, {
+            'DATABASE_URL': 'fake://fake',
+            'ENV_VAR1': 'var2',
+            'SECRET_KEY': 'secret',
+        })
+    for x in [addon, other, pending]:
+        x.refresh_from_db()
+    assert addon.state is AddonState.ready
+    assert other.state is AddonState.ready
+    assert pending.state is AddonState.waiting_for_provision
+
+
+@pytest.mark.django_db
+def test_set_config_batch_failure(addon, make_app, user, mock_backend_authenticated_client):
+    """
+    @type addon: api_server.models.Addon
+    @type mock_backend_authenticated_client: mock.Mock
+    """
+    addon.state = AddonState.provisioned
+    addon.config = {
+        'DATABASE_URL': 'fake://fake',
+    }
+    addon.save()
+    other = Addon.objects.create(
+        provider_name='test_provider', provider_uuid=uuid.uuid4(), app=make_app, user=user,
+        state=AddonState.provisioned, config={'SECRET_KEY': 'secret'})
+    mock_backend_authenticated_client.set_application_env_variables.side_effect = ClientError
+    with mock.patch('api_server.addons.tasks.get_backend_authenticated_client') as mocked:
+        mocked.return_value = mock_backend_authenticated_client
+        assert set_config.delay(addon.id).get() == addon.id
+    addon.refresh_from_db()
+    other.refresh_from_db()
+    assert addon.state is AddonState.error_should_deprovision
+    assert other.state is AddonState.error_should_deprovision
+
+
+@pytest.mark.django_db(transaction=True)
+def test_set_config_no_lock_during_release(addon, mock_backend_authenticated_client):
+    """The batch is claimed, but not locked, while the backend makes a release.
+
+    @type addon: api_server.models.Addon
+    @type mock_backend_authenticated_client: mock.Mock
+    """
+    addon.state = AddonState.provisioned
+    addon.config = {'DATABASE_URL': 'fake://fake'}
+    addon.save()
+
+    def set_application_env_variables(app_id, config):
+        assert not connection.in_atomic_block
+        assert Addon.objects.get(pk=addon.id).claimed_until > timezone.now()
+    mock_backend_authenticated_client.set_application_env_variables.side_effect = set_application_env_variables
+    with mock.patch('api_server.addons.tasks.get_backend_authenticated_client') as mocked:
+        mocked.return_value = mock_backend_authenticated_client
+        set_config.delay(addon.id)
+    addon.refresh_from_db()
+    assert addon.state is AddonState.ready
+    assert addon.claimed_until <= timezone.now()
+
+
+@pytest.mark.django_db
+def test_set_config_claimed(addon, make_app, user, mock_backend_authenticated_client):
+    """Addons claimed by another worker are left to it.
+
+    @type addon: api_server.models.Addon
+    @type mock_backend_authenticated_client: mock.Mock
+    """
+    claimed_until = timezone.now() + datetime.timedelta(minutes=1)
+    addon.state = AddonState.provisioned
+    addon.config = {'DATABASE_URL': 'fake://fake'}
+    addon.save()
+    other = Addon.objects.create(
+        provider_name='test_provider', provider_uuid=uuid.uuid4(), app=make_app, user=user,
+        state=AddonState.provisioned, config={'SECRET_KEY': 'secret'})
+    Addon.objects.filter(pk=other.pk).update(claimed_until=claimed_until)
+    with mock.patch('api_server.addons.tasks.get_backend_authenticated_client') as mocked:
+        mocked.return_value = mock_backend_authenticated_client
+        set_config.delay(addon.id)
+    mock_backend_authenticated_client.set_application_env_variables.assert_called_once_with(
+        addon.app.app_id, {'DATABASE_URL': 'fake://fake'})
+    other.refresh_from_db()
+    assert other.state is AddonState.provisioned
+    assert other.claimed_until == claimed_until
+
+
+@pytest.mark.django_db
+def test_set_config_addon_claimed(addon, mock_backend_authenticated_client, settings):
+    """If another worker claimed the addon itself, the task checks again
+    later, instead of being started again by the chain right away.
+
+    @type addon: api_server.models.Addon
+    @type mock_backend_authenticated_client: mock.Mock
+    """
+    settings.ADDON_CLAIM_RETRY_DELAY = 7
+    addon.state = AddonState.provisioned
+    addon.config = {'DATABASE_URL': 'fake://fake'}
+    addon.claimed_until = timezone.now() + datetime.timedelta(minutes=1)
+    addon.save()
+    with mock.patch('api_server.addons.tasks.get_backend_authenticated_client') as mocked, \
+            mock.patch.object(set_config, 'retry') as mock_retry:
+        mocked.return_value = mock_backend_authenticated_client
+        mock_retry.return_value = Retry()
+        with pytest.raises(Retry):
+            set_config.apply(args=(addon.id,), throw=True)
+    mock_retry.assert_called_once_with(countdown=7)
+    assert mock_backend_authenticated_client.set_application_env_variables.call_count == 0
+    addon.refresh_from_db()
+    assert addon.state is AddonState.provisioned
+
+
 @pytest.mark.django_db
 def test_set_config_wrong_state(addon, fake_provider):
     """
@@ -371,3 +583,286 @@ def test_set_config_failure(addon, mock_backend_authenticated_client):
     assert addon.state is AddonState.error_should_deprovision
     mock_backend_authenticated_client.set_application_env_variables.assert_called_once_with(
         addon.app.app_id, addon.config)
+
+
+@pytest.mark.django_db
+def test_advance_addons(addon, make_app, user, fake_provider, mock_backend_authenticated_client):
+    """
+    @type addon: api_server.models.Addon
+    @type fake_provider: mock.Mock
+    @type mock_backend_authenticated_client: mock.Mock
+    """
+    provisioned = Addon.objects.create(
+        provider_name='test_provider', provider_uuid=uuid.uuid4(), app=make_app, user=user,
+        state=AddonState.provisioned, config={'SECRET_KEY': 'secret'})
+    should_deprovision = Addon.objects.create(
+        provider_name='test_provider', provider_uuid=uuid.uuid4(), app=make_app, user=user,
+        state=AddonState.error_should_deprovision)
+    ready = Addon.objects.create(
+        provider_name='test_provider', provider_uuid=uuid.uuid4(), app=make_app, user=user,
+        state=AddonState.ready)
+    fake_provider.provision_complete.return_value = (True, 0)
+    fake_provider.get_config.return_value = {
+        'config': {'DATABASE_URL': 'fake://fake'}
+    }
+    with mock.patch('api_server.addons.tasks.get_provider_from_provider_name') as mock_get_provider, \
+            mock.patch('api_server.addons.tasks.get_backend_authenticated_client') as mock_get_client:
+        mock_get_provider.return_value = fake_provider
+        mock_get_client.return_value = mock_backend_authenticated_client
+        advance_addons.delay().get()
+    # once per state
+    assert mock_get_provider.call_count == 2
+    fake_provider.provision_complete.assert_called_once_with(addon.provider_uuid)
+    fake_provider.deprovision.assert_called_once_with(should_deprovision.provider_uuid)
+    mock_backend_authenticated_client.set_application_env_variables.assert_called_once_with(
+        make_app.app_id, {'DATABASE_URL': 'fake://fake', 'SECRET_KEY': 'secret'})
+    for x in [addon, provisioned, should_deprovision, ready]:
+        x.refresh_from_db()
+    assert addon.state is AddonState.ready
+    assert provisioned.state is AddonState.ready
+    assert should_deprovision.state is AddonState.error
+    assert ready.state is AddonState.ready
+
+
+@pytest.mark.django_db
+def test_advance_addons_not_ready(addon, fake_provider):
+    """
+    @type addon: api_server.models.Addon
+    @type fake_provider: mock.Mock
+    """
+    fake_provider.provision_complete.return_value = (False, 30)
+    with mock.patch('api_server.addons.tasks.get_provider_from_provider_name') as mocked:
+        mocked.return_value = fake_provider
+        advance_addons.delay().get()
+    addon.refresh_from_db()
+    assert addon.state is AddonState.waiting_for_provision
+    assert fake_provider.get_config.call_count == 0
+
+
+@pytest.mark.django_db
+def test_advance_addons_check_provision_backoff(addon, fake_provider):
+    """Pending addons are not checked again until their next check is
+    due, the same as with check_provision.
+
+    @type addon: api_server.models.Addon
+    @type fake_provider: mock.Mock
+    """
+    addon.state_changed_at = timezone.now() - datetime.timedelta(seconds=100)
+    addon.save()
+    fake_provider.provision_complete.return_value = (False, 5)
+    fake_provider.expected_provision_time = 300
+    with mock.patch('api_server.addons.tasks.get_provider_from_provider_name') as mocked:
+        mocked.return_value = fake_provider
+        advance_addons.delay().get()
+        advance_addons.delay().get()
+    fake_provider.provision_complete.assert_called_once_with(addon.provider_uuid)
+    addon.refresh_from_db()
+    remaining = (addon.claimed_until - timezone.now()).total_seconds()
+    assert 190 < remaining <= 200
+
+
+@pytest.mark.django_db
+def test_advance_addons_no_provider(addon, fake_provider):
+    """
+    @type addon: api_server.models.Addon
+    @type fake_provider: mock.Mock
+    """
+    with mock.patch('api_server.addons.tasks.get_provider_from_provider_name') as mocked:
+        mocked.side_effect = AddonProviderError
+        advance_addons.delay().get()
+    addon.refresh_from_db()
+    assert addon.state is AddonState.error
+
+
+@pytest.mark.django_db
+def test_advance_addons_unexpected_error(addon, make_app, user, fake_provider):
+    """
+    @type addon: api_server.models.Addon
+    @type fake_provider: mock.Mock
+    """
+    other = Addon.objects.create(
+        provider_name='test_provider', provider_uuid=uuid.uuid4(), app=make_app, user=user,
+        state=AddonState.waiting_for_provision)
+    fake_provider.provision_complete.side_effect = [Exception, (True, 0)]
+    fake_provider.get_config.return_value = {
+        'config': {'DATABASE_URL': 'fake://fake'}
+    }
+    with mock.patch('api_server.addons.tasks.get_provider_from_provider_name') as mocked, \
+            mock.patch('api_server.addons.tasks._set_config'):
+        mocked.return_value = fake_provider
+        advance_addons.delay().get()
+    addon.refresh_from_db()
+    other.refresh_from_db()
+    assert addon.state is AddonState.waiting_for_provision
+    assert other.state is AddonState.provisioned
+
+
+@pytest.mark.django_db
+def test_advance_addons_batch_size(addon, make_app, user, fake_provider, settings):
+    """
+    @type addon: api_server.models.Addon
+    @type fake_provider: mock.Mock
+    """
+    settings.ADDON_BULK_DRIVER_BATCH_SIZE = 1
+    Addon.objects.create(
+        provider_name='test_provider', provider_uuid=uuid.uuid4(), app=make_app, user=user,
+        state=AddonState.waiting_for_provision)
+    fake_provider.provision_complete.return_value = (False, 0)
+    with mock.patch('api_server.addons.tasks.get_provider_from_provider_name') as mocked:
+        mocked.return_value = fake_provider
+        advance_addons.delay().get()
+    fake_provider.provision_complete.assert_called_once_with(addon.provider_uuid)
+
+
+@pytest.mark.django_db
+def test_advance_addons_round_robin(addon, make_app, user, fake_provider, settings):
+    """Addons that stay pending don't keep the others out of the batch.
+
+    @type addon: api_server.models.Addon
+    @type fake_provider: mock.Mock
+    """
+    settings.ADDON_BULK_DRIVER_BATCH_SIZE = 1
+    # check again right away
+    settings.ADDON_PROVISION_BACKOFF_BASE = 0
+    newer = Addon.objects.create(
+        provider_name='test_provider', provider_uuid=uuid.uuid4(), app=make_app, user=user,
+        state=AddonState.waiting_for_provision)
+    fake_provider.provision_complete.return_value = (False, 0)
+    with mock.patch('api_server.addons.tasks.get_provider_from_provider_name') as mocked:
+        mocked.return_value = fake_provider
+        advance_addons.delay().get()
+        advance_addons.delay().get()
+        advance_addons.delay().get()
+    assert fake_provider.provision_complete.call_args_list == [
+        mock.call(addon.provider_uuid), mock.call(newer.provider_uuid), mock.call(addon.provider_uuid)]
+
+
+@pytest.mark.django_db
+def test_advance_addons_claimed(addon, make_app, user, fake_provider, mock_backend_authenticated_client):
+    """Addons claimed by another worker are left to it, and their config
+    is not set along with the addons claimed here.
+
+    @type addon: api_server.models.Addon
+    @type fake_provider: mock.Mock
+    @type mock_backend_authenticated_client: mock.Mock
+    """
+    claimed_until = timezone.now() + datetime.timedelta(minutes=1)
+    Addon.objects.filter(pk=addon.pk).update(claimed_until=claimed_until)
+    claimed = Addon.objects.create(
+        provider_name='test_provider', provider_uuid=uuid.uuid4(), app=make_app, user=user,
+        state=AddonState.provisioned, config={'SECRET_KEY': 'secret'})
+    Addon.objects.filter(pk=claimed.pk).update(claimed_until=claimed_until)
+    provisioned = Addon.objects.create(
+        provider_name='test_provider', provider_uuid=uuid.uuid4(), app=make_app, user=user,
+        state=AddonState.provisioned, config={'DATABASE_URL': 'fake://fake'})
+    with mock.patch('api_server.addons.tasks.get_provider_from_provider_name') as mock_get_provider, \
+            mock.patch('api_server.addons.tasks.get_backend_authenticated_client') as mock_get_client:
+        mock_get_provider.return_value = fake_provider
+        mock_get_client.return_value = mock_backend_authenticated_client
+        advance_addons.delay().get()
+    assert fake_provider.provision_complete.call_count == 0
+    mock_backend_authenticated_client.set_application_env_variables.assert_called_once_with(
+        make_app.app_id, {'DATABASE_URL': 'fake://fake'})
+    for x in [addon, claimed, provisioned]:
+        x.refresh_from_db()
+    assert addon.claimed_until == claimed_until
+    assert claimed.state is AddonState.provisioned
+    assert claimed.claimed_until == claimed_until
+    assert provisioned.state is AddonState.ready
+    assert provisioned.claimed_until <= timezone.now()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_advance_addons_no_lock_during_calls(addon, fake_provider):
+    """
+    @type addon: api_server.models.Addon
+    @type fake_provider: mock.Mock
+    """
+    def provision_complete(provider_uuid):
+        assert not connection.in_atomic_block
+        return False, 0
+    fake_provider.provision_complete.side_effect = provision_complete
+    with mock.patch('api_server.addons.tasks.get_provider_from_provider_name') as mocked:
+        mocked.return_value = fake_provider
+        advance_addons.delay().get()
+    assert fake_provider.provision_complete.call_count == 1
+
+
+@pytest.mark.django_db
+def test_advance_addons_timeout(addon, fake_provider, settings):
+    """
+    @type addon: api_server.models.Addon
+    @type fake_provider: mock.Mock
+    """
+    settings.ADDON_PROVISION_TIMEOUT = 100
+    addon.state_changed_at = timezone.now() - datetime.timedelta(seconds=200)
+    addon.save()
+    fake_provider.provision_complete.return_value = (False, 0)
+    with mock.patch('api_server.addons.tasks.get_provider_from_provider_name') as mocked:
+        mocked.return_value = fake_provider
+        advance_addons.delay().get()
+    addon.refresh_from_db()
+    assert addon.state is AddonState.error
+
+
+@pytest.mark.django_db
+def test_deprovision_wrong_state(addon, fake_provider):
+    """
+    @type addon: api_server.models.Addon
+    @type fake_provider: mock.Mock
+    """
+    with mock.patch('api_server.addons.tasks.get_provider_from_provider_name') as mocked:
+        mocked.return_value = fake_provider
+        result = deprovision.delay(addon.id)
+    assert result.get() == addon.id
+    addon.refresh_from_db()
+    assert addon.state is AddonState.waiting_for_provision
+    assert fake_provider.deprovision.call_count == 0
+
+
+@pytest.mark.django_db
+def test_reconcile_addons(addon, make_app, user, settings):
+    """
+    @type addon: api_server.models.Addon
+    """
+    settings.ADDON_RECONCILE_AFTER = 60
+    settings.ADDON_PROVISION_TIMEOUT = 600
+
+    def make_addon(state, seconds_ago):
+        return Addon.objects.create(
+            provider_name='test_provider', provider_uuid=uuid.uuid4(), app=make_app, user=user,
+            state=state, state_changed_at=timezone.now() - datetime.timedelta(seconds=seconds_ago))
+
+    stuck_provisioned = make_addon(AddonState.provisioned, 120)
+    stuck_deprovision = make_addon(AddonState.error_should_deprovision, 120)
+    stuck_waiting = make_addon(AddonState.waiting_for_provision, 700)
+    recent_provisioned = make_addon(AddonState.provisioned, 10)
+    # still within the provision timeout
+    slow_waiting = make_addon(AddonState.waiting_for_provision, 120)
+    old_ready = make_addon(AddonState.ready, 1000)
+
+    with mock.patch('api_server.addons.tasks.StateMachineManager.start_task') as mock_start_task:
+        result = reconcile_addons.delay().get()
+    assert result == {
+        'provisioned': 1,
+        'error_should_deprovision': 1,
+        'waiting_for_provision': 1,
+    }
+    assert sorted(x[0][0] for x in mock_start_task.call_args_list) == sorted([
+        stuck_provisioned.id, stuck_deprovision.id, stuck_waiting.id])
+    for x in [stuck_provisioned, stuck_deprovision, stuck_waiting]:
+        x.refresh_from_db()
+        assert x.reconcile_count == 1
+    for x in [addon, recent_provisioned, slow_waiting, old_ready]:
+        x.refresh_from_db()
+        assert x.reconcile_count == 0
+
+
+@pytest.mark.django_db
+def test_reconcile_addons_nothing_stuck(addon):
+    """
+    @type addon: api_server.models.Addon
+    """
+    with mock.patch('api_server.addons.tasks.StateMachineManager.start_task') as mock_start_task:
+        assert reconcile_addons.delay().get() == {}
+    assert mock_start_task.call_count == 0
@@ -0,0 +1,140 @@
+import json
+import mock
+import pytest
+import uuid
+
+from api_server.addons.providers.exceptions import AddonProviderInvalidOperationError
+from api_server.addons.state import AddonState
+from api_server.clients.exceptions import ClientResponseError
+from api_server.models import Addon, App
+
+
+@pytest.yield_fixture(autouse=True)
+def auth_client(mock_backend_authenticated_client):
+    """The PaaS backend, asked whether the user can access the apps.
+    """
+    with mock.patch('api_server.api.addon_clone_api_view.get_backend_authenticated_client') as mocked:
+        mocked.return_value = mock_backend_authenticated_client
+        yield mock_backend_authenticated_client
+
+
+@pytest.mark.django_db
+def test_POST(client, http_headers, app_id, make_app, mock_manager, mock_addon_provider, addon):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    new_uuid = uuid.uuid4()
+    mock_addon_provider.clone.return_value = {
+        'message': 'test message',
+        'uuid': new_uuid,
+    }
+    with mock.patch('api_server.api.addon_clone_api_view.StateMachineManager') as mocked:
+        mocked.return_value = mock_manager
+        with mock.patch('api_server.api.addon_clone_api_view.get_provider_from_provider_name') as mock_get_provider:
+            mock_get_provider.return_value = mock_addon_provider
+            resp = client.post('/api/v1/apps/{}/addons/{}/clone/'.format(app_id, addon.display_name), data=json.dumps(
+                {'config_customization': 'copy'}), content_type='application/json', **http_headers)
+    assert resp.status_code == 200
+    result = resp.json()
+    assert result['message'] == 'test message'
+    assert result['addon']['config_customization'] == 'COPY'
+    assert result['addon']['display_name'] != addon.display_name
+
+    clone = Addon.objects.get(provider_uuid=new_uuid)
+    assert clone.app == make_app
+    assert clone.provider_name == addon.provider_name
+    assert clone.state is AddonState.waiting_for_provision
+    mock_addon_provider.clone.assert_called_once_with(addon.provider_uuid, app_id)
+    mock_manager.start_task.assert_called_once_with(clone.id)
+
+
+@pytest.mark.django_db
+def test_POST_other_app(client, http_headers, app_id, make_app, mock_manager, mock_addon_provider, addon, settings, auth_client):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    other_app = App.objects.create(app_id='staging-app', backend=settings.DEFAULT_PAAS_BACKEND)
+    new_uuid = uuid.uuid4()
+    mock_addon_provider.clone.return_value = {
+        'message': 'test message',
+        'uuid': new_uuid,
+    }
+    with mock.patch('api_server.api.addon_clone_api_view.StateMachineManager') as mocked:
+        mocked.return_value = mock_manager
+        with mock.patch('api_server.api.addon_clone_api_view.get_provider_from_provider_name') as mock_get_provider:
+            mock_get_provider.return_value = mock_addon_provider
+            resp = client.post('/api/v1/apps/{}/addons/{}/clone/'.format(app_id, addon.display_name), data=json.dumps(
+                {'app_id': other_app.app_id}), content_type='application/json', **http_headers)
+    assert resp.status_code == 200
+    assert Addon.objects.get(provider_uuid=new_uuid).app == other_app
+    mock_addon_provider.clone.assert_called_once_with(addon.provider_uuid, other_app.app_id)
+    assert auth_client.get_application_owner.call_args_list == [
+        mock.call(app_id), mock.call(other_app.app_id)]
+
+
+@pytest.mark.django_db
+def test_POST_not_supported(client, http_headers, app_id, make_app, mock_manager, mock_addon_provider, addon):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    mock_addon_provider.clone.side_effect = AddonProviderInvalidOperationError('not supported')
+    with mock.patch('api_server.api.addon_clone_api_view.StateMachineManager') as mocked:
+        mocked.return_value = mock_manager
+        with mock.patch('api_server.api.addon_clone_api_view.get_provider_from_provider_name') as mock_get_provider:
+            mock_get_provider.return_value = mock_addon_provider
+            resp = client.post('/api/v1/apps/{}/addons/{}/clone/'.format(app_id, addon.display_name), data=json.dumps(
+                {}), content_type='application/json', **http_headers)
+    assert resp.status_code == 400
+    assert resp.json()['error'] == 'not supported'
+    assert mock_manager.start_task.call_count == 0
+
+
+@pytest.mark.django_db
+def test_POST_no_access_to_other_app(client, http_headers, app_id, make_app, mock_addon_provider, addon, settings, auth_client):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    other_app = App.objects.create(app_id='staging-app', backend=settings.DEFAULT_PAAS_BACKEND)
+    response = mock.Mock(status_code=403)
+    response.json.return_value = {'detail': 'forbidden'}
+
+    def get_application_owner(target_app_id):
+        if target_app_id == other_app.app_id:
+            raise ClientResponseError(response)
+        return {'username': 'owner'}
+    auth_client.get_application_owner.side_effect = get_application_owner
+    with mock.patch('api_server.api.addon_clone_api_view.get_provider_from_provider_name') as mock_get_provider:
+        mock_get_provider.return_value = mock_addon_provider
+        resp = client.post('/api/v1/apps/{}/addons/{}/clone/'.format(app_id, addon.display_name), data=json.dumps(
+            {'app_id': other_app.app_id}), content_type='application/json', **http_headers)
+    assert resp.status_code == 403
+    assert mock_addon_provider.clone.call_count == 0
+
+
+@pytest.mark.django_db
+def test_POST_no_addon(client, http_headers, app_id, make_app):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    resp = client.post('/api/v1/apps/{}/addons/{}/clone/'.format(app_id, 'no-such-addon'), data=json.dumps(
+        {}), content_type='application/json', **http_headers)
+    assert resp.status_code == 404
+
+
+@pytest.mark.django_db
+def test_POST_no_target_app(client, http_headers, app_id, make_app, mock_addon_provider, addon):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    with mock.patch('api_server.api.addon_clone_api_view.get_provider_from_provider_name') as mock_get_provider:
+        mock_get_provider.return_value = mock_addon_provider
+        resp = client.post('/api/v1/apps/{}/addons/{}/clone/'.format(app_id, addon.display_name), data=json.dumps(
+            {'app_id': 'no-such-app'}), content_type='application/json', **http_headers)
+    assert resp.status_code == 400
+    assert mock_addon_provider.clone.call_count == 0
@@ -3,6 +3,10 @@ import pytest
 
 from contextlib import contextmanager
 
+from api_server.addons.notifications import LocalStateNotifier
+from api_server.addons.state import AddonState
+from api_server.models import Addon
+
 
 @contextmanager
 def mock_context_manager(*args, **kwargs):
@@ -24,6 +28,73 @@ def test_GET(client, http_headers, app_id, make_app, addon):
     assert result == addon.to_dict()
 
 
+@pytest.mark.django_db
+def test_GET_wait_for_state_change(client, http_headers, app_id, make_app, addon, settings):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    settings.ADDON_WAIT_POLL_INTERVAL = 10
+    notifier = LocalStateNotifier()
+
+    @contextmanager
+    def listen(addon_id):
+        def wait(timeout):
+            # another process finishes provisioning while we wait
+            Addon.objects.filter(pk=addon_id).update(state=AddonState.provisioned)
+            notifier.notify(addon_id)
+            return True
+        yield wait
+
+    notifier.listen = listen
+    with mock.patch('api_server.api.addon_details_api_view.get_state_notifier', return_value=notifier):
+        resp = client.get('/api/v1/apps/{}/addons/{}/?wait_for=ready&timeout=30'.format(
+            app_id, addon.display_name), **http_headers)
+    assert resp.status_code == 200
+    assert resp.json()['state'] == 'provisioned'
+
+
+@pytest.mark.django_db
+def test_GET_wait_for_current_state(client, http_headers, app_id, make_app, addon):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    with mock.patch('api_server.api.addon_details_api_view.get_state_notifier') as mocked:
+        resp = client.get('/api/v1/apps/{}/addons/{}/?wait_for=waiting_for_provision'.format(
+            app_id, addon.display_name), **http_headers)
+    assert resp.status_code == 200
+    assert resp.json()['state'] == 'waiting_for_provision'
+    assert mocked.return_value.listen.call_count == 0
+
+
+@pytest.mark.django_db
+def test_GET_wait_for_timeout(client, http_headers, app_id, make_app, addon):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    resp = client.get('/api/v1/apps/{}/addons/{}/?wait_for=ready&timeout=0'.format(
+        app_id, addon.display_name), **http_headers)
+    assert resp.status_code == 200
+    assert resp.json()['state'] == 'waiting_for_provision'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', [
+    'wait_for=not_a_state',
+    'wait_for=ready&timeout=soon',
+])
+def test_GET_wait_for_invalid(query, client, http_headers, app_id, make_app, addon):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    resp = client.get('/api/v1/apps/{}/addons/{}/?{}'.format(
+        app_id, addon.display_name, query), **http_headers)
+    assert resp.status_code == 400
+
+
 @pytest.mark.django_db
 def test_DELETE(client, http_headers, app_id, make_app, mock_manager, mock_addon_provider, addon):
     """
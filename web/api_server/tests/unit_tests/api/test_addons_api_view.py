@@ -3,6 +3,9 @@ import mock
 import pytest
 import uuid
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from api_server.addons.state import AddonState
 from api_server.models import Addon
 
@@ -27,6 +30,27 @@ def test_GET(client, http_headers, app_id, make_app, user):
     assert resp.json()['results'] == [x.to_dict() for x in addons]
 
 
+@pytest.mark.django_db
+def test_GET_query_count(client, make_http_headers, app_id, make_app, user):
+    """The number of queries must not grow with the number of addons.
+
+    @type client: django.test.Client
+    """
+    def num_queries():
+        with CaptureQueriesContext(connection) as context:
+            resp = client.get('/api/v1/apps/{}/addons/'.format(app_id), **make_http_headers())
+        assert resp.status_code == 200
+        return len(context.captured_queries)
+
+    Addon.objects.create(provider_name='test_provider', provider_uuid=uuid.uuid4(
+    ), app=make_app, state=AddonState.ready, user=user)
+    baseline = num_queries()
+    for _ in range(10):
+        Addon.objects.create(provider_name='test_provider', provider_uuid=uuid.uuid4(
+        ), app=make_app, state=AddonState.ready, user=user)
+    assert num_queries() == baseline
+
+
 @pytest.mark.django_db
 def test_POST(client, http_headers, app_id, make_app, mock_manager, mock_addon_provider):
     """
@@ -40,6 +40,7 @@ def test_POST(value, client, http_headers, mock_backend_authenticated_client, ap
         'VAR2': 'value2',
         'VAR3': value,
     }
+    mock_backend_authenticated_client.get_application_env_variables.return_value = {}
     with mock.patch('api_server.api.app_env_variables_api_view.get_backend_authenticated_client') as mocked:
         mocked.return_value = mock_backend_authenticated_client
         resp = client.post('/api/v1/apps/{}/env/'.format(app_id), data=json.dumps(bindings), content_type='application/json', **http_headers)
@@ -47,6 +48,54 @@ def test_POST(value, client, http_headers, mock_backend_authenticated_client, ap
     mock_backend_authenticated_client.set_application_env_variables.assert_called_once_with(app_id, bindings)
 
 
+@pytest.mark.django_db
+def test_POST_only_changed(client, http_headers, mock_backend_authenticated_client, app_id, make_app):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    @type mock_backend_authenticated_client: mock.Mock
+    """
+    mock_backend_authenticated_client.get_application_env_variables.return_value = {
+        'VAR1': 'value1',
+        'VAR2': 'value2',
+    }
+    bindings = {
+        'VAR1': 'value1',
+        'VAR2': 'new',
+        'VAR3': None,
+        'VAR4': None,
+    }
+    changed = {
+        'VAR2': 'new',
+    }
+    with mock.patch('api_server.api.app_env_variables_api_view.get_backend_authenticated_client') as mocked:
+        mocked.return_value = mock_backend_authenticated_client
+        resp = client.post('/api/v1/apps/{}/env/'.format(app_id), data=json.dumps(bindings), content_type='application/json', **http_headers)
+    assert resp.status_code == 204
+    mock_backend_authenticated_client.set_application_env_variables.assert_called_once_with(app_id, changed)
+
+
+@pytest.mark.django_db
+def test_POST_no_changes(client, http_headers, mock_backend_authenticated_client, app_id, make_app):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    @type mock_backend_authenticated_client: mock.Mock
+    """
+    mock_backend_authenticated_client.get_application_env_variables.return_value = {
+        'VAR1': 'value1',
+    }
+    bindings = {
+        'VAR1': 'value1',
+        'VAR2': None,
+    }
+    with mock.patch('api_server.api.app_env_variables_api_view.get_backend_authenticated_client') as mocked:
+        mocked.return_value = mock_backend_authenticated_client
+        resp = client.post('/api/v1/apps/{}/env/'.format(app_id), data=json.dumps(bindings), content_type='application/json', **http_headers)
+    assert resp.status_code == 204
+    assert mock_backend_authenticated_client.set_application_env_variables.call_count == 0
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize('bad_value', [
     '\\',
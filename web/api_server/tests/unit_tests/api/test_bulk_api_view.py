@@ -0,0 +1,120 @@
+import json
+import mock
+import pytest
+
+from api_server.clients.exceptions import ClientResponseError
+from api_server.paas_backends import BackendsUserError
+
+
+def _post(client, http_headers, items):
+    """
+    :rtype: tuple
+    :returns: (response, results sorted by index)
+    """
+    resp = client.post('/api/v1/bulk/', data=json.dumps(items), content_type='application/json', **http_headers)
+    if not resp.streaming:
+        return resp, None
+    lines = ''.join(resp.streaming_content).splitlines()
+    return resp, sorted((json.loads(line) for line in lines), key=lambda x: x['index'])
+
+
+@pytest.mark.django_db
+def test_POST(client, http_headers, mock_backend_authenticated_client, app_id, make_app, addon):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    @type mock_backend_authenticated_client: mock.Mock
+    """
+    mock_backend_authenticated_client.get_application_env_variables.return_value = {'VAR': 'old'}
+    mock_backend_authenticated_client.get_application_domains.return_value = ['example.com']
+    items = [
+        {'app': app_id, 'operation': 'config'},
+        {'app': app_id, 'operation': 'domains'},
+        {'app': app_id, 'operation': 'config:set', 'data': {'VAR': 'new'}},
+        {'app': app_id, 'operation': 'addons'},
+        {'app': 'missing-app', 'operation': 'config'},
+    ]
+    with mock.patch('api_server.api.bulk_api_view.get_backend_authenticated_client') as mocked:
+        mocked.return_value = mock_backend_authenticated_client
+        resp, results = _post(client, http_headers, items)
+    assert resp.status_code == 200
+    # one login for all the operations on the backend
+    assert mocked.call_count == 1
+    assert [x['status'] for x in results] == [200, 200, 200, 200, 400]
+    assert results[0]['result'] == {'VAR': 'old'}
+    assert results[1]['result'] == ['example.com']
+    assert results[3]['result'] == [addon.to_dict()]
+    assert 'missing-app' in results[4]['error']
+    mock_backend_authenticated_client.set_application_env_variables.assert_called_once_with(app_id, {'VAR': 'new'})
+
+
+@pytest.mark.django_db
+def test_POST_operation_errors(client, http_headers, mock_backend_authenticated_client, app_id, make_app):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    @type mock_backend_authenticated_client: mock.Mock
+    """
+    response = mock.Mock(status_code=403)
+    response.json.return_value = {'detail': 'forbidden'}
+    mock_backend_authenticated_client.get_application_domains.side_effect = ClientResponseError(response)
+    mock_backend_authenticated_client.get_application_env_variables.return_value = {}
+    items = [
+        {'app': app_id, 'operation': 'domains'},
+        {'app': app_id, 'operation': 'config:set', 'data': {'VAR': '|'}},
+        {'app': app_id, 'operation': 'config'},
+    ]
+    with mock.patch('api_server.api.bulk_api_view.get_backend_authenticated_client') as mocked:
+        mocked.return_value = mock_backend_authenticated_client
+        resp, results = _post(client, http_headers, items)
+    assert resp.status_code == 200
+    assert results[0]['status'] == 403
+    assert results[0]['error'] == {'detail': 'forbidden'}
+    assert results[1]['status'] == 400
+    assert results[2]['status'] == 200
+
+
+@pytest.mark.django_db
+def test_POST_login_error(client, http_headers, app_id, make_app):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    items = [
+        {'app': app_id, 'operation': 'config'},
+        {'app': app_id, 'operation': 'domains'},
+    ]
+    with mock.patch('api_server.api.bulk_api_view.get_backend_authenticated_client') as mocked:
+        mocked.side_effect = BackendsUserError('no access')
+        resp, results = _post(client, http_headers, items)
+    assert resp.status_code == 200
+    assert mocked.call_count == 1
+    assert [x['status'] for x in results] == [400, 400]
+    assert results[0]['error'] == 'no access'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('items', [
+    {'app': 'app', 'operation': 'config'},
+    [{'operation': 'config'}],
+    [{'app': 'app', 'operation': 'delete_everything'}],
+    [{'app': 'app', 'operation': 'config:set'}],
+])
+def test_POST_invalid(items, client, http_headers):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    resp, _ = _post(client, http_headers, items)
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_POST_too_many(client, http_headers, settings):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    settings.BULK_MAX_OPERATIONS = 2
+    resp, _ = _post(client, http_headers, [{'app': 'app', 'operation': 'config'}] * 3)
+    assert resp.status_code == 400
@@ -0,0 +1,167 @@
+"""Query and backend call budgets for every API view.
+
+Each request is made once, as a client that is not logged in yet, which
+is what the CLI does. The number of SQL queries and the number of calls
+to the PaaS backend must stay within the budget. If a change makes a view
+cheaper, lower its budget so it stays that way.
+"""
+import json
+import mock
+import pytest
+import uuid
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import crypto, timezone
+
+from api_server import urls
+from api_server.addons.state import AddonState
+from api_server.models import Addon, RunJob
+
+
+# (method, path, body, max SQL queries, max backend calls)
+# {app_id}, {addon_name}, {username2}, {job_id} and {backend} are filled in
+BUDGETS = {
+    'api_key': ('get', '/api/api_key/', None, 3, 0),
+    'test_api_key': ('get', '/api/test_api_key/', None, 3, 0),
+    'apps GET': ('get', '/api/v1/apps/', None, 6, 2),
+    'apps POST': ('post', '/api/v1/apps/', {'id': 'new-app-id'}, 6, 2),
+    'app_details GET': ('get', '/api/v1/apps/{app_id}/', None, 5, 2),
+    'app_details POST': ('post', '/api/v1/apps/{app_id}/', {'owner': '{username2}'}, 6, 3),
+    'app_details DELETE': ('delete', '/api/v1/apps/{app_id}/', None, 10, 2),
+    'addons GET': ('get', '/api/v1/apps/{app_id}/addons/', None, 4, 0),
+    'addons POST': ('post', '/api/v1/apps/{app_id}/addons/', {'provider_name': 'test_provider'}, 8, 0),
+    'addon_details GET': ('get', '/api/v1/apps/{app_id}/addons/{addon_name}/', None, 4, 0),
+    'addon_details DELETE': ('delete', '/api/v1/apps/{app_id}/addons/{addon_name}/', None, 4, 0),
+    'addon_clone POST': ('post', '/api/v1/apps/{app_id}/addons/{addon_name}/clone/', {}, 10, 2),
+    'app_collaborators GET': ('get', '/api/v1/apps/{app_id}/collaborators/', None, 5, 2),
+    'app_collaborators POST': ('post', '/api/v1/apps/{app_id}/collaborators/', {'username': '{username2}'}, 6, 3),
+    'app_collaborator_details DELETE': ('delete', '/api/v1/apps/{app_id}/collaborators/{username2}/', None, 5, 2),
+    'app_domains GET': ('get', '/api/v1/apps/{app_id}/domains/', None, 5, 2),
+    'app_domains POST': ('post', '/api/v1/apps/{app_id}/domains/', {'domain': 'example.com'}, 5, 2),
+    'app_domain_details DELETE': ('delete', '/api/v1/apps/{app_id}/domains/example.com/', None, 5, 2),
+    'app_env_variables GET': ('get', '/api/v1/apps/{app_id}/env/', None, 5, 2),
+    'app_env_variables POST': ('post', '/api/v1/apps/{app_id}/env/', {'VAR': 'value'}, 5, 3),
+    'app_logs GET': ('get', '/api/v1/apps/{app_id}/logs/', None, 5, 2),
+    'run_command POST': ('post', '/api/v1/apps/{app_id}/run/', {'command': 'ls'}, 5, 2),
+    'run_command async POST': ('post', '/api/v1/apps/{app_id}/run/', {'command': 'ls', 'async': True}, 9, 2),
+    'run_command_output GET': ('get', '/api/v1/apps/{app_id}/run/{job_id}/', None, 5, 0),
+    'keys GET': ('get', '/api/v1/keys/', None, 6, 2),
+    'keys POST': ('post', '/api/v1/keys/', {'key_name': 'key', 'key': 'ssh-rsa abc'}, 4, 2),
+    'key_details DELETE': ('delete', '/api/v1/keys/{backend}/key/', None, 4, 2),
+    'backends GET': ('get', '/api/v1/backends/', None, 5, 0),
+    'bulk POST': ('post', '/api/v1/bulk/', [
+        {'app': '{app_id}', 'operation': 'config'},
+        {'app': '{app_id}', 'operation': 'domains'},
+        {'app': '{app_id}', 'operation': 'addons'},
+    ], 6, 3),
+}
+
+
+@pytest.yield_fixture(scope='function')
+def backend_calls(mock_backend_client, mock_backend_authenticated_client, username):
+    """Mock out the PaaS backend below get_backend_authenticated_client,
+    so the queries it makes are counted. Yields the list of backend calls.
+    """
+    auth_client = mock_backend_authenticated_client
+    auth_client.get_all_applications.return_value = []
+    auth_client.get_application_owner.return_value = {'username': username}
+    auth_client.get_application_collaborators.return_value = []
+    auth_client.get_application_domains.return_value = []
+    auth_client.get_application_env_variables.return_value = {}
+    auth_client.get_application_logs.return_value = []
+    auth_client.run_command.return_value = {'exit_code': 0, 'output': ''}
+    auth_client.get_keys.return_value = []
+    mock_backend_client.login_or_register.return_value = (auth_client, False)
+
+    with mock.patch('api_server.paas_backends.get_backend_client') as mocked:
+        mocked.return_value = mock_backend_client
+        yield lambda: mock_backend_client.method_calls + auth_client.method_calls
+
+
+@pytest.yield_fixture(scope='function')
+def mock_addons(mock_manager, mock_addon_provider):
+    """Mock out the addon provider and the state machine in the addon views.
+    """
+    mock_addon_provider.begin_provision.return_value = {
+        'message': 'test message',
+        'uuid': uuid.uuid4(),
+    }
+    mock_addon_provider.clone.return_value = {
+        'message': 'test message',
+        'uuid': uuid.uuid4(),
+    }
+    mock_addon_provider.deprovision.return_value = {
+        'message': 'test message',
+    }
+    mock_manager.transition.return_value = mock.MagicMock()
+    patches = []
+    for module in ['addons_api_view', 'addon_details_api_view', 'addon_clone_api_view']:
+        patches.append(mock.patch('api_server.api.{}.get_provider_from_provider_name'.format(module),
+                                  return_value=mock_addon_provider))
+        patches.append(mock.patch('api_server.api.{}.StateMachineManager'.format(module),
+                                  return_value=mock_manager))
+    for patch in patches:
+        patch.start()
+    yield
+    for patch in patches:
+        patch.stop()
+
+
+def _format(value, **kwargs):
+    if isinstance(value, dict):
+        return {k: _format(v, **kwargs) for k, v in value.iteritems()}
+    if isinstance(value, list):
+        return [_format(v, **kwargs) for v in value]
+    if isinstance(value, basestring):
+        return value.format(**kwargs)
+    return value
+
+
+def test_every_view_has_a_budget():
+    names = {name.split(' ')[0] for name in BUDGETS}
+    assert names == {pattern.name for pattern in urls.urlpatterns}
+
+
+@pytest.mark.parametrize('name', sorted(BUDGETS))
+@pytest.mark.django_db
+def test_budget(name, client, http_headers, app_id, make_app, user, settings, backend_calls, mock_addons):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    method, path, body, max_queries, max_backend_calls = BUDGETS[name]
+    addon = Addon.objects.create(
+        provider_name='test_provider', provider_uuid=uuid.uuid4(), app=make_app, state=AddonState.ready, user=user)
+    # collaborator URLs only allow lowercase
+    user2 = User.objects.create_user(crypto.get_random_string(allowed_chars='abcdefghijklmnopqrstuvwxyz'))
+    job = RunJob.objects.create(app=make_app, user=user, command='ls', exit_code=0, finished_at=timezone.now())
+    values = {
+        'app_id': app_id,
+        'addon_name': addon.display_name,
+        'username2': user2.username,
+        'backend': settings.DEFAULT_PAAS_BACKEND,
+        'job_id': job.job_id,
+    }
+    path = _format(path, **values)
+    kwargs = dict(http_headers)
+    if body is not None:
+        kwargs['data'] = json.dumps(_format(body, **values))
+        kwargs['content_type'] = 'application/json'
+    if name == 'api_key':
+        # this one needs a session, not WSSE
+        client.force_login(user)
+
+    with CaptureQueriesContext(connection) as context:
+        resp = getattr(client, method)(path, **kwargs)
+        if resp.streaming:
+            list(resp.streaming_content)
+    assert resp.status_code < 300, resp.content
+
+    num_queries = len(context.captured_queries)
+    assert num_queries <= max_queries, '{} made {} queries, the budget is {}:\n{}'.format(
+        name, num_queries, max_queries, '\n'.join(q['sql'] for q in context.captured_queries))
+    num_backend_calls = len(backend_calls())
+    assert num_backend_calls <= max_backend_calls, '{} made {} backend calls, the budget is {}: {}'.format(
+        name, num_backend_calls, max_backend_calls, backend_calls())
@@ -1,7 +1,13 @@
+import datetime
 import json
 import mock
 import pytest
 
+from django.utils import timezone
+
+from api_server.clients.exceptions import ClientResponseError
+from api_server.models import RunJob
+
 
 @pytest.mark.django_db
 def test_POST(client, http_headers, mock_backend_authenticated_client, make_app, app_id):
@@ -25,3 +31,191 @@ def test_POST(client, http_headers, mock_backend_authenticated_client, make_app,
     mock_backend_authenticated_client.run_command.assert_called_once_with(
         app_id, 'echo 1 2 3')
     assert resp.json() == result
+
+
+def _get_output(client, make_http_headers, app_id, job_id, offset=0):
+    """
+    :rtype: tuple
+    :returns: (response, the JSON lines)
+    """
+    resp = client.get('/api/v1/apps/{}/run/{}/?offset={}'.format(app_id, job_id, offset), **make_http_headers())
+    if not resp.streaming:
+        return resp, None
+    return resp, [json.loads(line) for line in ''.join(resp.streaming_content).splitlines()]
+
+
+@pytest.mark.django_db
+def test_POST_async(client, http_headers, mock_backend_authenticated_client, make_app, app_id, user):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    @type mock_backend_authenticated_client: mock.Mock
+    """
+    mock_backend_authenticated_client.run_command.return_value = {
+        'exit_code': 3,
+        'output': '1 2 3\n',
+    }
+    with mock.patch('api_server.tasks.get_backend_authenticated_client') as mocked:
+        mocked.return_value = mock_backend_authenticated_client
+        resp = client.post('/api/v1/apps/{}/run/'.format(app_id),
+                           data=json.dumps({'command': 'echo 1 2 3', 'async': True}),
+                           content_type='application/json',
+                           **http_headers)
+    assert resp.status_code == 202
+    mock_backend_authenticated_client.run_command.assert_called_once_with(
+        app_id, 'echo 1 2 3')
+    job = RunJob.objects.get(job_id=resp.json()['job_id'])
+    assert job.user == user
+    assert job.app == make_app
+    assert job.output == '1 2 3\n'
+    assert job.exit_code == 3
+    assert job.finished_at is not None
+
+
+@pytest.mark.django_db
+def test_POST_async_backend_error(client, http_headers, mock_backend_authenticated_client, make_app, app_id):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    @type mock_backend_authenticated_client: mock.Mock
+    """
+    mock_backend_authenticated_client.run_command.side_effect = ClientResponseError(
+        mock.Mock(status_code=400, text='bad command'))
+    with mock.patch('api_server.tasks.get_backend_authenticated_client') as mocked:
+        mocked.return_value = mock_backend_authenticated_client
+        resp = client.post('/api/v1/apps/{}/run/'.format(app_id),
+                           data=json.dumps({'command': 'ls', 'async': True}),
+                           content_type='application/json',
+                           **http_headers)
+    assert resp.status_code == 202
+    job = RunJob.objects.get(job_id=resp.json()['job_id'])
+    assert job.error == 'bad command'
+    assert job.exit_code is None
+    assert job.finished_at is not None
+
+
+@pytest.mark.django_db
+def test_POST_async_unexpected_error(client, http_headers, mock_backend_authenticated_client, make_app, app_id):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    @type mock_backend_authenticated_client: mock.Mock
+    """
+    mock_backend_authenticated_client.run_command.return_value = {}
+    with mock.patch('api_server.tasks.get_backend_authenticated_client') as mocked:
+        mocked.return_value = mock_backend_authenticated_client
+        resp = client.post('/api/v1/apps/{}/run/'.format(app_id),
+                           data=json.dumps({'command': 'ls', 'async': True}),
+                           content_type='application/json',
+                           **http_headers)
+    assert resp.status_code == 202
+    job = RunJob.objects.get(job_id=resp.json()['job_id'])
+    assert job.error == 'The command could not be run.'
+    assert job.finished_at is not None
+
+
+@pytest.mark.django_db
+def test_POST_async_no_app(client, http_headers, app_id):
+    """
+    @type client: django.test.Client
+    @type http_headers: dict
+    """
+    resp = client.post('/api/v1/apps/{}/run/'.format(app_id),
+                       data=json.dumps({'command': 'ls', 'async': True}),
+                       content_type='application/json',
+                       **http_headers)
+    assert resp.status_code == 400
+    assert not RunJob.objects.exists()
+
+
+@pytest.mark.django_db
+def test_GET_output(client, make_http_headers, make_app, app_id, user):
+    """
+    @type client: django.test.Client
+    @type make_http_headers: function
+    """
+    job = RunJob.objects.create(app=make_app, user=user, command='ls')
+    job.append_output('a\n')
+    job.append_output('b\n')
+    job.finish(exit_code=0)
+
+    resp, lines = _get_output(client, make_http_headers, app_id, job.job_id)
+    assert resp.status_code == 200
+    assert lines == [{'output': 'a\nb\n'}, {'exit_code': 0}]
+
+    resp, lines = _get_output(client, make_http_headers, app_id, job.job_id, offset=2)
+    assert lines == [{'output': 'b\n'}, {'exit_code': 0}]
+
+    resp, lines = _get_output(client, make_http_headers, app_id, job.job_id, offset=4)
+    assert lines == [{'exit_code': 0}]
+
+
+@pytest.mark.django_db
+def test_GET_output_error(client, make_http_headers, make_app, app_id, user):
+    """
+    @type client: django.test.Client
+    @type make_http_headers: function
+    """
+    job = RunJob.objects.create(app=make_app, user=user, command='ls')
+    job.finish(error='no such app')
+
+    resp, lines = _get_output(client, make_http_headers, app_id, job.job_id)
+    assert lines == [{'error': 'no such app'}]
+
+
+@pytest.mark.django_db
+def test_GET_output_not_finished(client, make_http_headers, make_app, app_id, user, settings):
+    """
+    @type client: django.test.Client
+    @type make_http_headers: function
+    """
+    settings.RUN_STREAM_MAX_TIME = 0
+    job = RunJob.objects.create(app=make_app, user=user, command='ls')
+    job.append_output('a\n')
+
+    resp, lines = _get_output(client, make_http_headers, app_id, job.job_id)
+    assert lines == [{'output': 'a\n'}]
+
+    resp, lines = _get_output(client, make_http_headers, app_id, job.job_id, offset=2)
+    assert lines == []
+
+
+@pytest.mark.django_db
+def test_GET_output_too_old(client, make_http_headers, make_app, app_id, user, settings):
+    """
+    @type client: django.test.Client
+    @type make_http_headers: function
+    """
+    settings.RUN_STREAM_MAX_TIME = 0
+    job = RunJob.objects.create(
+        app=make_app, user=user, command='ls',
+        created_at=timezone.now() - datetime.timedelta(seconds=settings.RUN_JOB_MAX_TIME + 1))
+    job.append_output('a\n')
+
+    resp, lines = _get_output(client, make_http_headers, app_id, job.job_id)
+    assert lines == [{'output': 'a\n'}, {'error': 'The command did not finish in time.'}]
+
+
+@pytest.mark.django_db
+def test_GET_output_other_user(client, make_http_headers, make_app, app_id, user2):
+    """
+    @type client: django.test.Client
+    @type make_http_headers: function
+    """
+    job = RunJob.objects.create(app=make_app, user=user2, command='ls')
+    job.finish(exit_code=0)
+
+    resp, _ = _get_output(client, make_http_headers, app_id, job.job_id)
+    assert resp.status_code == 404
+
+
+@pytest.mark.django_db
+def test_GET_output_bad_offset(client, make_http_headers, make_app, app_id, user):
+    """
+    @type client: django.test.Client
+    @type make_http_headers: function
+    """
+    job = RunJob.objects.create(app=make_app, user=user, command='ls')
+
+    resp, _ = _get_output(client, make_http_headers, app_id, job.job_id, offset='x')
+    assert resp.status_code == 400
@@ -5,6 +5,7 @@ import pytest
 import uuid
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.utils import crypto
 
 from api_server.addons.providers.base_provider import BaseAddonProvider
@@ -16,6 +17,14 @@ from api_server.models import App, Addon
 from wsse.utils import get_secret, wsse_digest
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Secrets are cached by ID, and IDs are reused after the
+    test database rolls back.
+    """
+    cache.clear()
+
+
 @pytest.fixture(scope='function')
 def username():
     return crypto.get_random_string()
@@ -62,13 +71,36 @@ def api_key(user):
 
 
 @pytest.fixture(scope='function')
-def wsse_header(api_key, username):
-    nonce = base64.standard_b64encode(crypto.get_random_string())
-    timestamp = datetime.datetime.utcnow()
-    timestamp_str = timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
-    digest = wsse_digest(api_key, nonce, timestamp_str)
-    return '''UsernameToken Username="{username}", PasswordDigest="{digest}", Nonce="{nonce}", Created="{timestamp}"'''.format(
-        username=username, digest=digest, nonce=nonce, timestamp=timestamp_str)
+def make_wsse_header(api_key, username):
+    """Returns a function that makes a new WSSE header, since
+    a header cannot be used twice.
+    """
+    def make():
+        nonce = base64.standard_b64encode(crypto.get_random_string())
+        timestamp = datetime.datetime.utcnow()
+        timestamp_str = timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+        digest = wsse_digest(api_key, nonce, timestamp_str)
+        return '''UsernameToken Username="{username}", PasswordDigest="{digest}", Nonce="{nonce}", Created="{timestamp}"'''.format(
+            username=username, digest=digest, nonce=nonce, timestamp=timestamp_str)
+    return make
+
+
+@pytest.fixture(scope='function')
+def wsse_header(make_wsse_header):
+    return make_wsse_header()
+
+
+@pytest.fixture(scope='function')
+def make_http_headers(make_wsse_header):
+    """Returns a function that makes new HTTP headers with
+    a new WSSE header.
+    """
+    def make():
+        return {
+            'HTTP_AUTHORIZATION': 'WSSE profile="UsernameToken"',
+            'HTTP_X_WSSE': make_wsse_header(),
+        }
+    return make
 
 
 @pytest.fixture(scope='function')
@@ -0,0 +1,33 @@
+import datetime
+import pytest
+
+from django.conf import settings
+from django.utils import timezone
+
+from api_server.celery import app
+from api_server.models import RunJob
+from api_server.tasks import delete_old_run_jobs
+
+
+@pytest.mark.django_db
+def test_delete_old_run_jobs(make_app, user, settings):
+    settings.RUN_JOB_RETENTION = 60
+    old = RunJob.objects.create(
+        app=make_app, user=user, command='ls',
+        created_at=timezone.now() - datetime.timedelta(seconds=61))
+    new = RunJob.objects.create(app=make_app, user=user, command='ls')
+    delete_old_run_jobs.delay()
+    assert not RunJob.objects.filter(pk=old.pk).exists()
+    assert RunJob.objects.filter(pk=new.pk).exists()
+
+
+def test_delete_old_run_jobs_scheduled():
+    assert 'api_server.tasks.delete_old_run_jobs' in [
+        x['task'] for x in settings.CELERYBEAT_SCHEDULE.itervalues()]
+
+
+def test_run_command_job_own_queue():
+    route = app.amqp.router.route({}, 'api_server.tasks.run_command_job')
+    assert route['queue'].name == 'run_commands'
+    route = app.amqp.router.route({}, 'api_server.addons.tasks.advance_addons')
+    assert route['queue'].name != 'run_commands'
@@ -1,9 +1,13 @@
 import mock
 import pytest
 
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from api_server import paas_backends
 from api_server.clients.exceptions import ClientError
+from api_server.models import PaasCredential
 
 
 def test_get_backend_api_url_success(settings):
@@ -120,3 +124,42 @@ def test_ensure_user_exists_failure_client_error(client, user, mock_backend_clie
         mock_backend_authenticated_client.login_or_register.side_effect = ClientError
         paas_backends.get_backend_authenticated_client(
             user.username, settings.DEFAULT_PAAS_BACKEND)
+
+
+@pytest.mark.django_db
+def test_get_user_credentials_one_query(user, settings):
+    with CaptureQueriesContext(connection) as context:
+        credentials = paas_backends.get_user_credentials(user.username.upper())
+        credential = credentials[settings.DEFAULT_PAAS_BACKEND]
+        assert credential.profile.user == user
+    assert len(context.captured_queries) == 1
+
+
+@pytest.mark.django_db
+def test_get_user_credentials_does_not_exist():
+    assert paas_backends.get_user_credentials('doesnotexist') is None
+
+
+@pytest.mark.django_db
+def test_get_user_credentials_no_credentials(user):
+    PaasCredential.objects.filter(profile__user=user).delete()
+    assert paas_backends.get_user_credentials(user.username) == {}
+
+
+@pytest.mark.django_db
+def test_get_user_credentials_memoized_in_request(user, settings):
+    request_started.send(sender=None)
+    try:
+        paas_backends.get_user_credentials(user.username)
+        with CaptureQueriesContext(connection) as context:
+            paas_backends.get_user_credentials(user.username.lower())
+        assert len(context.captured_queries) == 0
+
+        PaasCredential.objects.create(profile=user.profile, backend='other_backend')
+        assert 'other_backend' in paas_backends.get_user_credentials(user.username)
+    finally:
+        request_finished.send(sender=None)
+
+    with CaptureQueriesContext(connection) as context:
+        paas_backends.get_user_credentials(user.username)
+    assert len(context.captured_queries) == 1
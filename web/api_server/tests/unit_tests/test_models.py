@@ -1,9 +1,16 @@
+import mock
 import pytest
+import uuid
 
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models.functions import Lower
 from django.db.utils import IntegrityError
 
-from api_server.models import App, PaasCredential, Profile
+from api_server.addons.state import AddonState, visible_states
+from api_server.models import Addon, App, PaasCredential, Profile
 
 
 @pytest.mark.django_db
@@ -45,6 +52,31 @@ def test_credentials_get_password(user):
     assert pass1 == pass2
 
 
+@pytest.mark.django_db
+def test_credentials_get_password_cached(user):
+    c = PaasCredential.objects.create(
+        profile=user.profile, backend='backend1')
+    pass1 = c.get_password()
+    with mock.patch('api_server.models.Signer') as mock_signer:
+        assert c.get_password() == pass1
+        assert PaasCredential.objects.get(pk=c.pk).get_password() == pass1
+    assert not mock_signer.called
+
+
+@pytest.mark.django_db
+def test_credentials_get_password_seed_changed(user):
+    c = PaasCredential.objects.create(
+        profile=user.profile, backend='backend1')
+    pass1 = c.get_password()
+    # an update that skips the signals, like one from another process
+    PaasCredential.objects.filter(pk=c.pk).update(password_seed='newseed')
+    assert PaasCredential.objects.get(pk=c.pk).get_password() != pass1
+
+    c.password_seed = 'otherseed'
+    c.save()
+    assert cache.get(PaasCredential.get_password_cache_key(user.profile.id, 'backend1')) is None
+
+
 @pytest.mark.django_db
 def test_credentials_profile_unique(user):
     profile = user.profile
@@ -91,3 +123,88 @@ def test_addon_to_dict(addon):
     assert obj['provider_name'] == addon.provider_name
     assert obj['state'] == addon.state.name
     assert obj['config_customization'] == 'test'
+
+
+def _query_plan(queryset):
+    """Get the database's plan for this query, as one string.
+
+    On PostgreSQL, sequential scans are turned off for the transaction,
+    since the tables in the tests are too small for an index to be worth it.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql, params)
+            return ' '.join(row[0] for row in cursor.fetchall())
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return ' '.join(row[-1] for row in cursor.fetchall())
+
+
+sqlite_only = pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='checks the SQLite query plan')
+postgresql_only = pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='checks the PostgreSQL query plan, set TEST_DATABASE_URL to run it')
+
+
+def _make_addons(app, user):
+    for state in AddonState:
+        Addon.objects.create(provider_name='test_provider', provider_uuid=uuid.uuid4(),
+                             app=app, state=state, user=user)
+
+
+@sqlite_only
+@pytest.mark.django_db
+def test_addon_list_uses_index(make_app, app_id, user):
+    _make_addons(make_app, user)
+    plan = _query_plan(Addon.objects.filter(
+        app__app_id=app_id, state__in=visible_states))
+    assert 'SCAN' not in plan
+    assert 'api_server_addon_app_id_' in plan
+    assert 'state=?' in plan
+
+
+@postgresql_only
+@pytest.mark.django_db
+def test_addon_list_uses_index_postgresql(make_app, app_id, user):
+    _make_addons(make_app, user)
+    plan = _query_plan(Addon.objects.filter(
+        app__app_id=app_id, state__in=visible_states))
+    assert 'Seq Scan on api_server_addon' not in plan
+    assert 'api_server_addon_app_id_' in plan
+
+
+@sqlite_only
+@pytest.mark.django_db
+def test_addon_stuck_query_uses_index():
+    plan = _query_plan(Addon.objects.filter(
+        state=AddonState.provisioned, state_changed_at__lt='2016-01-01'))
+    assert 'SCAN' not in plan
+    assert 'state=? AND state_changed_at<?' in plan
+
+
+@postgresql_only
+@pytest.mark.django_db
+def test_addon_stuck_query_uses_index_postgresql():
+    plan = _query_plan(Addon.objects.filter(
+        state=AddonState.provisioned, state_changed_at__lt='2016-01-01'))
+    assert 'Seq Scan' not in plan
+    assert 'api_server_addon_state_' in plan
+
+
+@sqlite_only
+@pytest.mark.django_db
+def test_username_lower_uses_index(user):
+    plan = _query_plan(User.objects.annotate(
+        username_lower=Lower('username')).filter(username_lower='username'))
+    assert 'SCAN' not in plan
+    assert 'api_server_auth_user_username_lower' in plan
+
+
+@postgresql_only
+@pytest.mark.django_db
+def test_username_lower_uses_index_postgresql(user):
+    plan = _query_plan(User.objects.annotate(
+        username_lower=Lower('username')).filter(username_lower='username'))
+    assert 'Seq Scan' not in plan
+    assert 'api_server_auth_user_username_lower' in plan
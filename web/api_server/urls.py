@@ -2,6 +2,7 @@ from django.conf.urls import url
 
 from api_server import views
 from api_server.api.addons_api_view import AddonsApiView
+from api_server.api.addon_clone_api_view import AddonCloneApiView
 from api_server.api.addon_details_api_view import AddonDetailsApiView
 from api_server.api.apps_api_view import AppsApiView
 from api_server.api.app_collaborators_api_view import AppCollaboratorsApiView
@@ -11,10 +12,11 @@ from api_server.api.app_domains_api_view import AppDomainsApiView
 from api_server.api.app_domain_details_api_view import AppDomainDetailsApiView
 from api_server.api.app_env_variables_api_view import AppEnvVariablesApiView
 from api_server.api.app_logs_api_view import AppLogsApiView
+from api_server.api.bulk_api_view import BulkApiView
 from api_server.api.keys_api_view import KeysApiView
 from api_server.api.key_details_api_view import KeyDetailsApiView
 from api_server.api.paas_backends_api_view import PaasBackendApiView
-from api_server.api.run_command_api_view import RunCommandApiView
+from api_server.api.run_command_api_view import RunCommandApiView, RunCommandOutputApiView
 
 
 urlpatterns = [
@@ -27,6 +29,8 @@ urlpatterns = [
         AddonsApiView.as_view(), name='addons'),
     url(r'^v1/apps/([a-z0-9-]+)/addons/([a-zA-Z0-9-]+)/$',
         AddonDetailsApiView.as_view(), name='addon_details'),
+    url(r'^v1/apps/([a-z0-9-]+)/addons/([a-zA-Z0-9-]+)/clone/$',
+        AddonCloneApiView.as_view(), name='addon_clone'),
     url(r'^v1/apps/([a-z0-9-]+)/collaborators/$',
         AppCollaboratorsApiView.as_view(), name='app_collaborators'),
     url(r'^v1/apps/([a-z0-9-]+)/collaborators/([a-z0-9]+)/$',
@@ -41,8 +45,11 @@ urlpatterns = [
         AppLogsApiView.as_view(), name='app_logs'),
     url(r'^v1/apps/([a-z0-9-]+)/run/$',
         RunCommandApiView.as_view(), name='run_command'),
+    url(r'^v1/apps/([a-z0-9-]+)/run/([a-f0-9-]+)/$',
+        RunCommandOutputApiView.as_view(), name='run_command_output'),
     url(r'^v1/keys/$', KeysApiView.as_view(), name='keys'),
     url(r'^v1/keys/([A-Za-z0-9_-]+)/([A-Za-z0-9_-]+)/$',
         KeyDetailsApiView.as_view(), name='key_details'),
-    url(r'^v1/backends/$', PaasBackendApiView.as_view(), name='backends')
+    url(r'^v1/backends/$', PaasBackendApiView.as_view(), name='backends'),
+    url(r'^v1/bulk/$', BulkApiView.as_view(), name='bulk'),
 ]
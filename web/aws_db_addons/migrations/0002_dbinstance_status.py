@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.2 on 2026-10-19 02:25
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aws_db_addons', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dbinstance',
+            name='endpoint',
+            field=models.CharField(editable=False, max_length=300, null=True),
+        ),
+        migrations.AddField(
+            model_name='dbinstance',
+            name='status',
+            field=models.CharField(editable=False, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='dbinstance',
+            name='status_updated_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+    ]
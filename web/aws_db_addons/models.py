@@ -42,3 +42,9 @@ class DbInstance(models.Model):
         max_length=16, default=make_username, editable=False)
     master_password = models.CharField(
         max_length=30, default=make_password, editable=False)
+
+    # the last known state of the RDS instance, refreshed in bulk by
+    # aws_db_addons.tasks.poll_pending_instances. None if never checked.
+    status = models.CharField(max_length=50, null=True, editable=False)
+    endpoint = models.CharField(max_length=300, null=True, editable=False)
+    status_updated_at = models.DateTimeField(null=True, editable=False)
@@ -1,4 +1,8 @@
 import botocore
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
 
 from api_server.addons.providers.base_provider import BaseAddonProvider
 from api_server.addons.providers.exceptions import AddonProviderError
@@ -8,6 +12,9 @@ from aws_db_addons.models import DbInstance
 
 class RdsAddonProvider(BaseAddonProvider):
 
+    # a small instance usually takes 5 to 10 minutes to become available
+    expected_provision_time = 5 * 60
+
     def __init__(self, engine):
         """Create a new RDS addon provider for the specified engine.
 
@@ -21,6 +28,19 @@ class RdsAddonProvider(BaseAddonProvider):
             return self.config_name
         return config_customization + '_' + self.config_name
 
+    def _status_is_fresh(self, instance):
+        """Check if the cached status was refreshed recently enough
+        to be trusted. If not, the poller is probably not running.
+
+        :param aws_db_addons.models.DbInstance instance:
+
+        :rtype: bool
+        """
+        if instance.status_updated_at is None:
+            return False
+        max_age = datetime.timedelta(seconds=3 * settings.RDS_POLL_INTERVAL)
+        return timezone.now() - instance.status_updated_at < max_age
+
     def begin_provision(self, app_id):
         """Kick off the provision process and return a UUID
         for the new addon. This method MUST return immediately.
@@ -70,13 +90,21 @@ class RdsAddonProvider(BaseAddonProvider):
         except DbInstance.DoesNotExist:
             raise AddonProviderError(
                 'Database with uuid {} does not exist.'.format(uuid))
-        try:
-            rds.get_endpoint(instance)
-        except rds.RdsNotReadyError:
-            return False, 30
-        except botocore.exceptions.ClientError as e:
-            raise AddonProviderError(
-                'An unexpcted error has occured. {}'.format(e))
+        # checking the cached status is cheap, so let the caller back off
+        # as it likes. Calling RDS directly is not, so ask for a longer wait
+        min_delay = 0
+        if not self._status_is_fresh(instance):
+            try:
+                rds.update_status(instance)
+            except botocore.exceptions.ClientError as e:
+                raise AddonProviderError(
+                    'An unexpcted error has occured. {}'.format(e))
+            min_delay = settings.RDS_POLL_INTERVAL
+        if instance.status in rds.FAILED_STATUSES:
+            raise AddonProviderError('The database could not be created. The state is "{}".'.format(
+                instance.status))
+        if instance.status != rds.AVAILABLE_STATUS:
+            return False, min_delay
         return True, 0
 
     def get_config(self, uuid, config_customization=None):
@@ -108,7 +136,10 @@ class RdsAddonProvider(BaseAddonProvider):
             raise AddonProviderError(
                 'Database with uuid {} does not exist.'.format(uuid))
         try:
-            endpoint = rds.get_endpoint(instance)
+            if instance.status == rds.AVAILABLE_STATUS and instance.endpoint is not None:
+                endpoint = instance.endpoint
+            else:
+                endpoint = rds.get_endpoint(instance)
         except rds.RdsNotReadyError as e:
             raise AddonProviderError('{}'.format(e))
         except botocore.exceptions.ClientError as e:
@@ -150,6 +181,8 @@ class RdsAddonProvider(BaseAddonProvider):
             rds.delete_instance(instance)
         except botocore.exceptions.ClientError as e:
             raise AddonProviderError('{}'.format(e))
+        instance.status = rds.DELETING_STATUS
+        instance.save()
         return {
             'message': 'Database deleted. Please remove {config_name} or {custom_name} manually.'.format(
                 config_name=self.config_name,
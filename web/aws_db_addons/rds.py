@@ -1,10 +1,92 @@
 import boto3
+import os
+import threading
+
+from botocore.config import Config
+from django.conf import settings
+from django.utils import timezone
+
+
+AVAILABLE_STATUS = 'available'
+
+# set by us after the instance is deleted, never returned by RDS
+DELETING_STATUS = 'deleting'
+
+# statuses the instance will not recover from on its own, see
+# http://docs.aws.amazon.com/AmazonRDS/latest/UserGuide/Overview.DBInstance.Status.html
+FAILED_STATUSES = [
+    'failed',
+    'inaccessible-encryption-credentials',
+    'incompatible-credentials',
+    'incompatible-network',
+    'incompatible-option-group',
+    'incompatible-parameters',
+    'incompatible-restore',
+    'restore-error',
+    'storage-full',
+]
 
 
 class RdsNotReadyError(Exception):
     pass
 
 
+# the client is shared by every thread of a process, but not across a fork
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Get the RDS client for this process. The client is created on
+    first use and reused afterwards, so its connection pool (and the
+    TLS connections in it) survives between calls.
+
+    Clients are thread-safe, but creating one through the default session
+    is not, so the client is created from its own session under a lock.
+
+    :rtype: botocore.client.RDS
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = boto3.session.Session().client('rds', config=Config(
+                    max_pool_connections=settings.RDS_CLIENT_MAX_POOL_CONNECTIONS,
+                    connect_timeout=settings.RDS_CLIENT_TIMEOUT,
+                    read_timeout=settings.RDS_CLIENT_TIMEOUT,
+                ))
+                _client_pid = pid
+    return _client
+
+
+def reset_client():
+    """Forget the cached RDS client, the next call to
+    :py:func:`get_client` creates a new one.
+    """
+    global _client, _client_pid
+    with _client_lock:
+        _client = None
+        _client_pid = None
+
+
+def _format_endpoint(instance):
+    """Format the endpoint from a describe_db_instances result.
+
+    :param dict instance: one entry of 'DBInstances'
+
+    :rtype: str
+    :returns: The endpoint (e.g. 'localhost:1234'), or None if there is none yet
+    """
+    if 'Endpoint' not in instance:
+        return None
+    return '{host}:{port}'.format(
+        host=instance['Endpoint']['Address'],
+        port=instance['Endpoint']['Port']
+    )
+
+
 def create_instance(db_instance, engine):
     """Create a new RDS instance for this DB instance.
 
@@ -13,7 +95,7 @@ def create_instance(db_instance, engine):
 
     :raises botocore.exceptions.ClientError:
     """
-    rds = boto3.client('rds')
+    rds = get_client()
     rds.create_db_instance(
         DBInstanceIdentifier=db_instance.aws_instance_identifier,
         AllocatedStorage=5,
@@ -49,17 +131,53 @@ def get_endpoint(db_instance):
 
     :raises RdsNotReadyError:
     """
-    rds = boto3.client('rds')
+    rds = get_client()
     instances = rds.describe_db_instances(
         DBInstanceIdentifier=db_instance.aws_instance_identifier)['DBInstances']
     assert len(instances) == 1
-    if instances[0]['DBInstanceStatus'] != 'available':
+    if instances[0]['DBInstanceStatus'] != AVAILABLE_STATUS:
         raise RdsNotReadyError('RDS instance {} is not in the "available" state. The state is "{}".'.format(
             db_instance.aws_instance_identifier, instances[0]['DBInstanceStatus']))
-    return '{host}:{port}'.format(
-        host=instances[0]['Endpoint']['Address'],
-        port=instances[0]['Endpoint']['Port']
-    )
+    return _format_endpoint(instances[0])
+
+
+def describe_instances():
+    """Get the status of every RDS instance in the account, using
+    one paginated call.
+
+    :rtype: dict
+    :returns: a dictionary from instance identifier to
+        a tuple (status, endpoint). The endpoint may be None.
+
+    :raises botocore.exceptions.ClientError:
+    """
+    rds = get_client()
+    paginator = rds.get_paginator('describe_db_instances')
+    result = {}
+    for page in paginator.paginate():
+        for instance in page['DBInstances']:
+            result[instance['DBInstanceIdentifier']] = (
+                instance['DBInstanceStatus'], _format_endpoint(instance))
+    return result
+
+
+def update_status(db_instance):
+    """Fetch the status of this DB instance and save it.
+    Prefer the bulk refresh in aws_db_addons.tasks.poll_pending_instances.
+
+    :param aws_db_addons.models.DbInstance db_instance:
+
+    :raises botocore.exceptions.ClientError:
+        when there is a client error, including if the instance is not found
+    """
+    rds = get_client()
+    instances = rds.describe_db_instances(
+        DBInstanceIdentifier=db_instance.aws_instance_identifier)['DBInstances']
+    assert len(instances) == 1
+    db_instance.status = instances[0]['DBInstanceStatus']
+    db_instance.endpoint = _format_endpoint(instances[0])
+    db_instance.status_updated_at = timezone.now()
+    db_instance.save()
 
 
 def delete_instance(db_instance):
@@ -69,7 +187,7 @@ def delete_instance(db_instance):
 
     :raises botocore.exceptions.ClientError:
     """
-    rds = boto3.client('rds')
+    rds = get_client()
     rds.delete_db_instance(
         DBInstanceIdentifier=db_instance.aws_instance_identifier,
         SkipFinalSnapshot=True
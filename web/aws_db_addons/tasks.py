@@ -0,0 +1,38 @@
+import logging
+
+import botocore
+
+from django.utils import timezone
+
+from api_server.celery import app
+from aws_db_addons import rds
+from aws_db_addons.models import DbInstance
+
+
+@app.task
+def poll_pending_instances():
+    """Refresh the cached status of every DB instance that is still
+    being created, with a single paginated RDS call no matter how
+    many instances are pending. The provider reads the cached status,
+    so this should run periodically (see ``CELERYBEAT_SCHEDULE``).
+    """
+    logger = logging.getLogger(__name__)
+    pending = DbInstance.objects.exclude(
+        status__in=[rds.AVAILABLE_STATUS, rds.DELETING_STATUS] + rds.FAILED_STATUSES)
+    identifiers = set(pending.values_list('aws_instance_identifier', flat=True))
+    if not identifiers:
+        return
+    try:
+        statuses = rds.describe_instances()
+    except botocore.exceptions.ClientError:
+        logger.exception('Could not describe RDS instances.')
+        return
+    now = timezone.now()
+    for identifier in identifiers:
+        if identifier not in statuses:
+            # not visible yet, or deleted outside of TigerHost. Leave the
+            # status stale, so the provider checks this one directly.
+            continue
+        status, endpoint = statuses[identifier]
+        DbInstance.objects.filter(aws_instance_identifier=identifier).update(
+            status=status, endpoint=endpoint, status_updated_at=now)
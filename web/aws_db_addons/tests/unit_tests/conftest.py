@@ -1,8 +1,26 @@
+import botocore.session
+import mock
 import pytest
 
+from botocore.stub import Stubber
+
 from aws_db_addons.models import DbInstance
 
 
 @pytest.fixture(scope='function')
 def db_instance():
     return DbInstance.objects.create()
+
+
+@pytest.yield_fixture(scope='function')
+def rds_stubber():
+    """A stubber for a real (but offline) RDS client. The client is
+    returned from ``get_client`` in ``aws_db_addons.rds``.
+    """
+    client = botocore.session.get_session().create_client(
+        'rds', region_name='us-east-1', aws_access_key_id='fake', aws_secret_access_key='fake')
+    with Stubber(client) as stubber:
+        with mock.patch('aws_db_addons.rds.get_client') as mocked:
+            mocked.return_value = client
+            yield stubber
+    stubber.assert_no_pending_responses()
@@ -1,8 +1,11 @@
 import botocore
+import datetime
 import mock
 import pytest
 import uuid
 
+from django.utils import timezone
+
 from api_server.addons.providers.exceptions import AddonProviderError
 from aws_db_addons import rds
 from aws_db_addons.models import DbInstance
@@ -18,6 +21,9 @@ def provider():
 def mock_rds():
     mocked = mock.Mock(spec=rds)
     mocked.RdsNotReadyError = rds.RdsNotReadyError
+    mocked.AVAILABLE_STATUS = rds.AVAILABLE_STATUS
+    mocked.DELETING_STATUS = rds.DELETING_STATUS
+    mocked.FAILED_STATUSES = rds.FAILED_STATUSES
     return mocked
 
 
@@ -46,21 +52,70 @@ def test_begin_provision_failure(provider, mock_rds):
 
 @pytest.mark.django_db
 def test_provision_complete_success_true(provider, mock_rds, db_instance):
-    mock_rds.get_endpoint.return_value = 'localhost:1234'
+    def update_status(instance):
+        instance.status = 'available'
+    mock_rds.update_status.side_effect = update_status
     with mock.patch('aws_db_addons.providers.rds_provider.rds', new=mock_rds):
         done, _ = provider.provision_complete(db_instance.uuid)
     assert done
-    mock_rds.get_endpoint.assert_called_once_with(db_instance)
+    mock_rds.update_status.assert_called_once_with(db_instance)
 
 
 @pytest.mark.django_db
 def test_provision_complete_success_false(provider, mock_rds, db_instance):
-    mock_rds.get_endpoint.side_effect = rds.RdsNotReadyError
+    def update_status(instance):
+        instance.status = 'creating'
+    mock_rds.update_status.side_effect = update_status
     with mock.patch('aws_db_addons.providers.rds_provider.rds', new=mock_rds):
         done, seconds = provider.provision_complete(db_instance.uuid)
     assert not done
     assert seconds > 0
-    mock_rds.get_endpoint.assert_called_once_with(db_instance)
+    mock_rds.update_status.assert_called_once_with(db_instance)
+
+
+@pytest.mark.django_db
+def test_provision_complete_uses_cached_status(provider, mock_rds, db_instance):
+    db_instance.status = 'available'
+    db_instance.status_updated_at = timezone.now()
+    db_instance.save()
+    with mock.patch('aws_db_addons.providers.rds_provider.rds', new=mock_rds):
+        done, _ = provider.provision_complete(db_instance.uuid)
+    assert done
+    assert mock_rds.update_status.call_count == 0
+
+
+@pytest.mark.django_db
+def test_provision_complete_cached_status_pending(provider, mock_rds, db_instance):
+    db_instance.status = 'creating'
+    db_instance.status_updated_at = timezone.now()
+    db_instance.save()
+    with mock.patch('aws_db_addons.providers.rds_provider.rds', new=mock_rds):
+        done, seconds = provider.provision_complete(db_instance.uuid)
+    assert not done
+    # the cache is cheap to check, the task's backoff decides
+    assert seconds == 0
+    assert mock_rds.update_status.call_count == 0
+
+
+@pytest.mark.django_db
+def test_provision_complete_stale_cached_status(provider, mock_rds, db_instance, settings):
+    db_instance.status = 'creating'
+    db_instance.status_updated_at = timezone.now() - datetime.timedelta(seconds=4 * settings.RDS_POLL_INTERVAL)
+    db_instance.save()
+    with mock.patch('aws_db_addons.providers.rds_provider.rds', new=mock_rds):
+        done, _ = provider.provision_complete(db_instance.uuid)
+    assert not done
+    mock_rds.update_status.assert_called_once_with(db_instance)
+
+
+@pytest.mark.django_db
+def test_provision_complete_failed_status(provider, mock_rds, db_instance):
+    db_instance.status = 'incompatible-parameters'
+    db_instance.status_updated_at = timezone.now()
+    db_instance.save()
+    with mock.patch('aws_db_addons.providers.rds_provider.rds', new=mock_rds):
+        with pytest.raises(AddonProviderError):
+            provider.provision_complete(db_instance.uuid)
 
 
 @pytest.mark.django_db
@@ -72,11 +127,11 @@ def test_provision_complete_failure_does_not_exist(provider, mock_rds):
 
 @pytest.mark.django_db
 def test_provision_complete_failure_client(provider, mock_rds, db_instance):
-    mock_rds.get_endpoint.side_effect = MockClientError
+    mock_rds.update_status.side_effect = MockClientError
     with mock.patch('aws_db_addons.providers.rds_provider.rds', new=mock_rds):
         with pytest.raises(AddonProviderError):
             provider.provision_complete(db_instance.uuid)
-    mock_rds.get_endpoint.assert_called_once_with(db_instance)
+    mock_rds.update_status.assert_called_once_with(db_instance)
 
 
 @pytest.mark.django_db
@@ -88,6 +143,17 @@ def test_get_config_success(provider, mock_rds, db_instance):
     assert 'localhost:1234' in result['config'][provider.config_name]
 
 
+@pytest.mark.django_db
+def test_get_config_uses_cached_endpoint(provider, mock_rds, db_instance):
+    db_instance.status = 'available'
+    db_instance.endpoint = 'localhost:1234'
+    db_instance.save()
+    with mock.patch('aws_db_addons.providers.rds_provider.rds', new=mock_rds):
+        result = provider.get_config(db_instance.uuid)
+    assert mock_rds.get_endpoint.call_count == 0
+    assert 'localhost:1234' in result['config'][provider.config_name]
+
+
 @pytest.mark.django_db
 def test_get_config_success_with_config_customization(provider, mock_rds, db_instance):
     mock_rds.get_endpoint.return_value = 'localhost:1234'
@@ -130,6 +196,8 @@ def test_deprovision_success(provider, mock_rds, db_instance):
         result = provider.deprovision(db_instance.uuid)
     mock_rds.delete_instance.assert_called_once_with(db_instance)
     assert 'message' in result
+    db_instance.refresh_from_db()
+    assert db_instance.status == rds.DELETING_STATUS
 
 
 @pytest.mark.django_db
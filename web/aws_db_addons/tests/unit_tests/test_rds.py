@@ -1,5 +1,8 @@
 import mock
 import pytest
+import threading
+
+from django.conf import settings
 
 from aws_db_addons import rds
 
@@ -7,7 +10,7 @@ from aws_db_addons import rds
 @pytest.mark.django_db
 def test_create_instance(db_instance):
     mock_client = mock.MagicMock()
-    with mock.patch('aws_db_addons.rds.boto3.client') as mocked:
+    with mock.patch('aws_db_addons.rds.get_client') as mocked:
         mocked.return_value = mock_client
         rds.create_instance(db_instance, 'postgres')
     assert mock_client.create_db_instance.call_count == 1
@@ -31,7 +34,7 @@ def get_endpoint_simple(db_instance):
             }
         }]
     }
-    with mock.patch('aws_db_addons.rds.boto3.client') as mocked:
+    with mock.patch('aws_db_addons.rds.get_client') as mocked:
         mocked.return_value = mock_client
         endpoint = rds.get_endpoint(db_instance)
     assert endpoint == 'localhost:1234'
@@ -50,7 +53,7 @@ def get_endpoint_not_ready(db_instance):
             }
         }]
     }
-    with mock.patch('aws_db_addons.rds.boto3.client') as mocked:
+    with mock.patch('aws_db_addons.rds.get_client') as mocked:
         mocked.return_value = mock_client
         with pytest.raises(rds.RdsNotReadyError):
             rds.get_endpoint(db_instance)
@@ -60,9 +63,93 @@ def get_endpoint_not_ready(db_instance):
 @pytest.mark.django_db
 def test_delete_instance(db_instance):
     mock_client = mock.MagicMock()
-    with mock.patch('aws_db_addons.rds.boto3.client') as mocked:
+    with mock.patch('aws_db_addons.rds.get_client') as mocked:
         mocked.return_value = mock_client
         rds.delete_instance(db_instance)
     assert mock_client.delete_db_instance.call_count == 1
     _, kwargs = mock_client.delete_db_instance.call_args
     assert kwargs['DBInstanceIdentifier'] == db_instance.aws_instance_identifier
+
+
+def _describe_entry(identifier, status, address=None):
+    entry = {
+        'DBInstanceIdentifier': identifier,
+        'DBInstanceStatus': status,
+    }
+    if address is not None:
+        entry['Endpoint'] = {
+            'Address': address,
+            'Port': 5432,
+        }
+    return entry
+
+
+@pytest.mark.django_db
+def test_describe_instances(rds_stubber):
+    rds_stubber.add_response('describe_db_instances', {
+        'DBInstances': [
+            _describe_entry('a', 'available', 'a.example.com'),
+            _describe_entry('b', 'creating'),
+        ],
+        'Marker': 'next',
+    }, {})
+    rds_stubber.add_response('describe_db_instances', {
+        'DBInstances': [
+            _describe_entry('c', 'backing-up', 'c.example.com'),
+        ],
+    }, {'Marker': 'next'})
+    assert rds.describe_instances() == {
+        'a': ('available', 'a.example.com:5432'),
+        'b': ('creating', None),
+        'c': ('backing-up', 'c.example.com:5432'),
+    }
+
+
+@pytest.mark.django_db
+def test_update_status(db_instance, rds_stubber):
+    rds_stubber.add_response('describe_db_instances', {
+        'DBInstances': [
+            _describe_entry(db_instance.aws_instance_identifier, 'available', 'localhost'),
+        ],
+    }, {'DBInstanceIdentifier': db_instance.aws_instance_identifier})
+    rds.update_status(db_instance)
+    db_instance.refresh_from_db()
+    assert db_instance.status == 'available'
+    assert db_instance.endpoint == 'localhost:5432'
+    assert db_instance.status_updated_at is not None
+
+
+@pytest.yield_fixture(scope='function')
+def mock_session():
+    rds.reset_client()
+    with mock.patch('aws_db_addons.rds.boto3.session.Session') as mocked:
+        yield mocked
+    rds.reset_client()
+
+
+def test_get_client_reused(mock_session):
+    client = rds.get_client()
+    assert rds.get_client() is client
+    assert mock_session.return_value.client.call_count == 1
+    args, kwargs = mock_session.return_value.client.call_args
+    assert args == ('rds',)
+    assert kwargs['config'].max_pool_connections == settings.RDS_CLIENT_MAX_POOL_CONNECTIONS
+
+
+def test_get_client_new_after_fork(mock_session):
+    rds.get_client()
+    with mock.patch('aws_db_addons.rds.os.getpid') as mock_getpid:
+        mock_getpid.return_value = -1
+        rds.get_client()
+    assert mock_session.return_value.client.call_count == 2
+
+
+def test_get_client_threads(mock_session):
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(rds.get_client())) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(clients) == 10
+    assert mock_session.return_value.client.call_count == 1
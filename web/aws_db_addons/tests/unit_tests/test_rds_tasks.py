@@ -0,0 +1,46 @@
+import pytest
+
+from aws_db_addons import rds
+from aws_db_addons.models import DbInstance
+from aws_db_addons.tasks import poll_pending_instances
+
+
+@pytest.mark.django_db
+def test_poll_pending_instances(rds_stubber):
+    creating = DbInstance.objects.create()
+    ready = DbInstance.objects.create()
+    missing = DbInstance.objects.create()
+    deleted = DbInstance.objects.create(status=rds.DELETING_STATUS)
+    # one call for all pending instances
+    rds_stubber.add_response('describe_db_instances', {
+        'DBInstances': [{
+            'DBInstanceIdentifier': creating.aws_instance_identifier,
+            'DBInstanceStatus': 'creating',
+        }, {
+            'DBInstanceIdentifier': ready.aws_instance_identifier,
+            'DBInstanceStatus': 'available',
+            'Endpoint': {'Address': 'localhost', 'Port': 1234},
+        }, {
+            'DBInstanceIdentifier': deleted.aws_instance_identifier,
+            'DBInstanceStatus': 'deleting',
+        }],
+    }, {})
+
+    poll_pending_instances.delay()
+
+    creating.refresh_from_db()
+    assert creating.status == 'creating'
+    assert creating.status_updated_at is not None
+    ready.refresh_from_db()
+    assert ready.status == 'available'
+    assert ready.endpoint == 'localhost:1234'
+    missing.refresh_from_db()
+    assert missing.status is None
+    assert missing.status_updated_at is None
+
+
+@pytest.mark.django_db
+def test_poll_pending_instances_nothing_pending(rds_stubber):
+    DbInstance.objects.create(status=rds.AVAILABLE_STATUS)
+    # no responses queued, so any call would fail
+    poll_pending_instances.delay()
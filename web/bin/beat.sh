@@ -0,0 +1,6 @@
+#!/usr/bin/env bash
+
+set -e
+
+# run exactly one of these, every scheduled task would run once per copy
+celery -A api_server beat -l info
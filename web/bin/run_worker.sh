@@ -0,0 +1,7 @@
+#!/usr/bin/env bash
+
+set -e
+
+# one-off commands run on their own queue, so a long command never
+# delays the addon tasks on the default queue
+celery -A api_server worker -Q run_commands -l info
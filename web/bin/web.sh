@@ -3,4 +3,6 @@
 set -e
 
 python manage.py migrate
-gunicorn api_server.wsgi:application -w 2 -b :8000 --reload --timeout 3600
+# threaded workers, so that requests waiting on an addon's state
+# (addons:wait) or on a command's output only hold a thread each
+gunicorn api_server.wsgi:application -w 2 --threads 16 -b :8000 --reload --timeout 3600
@@ -1,22 +1,39 @@
+import docker
 import urlparse
 
+from docker_addons.containers.tuning import DEFAULT_MEMORY_LIMIT
+
 
 class BaseContainer(object):
     """The base container class. All addon containers
     should subclass this.
     """
 
-    def __init__(self, container_info, docker_client, network_name):
+    def __init__(self, container_info, docker_client, network_name, memory_limit=None):
         """Create a new container.
         This does NOT create a container on the docker host
 
         :param docker_addons.models.ContainerInfo container_info: the container info
         :param docker.Client docker_client: the docker client to use
         :param str network_name: The network to connect new containers to.
+        :param memory_limit: The memory limit for the container, in bytes
+            or as a string like "512m". None means no limit.
         """
         self.container_info = container_info
         self.docker_client = docker_client
         self.network_name = network_name
+        self.memory_limit = None if memory_limit is None else docker.utils.parse_bytes(memory_limit)
+
+    def get_tuning_memory(self):
+        """Get the amount of memory the server in this container
+        should be tuned for.
+
+        :rtype: int
+        :returns: the memory limit in bytes, or a conservative default if there is no limit
+        """
+        if self.memory_limit is None:
+            return DEFAULT_MEMORY_LIMIT
+        return self.memory_limit
 
     def get_environment(self):
         """Get the environment to be created for this container
@@ -34,6 +51,23 @@ class BaseContainer(object):
         """
         raise NotImplementedError
 
+    def get_data_path(self):
+        """Get the path inside the container where the server keeps
+        its data. The data volume is mounted here.
+
+        :rtype: str
+        :returns: the path, like /var/lib/postgresql/data
+        """
+        raise NotImplementedError
+
+    def get_command(self):
+        """Get the command to run in this container
+
+        :rtype: list
+        :returns: the command, or None to use the image's default
+        """
+        return None
+
     def get_url(self):
         """Return the URL to connect to this container, in the correct protocol
 
@@ -52,18 +86,38 @@ class BaseContainer(object):
         url = urlparse.urlparse(self.docker_client.base_url)
         return url.hostname
 
+    def create_volume(self, driver=None, driver_opts=None):
+        """Create the data volume for this container on the docker host.
+
+        :param str driver: the volume driver, None for the default (local)
+        :param dict driver_opts: options for the volume driver
+        """
+        self.docker_client.create_volume(
+            name=self.container_info.volume_name,
+            driver=driver,
+            driver_opts=driver_opts)
+
     def run_container(self):
         """Connect to the docker host, create a new container, and start it. Save the container ID into container_info.
+
+        The data volume is mounted into the container, and must already exist
+        (see :py:meth:`create_volume`).
         """
         # TODO this takes a few seconds because of the pull (20 seconds when
         # the whole image needs to be loaded, 1 second otherwise for me)
         self.docker_client.pull(self.get_image())
         host_config = self.docker_client.create_host_config(
             restart_policy={'Name': 'on-failure', 'MaximumRetryCount': 5},
-            network_mode=self.network_name)
+            network_mode=self.network_name,
+            mem_limit=self.memory_limit,
+            binds={
+                self.container_info.volume_name: {'bind': self.get_data_path(), 'mode': 'rw'},
+            })
         result = self.docker_client.create_container(
             image=self.get_image(),
+            command=self.get_command(),
             environment=self.get_environment(),
+            volumes=[self.get_data_path()],
             host_config=host_config,
             detach=True,
             name=self.container_info.name,
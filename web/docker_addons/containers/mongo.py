@@ -1,4 +1,5 @@
 from docker_addons.containers.base import BaseContainer
+from docker_addons.containers.tuning import mongo_wiredtiger_cache_size_gb
 
 
 class MongoContainer(BaseContainer):
@@ -15,11 +16,18 @@ class MongoContainer(BaseContainer):
         :rtype: dict
         :returns: dictionary representing the environment, like {"VAR1": "value1", ...}
         """
-        return {
+        environment = {
             'MONGODB_PASS': self.password,
-            'MONGODB_USER': self.container_info.name,
+            'MONGODB_USER': self.container_info.get_db_user(),
             'MONGODB_DATABASE': self.db_name,
         }
+        # without a limit, mongo sizes its cache for the whole host itself
+        if self.memory_limit is not None:
+            # the image's run script expands this unquoted into the mongod
+            # command line, which is the only way to pass flags to it
+            environment['STORAGE_ENGINE'] = 'wiredTiger --wiredTigerCacheSizeGB {}'.format(
+                mongo_wiredtiger_cache_size_gb(self.memory_limit))
+        return environment
 
     def get_image(self):
         """Get the image for this container
@@ -29,6 +37,15 @@ class MongoContainer(BaseContainer):
         """
         return 'tutum/mongodb:3.2'
 
+    def get_data_path(self):
+        """Get the path inside the container where the server keeps
+        its data. The data volume is mounted here.
+
+        :rtype: str
+        :returns: the path
+        """
+        return '/data/db'
+
     def get_url(self):
         """Return the URL to connect to this container, in the correct protocol
 
@@ -36,7 +53,7 @@ class MongoContainer(BaseContainer):
         :returns: the URL as a string, like postgres://________
         """
         return 'mongodb://{name}:{password}@{hostname}:27017/{db}'.format(
-            name=self.container_info.name,
+            name=self.container_info.get_db_user(),
             password=self.password,
             hostname=self.get_docker_hostname(),
             db=self.db_name,
@@ -1,4 +1,5 @@
 from docker_addons.containers.base import BaseContainer
+from docker_addons.containers.tuning import postgres_command
 
 
 class PostgresContainer(BaseContainer):
@@ -12,7 +13,7 @@ class PostgresContainer(BaseContainer):
         :returns: dictionary representing the environment, like {"VAR1": "value1", ...}
         """
         return {
-            'POSTGRES_USER': self.container_info.name,
+            'POSTGRES_USER': self.container_info.get_db_user(),
             'POSTGRES_DB': self.db_name,
         }
 
@@ -24,6 +25,24 @@ class PostgresContainer(BaseContainer):
         """
         return 'postgres:9.5'
 
+    def get_data_path(self):
+        """Get the path inside the container where the server keeps
+        its data. The data volume is mounted here.
+
+        :rtype: str
+        :returns: the path
+        """
+        return '/var/lib/postgresql/data'
+
+    def get_command(self):
+        """Get the command to run in this container. The settings
+        are sized to the container's memory limit.
+
+        :rtype: list
+        :returns: the command, like ['postgres', '-c', 'shared_buffers=128MB', ...]
+        """
+        return postgres_command(self.get_tuning_memory())
+
     def get_url(self):
         """Return the URL to connect to this container, in the correct protocol
 
@@ -31,7 +50,7 @@ class PostgresContainer(BaseContainer):
         :returns: the URL as a string, like postgres://________
         """
         return 'postgres://{name}@{hostname}:5432/{db}'.format(
-            name=self.container_info.name,
+            name=self.container_info.get_db_user(),
             hostname=self.get_docker_hostname(),
             db=self.db_name,
         )
@@ -0,0 +1,102 @@
+"""Generate database server settings sized to a container's memory limit.
+
+The stock images tune themselves for a tiny machine (postgres) or for the
+whole docker host (mongo, which reads the host's RAM, not the container's
+limit). These helpers derive the settings from the memory limit instead.
+All sizes are in bytes.
+"""
+KB = 1024
+MB = 1024 * KB
+GB = 1024 * MB
+
+# used when a container is created without a memory limit
+DEFAULT_MEMORY_LIMIT = 512 * MB
+
+# mongod needs about 500MB besides its 1GB minimum WiredTiger cache
+MONGO_MIN_MEMORY_LIMIT = 1536 * MB
+
+# postgres default, we leave it alone and size work_mem against it
+POSTGRES_MAX_CONNECTIONS = 100
+
+
+def _format_postgres_size(num_bytes):
+    """Format a size the way postgresql.conf expects it.
+
+    :param int num_bytes:
+
+    :rtype: str
+    :returns: the size, like 128MB or 512kB
+    """
+    if num_bytes % MB == 0:
+        return '{}MB'.format(num_bytes // MB)
+    return '{}kB'.format(num_bytes // KB)
+
+
+def postgres_settings(memory_limit):
+    """Get the postgres settings for a container with this much memory.
+
+    Durability settings (fsync, synchronous_commit, full_page_writes)
+    are left at their safe defaults.
+
+    :param int memory_limit: the container's memory limit, in bytes
+
+    :rtype: dict
+    :returns: setting name to value, like {"shared_buffers": "128MB", ...}
+    """
+    # round down to whole megabytes so the output is stable and readable
+    shared_buffers = memory_limit // 4 // MB * MB
+    effective_cache_size = memory_limit * 3 // 4 // MB * MB
+    maintenance_work_mem = min(memory_limit // 16 // MB * MB, 2 * GB)
+    # each connection can use a few work_mem's worth in one query
+    work_mem = max(
+        (memory_limit - shared_buffers) // (POSTGRES_MAX_CONNECTIONS * 3) // KB * KB,
+        1 * MB)
+    wal_buffers = max(min(shared_buffers // 32, 16 * MB), 64 * KB)
+    max_wal_size = max(2 * shared_buffers, 256 * MB)
+    return {
+        'shared_buffers': _format_postgres_size(shared_buffers),
+        'effective_cache_size': _format_postgres_size(effective_cache_size),
+        'maintenance_work_mem': _format_postgres_size(maintenance_work_mem),
+        'work_mem': _format_postgres_size(work_mem),
+        'wal_buffers': _format_postgres_size(wal_buffers),
+        'max_wal_size': _format_postgres_size(max_wal_size),
+        'min_wal_size': _format_postgres_size(max_wal_size // 4),
+        'checkpoint_timeout': '15min',
+        'checkpoint_completion_target': '0.9',
+    }
+
+
+def postgres_command(memory_limit):
+    """Get the command for the postgres image, passing the settings
+    from :py:func:`postgres_settings` as ``-c`` flags.
+
+    :param int memory_limit: the container's memory limit, in bytes
+
+    :rtype: list
+    :returns: the command, like ['postgres', '-c', 'shared_buffers=128MB', ...]
+    """
+    command = ['postgres']
+    for name, value in sorted(postgres_settings(memory_limit).items()):
+        command.extend(['-c', '{}={}'.format(name, value)])
+    return command
+
+
+def mongo_wiredtiger_cache_size_gb(memory_limit):
+    """Get the WiredTiger cache size for a container with this much memory.
+
+    This follows mongo's own formula, 50% of (RAM - 1 GB), but applied to
+    the container limit. Mongo 3.2 only accepts whole gigabytes, with
+    a minimum of 1, so smaller containers would be killed for running
+    out of memory.
+
+    :param int memory_limit: the container's memory limit, in bytes
+
+    :rtype: int
+    :returns: the cache size in GB
+
+    :raises ValueError: if the limit is below MONGO_MIN_MEMORY_LIMIT
+    """
+    if memory_limit < MONGO_MIN_MEMORY_LIMIT:
+        raise ValueError('Mongo needs a memory limit of at least {}MB.'.format(
+            MONGO_MIN_MEMORY_LIMIT // MB))
+    return max((memory_limit - 1 * GB) // 2 // GB, 1)
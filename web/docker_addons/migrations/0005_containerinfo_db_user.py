@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.2 on 2026-10-19 02:22
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docker_addons', '0004_auto_20160327_1605'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='containerinfo',
+            name='db_user',
+            field=models.CharField(editable=False, max_length=50, null=True),
+        ),
+    ]
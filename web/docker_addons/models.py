@@ -28,3 +28,24 @@ class ContainerInfo(models.Model):
     # the ID assigned by docker host, will be set after the container is
     # actually created on docker host
     container_id = models.CharField(max_length=100, unique=True, null=True)
+
+    # the database user stored in the data volume. Clones keep the user of
+    # the addon they were cloned from, since it is part of the copied data
+    db_user = models.CharField(max_length=50, null=True, editable=False)
+
+    @property
+    def volume_name(self):
+        """The name of the docker volume holding this container's data.
+
+        :rtype: str
+        """
+        return '{}_data'.format(self.name)
+
+    def get_db_user(self):
+        """Get the database user to connect as.
+
+        :rtype: str
+        """
+        if self.db_user is None:
+            return self.name
+        return self.db_user
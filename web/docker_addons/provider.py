@@ -1,31 +1,109 @@
 import docker
+import logging
 
 from api_server.addons.providers.base_provider import BaseAddonProvider
-from api_server.addons.providers.exceptions import AddonProviderError
+from api_server.addons.providers.exceptions import AddonProviderConfigError, AddonProviderError, AddonProviderInvalidOperationError
 from django.conf import settings
 
+from docker_addons.containers.tuning import MONGO_MIN_MEMORY_LIMIT, MB
+from docker_addons.containers.types import AddonTypes
 from docker_addons.docker_client import create_client
 from docker_addons.models import ContainerInfo
 
 
 class DockerAddonProvider(BaseAddonProvider):
 
-    def __init__(self, container_type, config_name):
+    # the container is started in begin_provision
+    synchronous = True
+
+    def __init__(self, container_type, config_name, memory_limit=None):
         """Create a new Docker addon provider for
         the specified container type.
 
         :param docker_addons.containers.types.AddonTypes container_type: the addon type
         :param str config_name: the name of the config to store in
+        :param memory_limit: the memory limit for each container, like "2g".
+            The database server is tuned for this much memory.
+            None means no limit.
+
+        :raises api_server.addons.providers.exceptions.AddonProviderConfigError:
+            if the memory limit is too low for a mongo container
         """
+        if (container_type is AddonTypes.mongo and memory_limit is not None and
+                docker.utils.parse_bytes(memory_limit) < MONGO_MIN_MEMORY_LIMIT):
+            raise AddonProviderConfigError('Mongo addons need a memory limit of at least {}m.'.format(
+                MONGO_MIN_MEMORY_LIMIT // MB))
         self.config_name = config_name
         self.docker_client = create_client()
         self.container_type = container_type
+        self.memory_limit = memory_limit
 
     def _get_config_name(self, config_customization=None):
         if config_customization is None:
             return self.config_name
         return config_customization + '_' + self.config_name
 
+    def _get_container(self, instance):
+        return self.container_type.get_container(
+            container_info=instance,
+            docker_client=self.docker_client,
+            network_name=settings.DOCKER_NETWORK,
+            memory_limit=self.memory_limit,
+        )
+
+    def _check_clone(self, source):
+        """Check that the source container's data volume can be cloned.
+
+        :param docker_addons.models.ContainerInfo source: the container to clone
+
+        :raises api_server.addons.providers.exceptions.AddonProviderInvalidOperationError:
+            if volumes cannot be cloned, or the source has no data volume
+        :raises docker.errors.APIError:
+        """
+        if settings.DOCKER_VOLUME_CLONE_OPTION is None:
+            raise AddonProviderInvalidOperationError(
+                'Cloning is not supported, the volume driver cannot clone volumes.')
+        try:
+            self.docker_client.inspect_volume(source.volume_name)
+        except docker.errors.NotFound:
+            # addons created before data volumes were named keep their
+            # data in an anonymous volume, and cloning would give an empty copy
+            raise AddonProviderInvalidOperationError(
+                'This addon was created before cloning was supported, and cannot be cloned.')
+
+    def _clone_volume(self, source, volume_name):
+        """Create a new volume that is a copy-on-write clone of the source
+        container's data volume, using the volume driver's clone option.
+        Call :py:meth:`_check_clone` first.
+
+        Copying the files instead would pause the source database for the
+        whole copy, and this must return immediately, so it is not done.
+
+        :param docker_addons.models.ContainerInfo source: the container to clone
+        :param str volume_name: the name of the new volume
+
+        :raises docker.errors.APIError:
+        """
+        self.docker_client.create_volume(
+            name=volume_name,
+            driver=settings.DOCKER_VOLUME_DRIVER,
+            driver_opts={settings.DOCKER_VOLUME_CLONE_OPTION: source.volume_name})
+
+    def _remove_clone(self, instance):
+        """Remove what a failed clone left behind, as far as possible:
+        its container and volume on the docker host, and its row.
+
+        :param docker_addons.models.ContainerInfo instance: the new container
+        """
+        try:
+            if instance.container_id is not None:
+                self.docker_client.remove_container(instance.container_id, force=True)
+            self.docker_client.remove_volume(instance.volume_name)
+        except (docker.errors.APIError, docker.errors.DockerException):
+            logging.getLogger(__name__).exception(
+                'Could not clean up the failed clone {}'.format(instance.name))
+        instance.delete()
+
     def begin_provision(self, app_id):
         """Kick off the provision process and return a UUID
         for the new addon. This method MUST return immediately.
@@ -45,12 +123,9 @@ class DockerAddonProvider(BaseAddonProvider):
         :raises api_server.addons.providers.exceptions.AddonProviderError: If the resource cannot be allocated.
         """
         instance = ContainerInfo.objects.create()
-        container = self.container_type.get_container(
-            container_info=instance,
-            docker_client=self.docker_client,
-            network_name=settings.DOCKER_NETWORK,
-        )
+        container = self._get_container(instance)
         try:
+            container.create_volume(driver=settings.DOCKER_VOLUME_DRIVER)
             container.run_container()
         except (docker.errors.APIError, docker.errors.DockerException):
             raise AddonProviderError('Addon cannot be allocated.')
@@ -104,11 +179,7 @@ class DockerAddonProvider(BaseAddonProvider):
         except ContainerInfo.DoesNotExist:
             raise AddonProviderError(
                 'Addon with uuid {} does not exist.'.format(uuid))
-        container = self.container_type.get_container(
-            container_info=instance,
-            docker_client=self.docker_client,
-            network_name=settings.DOCKER_NETWORK,
-        )
+        container = self._get_container(instance)
         return {
             'config': {
                 self._get_config_name(config_customization=config_customization): container.get_url(),
@@ -134,11 +205,7 @@ class DockerAddonProvider(BaseAddonProvider):
         except ContainerInfo.DoesNotExist:
             raise AddonProviderError(
                 'Addon with uuid {} does not exist.'.format(uuid))
-        container = self.container_type.get_container(
-            container_info=instance,
-            docker_client=self.docker_client,
-            network_name=settings.DOCKER_NETWORK,
-        )
+        container = self._get_container(instance)
         try:
             container.stop_container()
         except (docker.errors.APIError, docker.errors.DockerException) as e:
@@ -148,3 +215,42 @@ class DockerAddonProvider(BaseAddonProvider):
                 config_name=self.config_name,
                 custom_name=self._get_config_name('<CUSTOM_NAME>'))
         }
+
+    def clone(self, uuid, app_id):
+        """Kick off the provision process for a new addon that starts out
+        with a copy of this addon's data.
+
+        :param uuid.UUID uuid: The UUID returned from :py:meth:`begin_provision`
+        :param str app_id: the ID of the app that the new addon will be for
+
+        :rtype: dict
+        :return: Same as :py:meth:`begin_provision`
+
+        :raises api_server.addons.providers.exceptions.AddonProviderInvalidOperationError:
+            If the addon cannot be cloned here.
+        :raises api_server.addons.providers.exceptions.AddonProviderError:
+            If the addon cannot be cloned.
+        """
+        try:
+            source = ContainerInfo.objects.get(uuid=uuid)
+        except ContainerInfo.DoesNotExist:
+            raise AddonProviderError(
+                'Addon with uuid {} does not exist.'.format(uuid))
+        try:
+            self._check_clone(source)
+        except (docker.errors.APIError, docker.errors.DockerException):
+            raise AddonProviderError('Addon cannot be cloned.')
+        # the clone's data has the source's database user, so it keeps
+        # using it, and anyone with access to the clone has its credentials
+        instance = ContainerInfo.objects.create(db_user=source.get_db_user())
+        container = self._get_container(instance)
+        try:
+            self._clone_volume(source, instance.volume_name)
+            container.run_container()
+        except (docker.errors.APIError, docker.errors.DockerException):
+            self._remove_clone(instance)
+            raise AddonProviderError('Addon cannot be cloned.')
+        return {
+            'message': 'Addon cloned. Please wait a while for it to become available. The URL will be stored at {} or {}.'.format(self.config_name, self._get_config_name('<CUSTOM_NAME>')),
+            'uuid': instance.uuid,
+        }
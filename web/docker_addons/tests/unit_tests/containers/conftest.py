@@ -34,6 +34,9 @@ def container(container_info, fake_docker_client, network_name):
         def get_image(self):
             return 'postgres:9.5'
 
+        def get_data_path(self):
+            return '/data'
+
         def get_url(self):
             return 'http://fake'
     return TestingContainer(container_info, fake_docker_client, network_name)
@@ -27,9 +27,34 @@ def test_run_container(container, container_info, fake_docker_client):
     assert fake_docker_client.create_container.call_count == 1
     fake_docker_client.start.assert_called_once_with(container_id)
 
+    _, kwargs = fake_docker_client.create_host_config.call_args
+    assert kwargs['binds'] == {
+        container_info.volume_name: {'bind': '/data', 'mode': 'rw'},
+    }
+
+
+@pytest.mark.django_db
+def test_run_container_memory_limit(container, fake_docker_client):
+    container.memory_limit = 512 * 1024 * 1024
+    fake_docker_client.create_container.return_value = {
+        'Id': '1234',
+    }
+
+    container.run_container()
+
+    _, kwargs = fake_docker_client.create_host_config.call_args
+    assert kwargs['mem_limit'] == 512 * 1024 * 1024
+
 
 @pytest.mark.django_db
 def test_stop_container(container, container_info, fake_docker_client):
     container_info.container_id = '123'
     container.stop_container()
     fake_docker_client.stop.assert_called_once_with('123')
+
+
+@pytest.mark.django_db
+def test_create_volume(container, container_info, fake_docker_client):
+    container.create_volume()
+    fake_docker_client.create_volume.assert_called_once_with(
+        name=container_info.volume_name, driver=None, driver_opts=None)
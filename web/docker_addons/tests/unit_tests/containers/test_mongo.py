@@ -13,3 +13,15 @@ def test_get_url(container, container_info):
     assert container.get_url() == 'mongodb://{}:default@{}:27017/mongo_db'.format(
         container_info.name,
         container.get_docker_hostname())
+
+
+@pytest.mark.django_db
+def test_get_environment_cache_size(container_info, fake_docker_client, network_name):
+    container = MongoContainer(container_info, fake_docker_client, network_name, memory_limit='9g')
+    environment = container.get_environment()
+    assert environment['STORAGE_ENGINE'] == 'wiredTiger --wiredTigerCacheSizeGB 4'
+
+
+@pytest.mark.django_db
+def test_get_environment_no_memory_limit(container):
+    assert 'STORAGE_ENGINE' not in container.get_environment()
@@ -13,3 +13,17 @@ def test_get_url(container, container_info):
     assert container.get_url() == 'postgres://{}@{}:5432/postgresdb'.format(
         container_info.name,
         container.get_docker_hostname())
+
+
+@pytest.mark.django_db
+def test_get_command(container_info, fake_docker_client, network_name):
+    container = PostgresContainer(container_info, fake_docker_client, network_name, memory_limit='1g')
+    command = container.get_command()
+    assert command[0] == 'postgres'
+    assert 'shared_buffers=256MB' in command
+    assert 'effective_cache_size=768MB' in command
+
+
+@pytest.mark.django_db
+def test_get_command_default_memory(container):
+    assert 'shared_buffers=128MB' in container.get_command()
@@ -0,0 +1,47 @@
+import pytest
+
+from docker_addons.containers.tuning import GB, MB, mongo_wiredtiger_cache_size_gb, postgres_command, postgres_settings
+
+
+def test_postgres_settings_512m():
+    result = postgres_settings(512 * MB)
+    assert result['shared_buffers'] == '128MB'
+    assert result['effective_cache_size'] == '384MB'
+    assert result['maintenance_work_mem'] == '32MB'
+    assert result['work_mem'] == '1310kB'
+    assert result['wal_buffers'] == '4MB'
+    assert result['max_wal_size'] == '256MB'
+    assert result['min_wal_size'] == '64MB'
+    assert result['checkpoint_completion_target'] == '0.9'
+
+
+def test_postgres_settings_scales_with_memory():
+    result = postgres_settings(8 * GB)
+    assert result['shared_buffers'] == '2048MB'
+    assert result['effective_cache_size'] == '6144MB'
+    assert result['maintenance_work_mem'] == '512MB'
+    assert result['work_mem'] == '20971kB'
+    assert result['wal_buffers'] == '16MB'
+    assert result['max_wal_size'] == '4096MB'
+
+
+def test_postgres_settings_caps_maintenance_work_mem():
+    assert postgres_settings(64 * GB)['maintenance_work_mem'] == '2048MB'
+
+
+def test_postgres_command():
+    command = postgres_command(512 * MB)
+    assert command[0] == 'postgres'
+    assert command[1::2] == ['-c'] * len(postgres_settings(512 * MB))
+    assert 'shared_buffers=128MB' in command
+
+
+def test_mongo_wiredtiger_cache_size_gb():
+    assert mongo_wiredtiger_cache_size_gb(1536 * MB) == 1
+    assert mongo_wiredtiger_cache_size_gb(2 * GB) == 1
+    assert mongo_wiredtiger_cache_size_gb(9 * GB) == 4
+
+
+def test_mongo_wiredtiger_cache_size_gb_too_little_memory():
+    with pytest.raises(ValueError):
+        mongo_wiredtiger_cache_size_gb(512 * MB)
@@ -11,3 +11,14 @@ def test_container_info():
         assert len(instance.name) == 50
         assert instance.name not in seen
         seen.add(instance.name)
+
+
+@pytest.mark.django_db
+def test_container_info_db_user():
+    instance = ContainerInfo.objects.create()
+    assert instance.get_db_user() == instance.name
+    assert instance.volume_name.startswith(instance.name)
+
+    clone = ContainerInfo.objects.create(db_user=instance.name)
+    assert clone.get_db_user() == instance.name
+    assert clone.volume_name != instance.volume_name
@@ -3,9 +3,10 @@ import mock
 import pytest
 import uuid
 
-from api_server.addons.providers.exceptions import AddonProviderError
+from api_server.addons.providers.exceptions import AddonProviderConfigError, AddonProviderError, AddonProviderInvalidOperationError
 
 from docker_addons.containers.base import BaseContainer
+from docker_addons.containers.types import AddonTypes
 from docker_addons.models import ContainerInfo
 from docker_addons.provider import DockerAddonProvider
 
@@ -35,10 +36,20 @@ def provider(fake_type):
     return DockerAddonProvider(fake_type, 'DATABASE_URL')
 
 
+def test_init_mongo_memory_limit():
+    DockerAddonProvider(AddonTypes.mongo, 'DATABASE_URL')
+    DockerAddonProvider(AddonTypes.mongo, 'DATABASE_URL', memory_limit='2g')
+    DockerAddonProvider(AddonTypes.postgres, 'DATABASE_URL', memory_limit='512m')
+    with pytest.raises(AddonProviderConfigError):
+        DockerAddonProvider(AddonTypes.mongo, 'DATABASE_URL', memory_limit='512m')
+
+
 @pytest.fixture(scope='function')
 def fake_container_info():
     info = mock.Mock(spec=ContainerInfo)
     info.uuid = uuid.uuid4()
+    info.name = 'name'
+    info.volume_name = 'name_data'
     return info
 
 
@@ -100,3 +111,78 @@ def test_deprovision_error(provider, fake_container_info, fake_container):
         mocked.side_effect = ContainerInfo.DoesNotExist
         with pytest.raises(AddonProviderError):
             provider.deprovision(None)
+
+
+def test_begin_provision_creates_volume(provider, fake_container_info, fake_container):
+    with mock.patch('docker_addons.provider.ContainerInfo.objects.create') as mocked:
+        mocked.return_value = fake_container_info
+        provider.begin_provision(None)
+    assert fake_container.create_volume.call_count == 1
+
+
+@pytest.mark.django_db
+def test_clone_success(provider, fake_type, container_info, settings):
+    settings.DOCKER_VOLUME_DRIVER = 'zfs'
+    settings.DOCKER_VOLUME_CLONE_OPTION = 'from'
+    new_container = mock.Mock(spec=BaseContainer)
+    fake_type.get_container.return_value = new_container
+
+    result = provider.clone(container_info.uuid, None)
+
+    assert 'message' in result
+    instance = ContainerInfo.objects.get(uuid=result['uuid'])
+    assert instance.get_db_user() == container_info.name
+    provider.docker_client.inspect_volume.assert_called_once_with(container_info.volume_name)
+    provider.docker_client.create_volume.assert_called_once_with(
+        name=instance.volume_name, driver='zfs', driver_opts={'from': container_info.volume_name})
+    new_container.run_container.assert_called_once_with()
+
+
+@pytest.mark.django_db
+def test_clone_not_supported(provider, container_info, settings):
+    settings.DOCKER_VOLUME_CLONE_OPTION = None
+    with pytest.raises(AddonProviderInvalidOperationError):
+        provider.clone(container_info.uuid, None)
+    assert provider.docker_client.create_volume.call_count == 0
+    assert ContainerInfo.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_clone_no_data_volume(provider, container_info, settings):
+    settings.DOCKER_VOLUME_CLONE_OPTION = 'from'
+    provider.docker_client.inspect_volume.side_effect = docker.errors.NotFound(
+        'not found', mock.Mock(status_code=404))
+    with pytest.raises(AddonProviderInvalidOperationError):
+        provider.clone(container_info.uuid, None)
+    assert provider.docker_client.create_volume.call_count == 0
+    assert ContainerInfo.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_clone_error(provider, fake_container, container_info, settings):
+    settings.DOCKER_VOLUME_CLONE_OPTION = 'from'
+    fake_container.run_container.side_effect = docker.errors.DockerException
+    with pytest.raises(AddonProviderError):
+        provider.clone(container_info.uuid, None)
+    # the cloned volume and the new row are removed again
+    assert ContainerInfo.objects.count() == 1
+    volume_name = provider.docker_client.create_volume.call_args[1]['name']
+    provider.docker_client.remove_volume.assert_called_once_with(volume_name)
+
+
+@pytest.mark.django_db
+def test_clone_error_cleanup_fails(provider, fake_container, container_info, settings):
+    settings.DOCKER_VOLUME_CLONE_OPTION = 'from'
+    fake_container.run_container.side_effect = docker.errors.DockerException
+    provider.docker_client.remove_volume.side_effect = docker.errors.APIError(
+        'in use', mock.Mock(status_code=409))
+    with pytest.raises(AddonProviderError):
+        provider.clone(container_info.uuid, None)
+    assert ContainerInfo.objects.count() == 1
+
+
+def test_clone_does_not_exist(provider):
+    with mock.patch('docker_addons.provider.ContainerInfo.objects.get') as mocked:
+        mocked.side_effect = ContainerInfo.DoesNotExist
+        with pytest.raises(AddonProviderError):
+            provider.clone(None, None)
@@ -89,12 +89,21 @@ CELERY_RESULT_BACKEND = os.environ.get(
 CELERY_IMPORTS = (
     'api_server.addons.tasks',
     'api_server.addons.state_machine_manager',
+    'api_server.tasks',
 )
 
 CELERY_TASK_SERIALIZER = 'json'
 
 CELERY_ACCEPT_CONTENT = ['json']
 
+# one-off commands can take long, they run on their own workers
+# (bin/run_worker.sh), the default workers (bin/worker.sh) skip them
+CELERY_ROUTES = {
+    'api_server.tasks.run_command_job': {'queue': 'run_commands'},
+}
+
+CELERYBEAT_SCHEDULE = {}
+
 # END CELERY CONFIGURATION
 
 # START PAAS CONFIGURATION
@@ -116,14 +125,123 @@ DOCKER_HOST = os.environ.get('DOCKER_HOST', 'tcp://192.168.99.100:2376')
 DOCKER_CERT_PATH = os.environ.get(
     'DOCKER_CERT_PATH', '~/.docker/machine/machines/default')
 DOCKER_NETWORK = os.environ.get('DOCKER_NETWORK', 'addons_network')
+# the memory limit of each addon container, like "2g". None means no limit.
+# Mongo addons need at least 1536m
+DOCKER_ADDON_MEMORY_LIMIT = os.environ.get('DOCKER_ADDON_MEMORY_LIMIT')
+# None means the default (local) volume driver
+DOCKER_VOLUME_DRIVER = os.environ.get('DOCKER_VOLUME_DRIVER')
+# the driver option that makes a new volume a copy-on-write clone of another,
+# if the volume driver supports it. Without it, addons cannot be cloned
+DOCKER_VOLUME_CLONE_OPTION = os.environ.get('DOCKER_VOLUME_CLONE_OPTION')
 
 # END DOCKER ADDON CONFIGURATION
 
+# START AWS DB ADDON CONFIGURATION
+
+# how often the status of pending RDS instances is refreshed, in seconds
+RDS_POLL_INTERVAL = 30
+
+# the RDS client is shared by all threads of a process, size its
+# connection pool for the number of concurrent calls
+RDS_CLIENT_MAX_POOL_CONNECTIONS = 20
+
+# connect and read timeout of RDS calls, in seconds
+RDS_CLIENT_TIMEOUT = 10
+
+if 'aws_db_addons' in INSTALLED_APPS:
+    CELERYBEAT_SCHEDULE['poll-pending-rds-instances'] = {
+        'task': 'aws_db_addons.tasks.poll_pending_instances',
+        'schedule': RDS_POLL_INTERVAL,
+    }
+
+# END AWS DB ADDON CONFIGURATION
+
 # START ADDON PROVIDER CONFIGURATION
 
 from docker_addons.containers.types import AddonTypes
 
 
+# provision is checked on with exponential backoff, starting at
+# ADDON_PROVISION_BACKOFF_BASE seconds and capped at ADDON_PROVISION_BACKOFF_MAX
+ADDON_PROVISION_BACKOFF_BASE = 1
+ADDON_PROVISION_BACKOFF_MAX = 60
+
+# addons whose provision takes longer than this (in seconds) go to the
+# error state. Providers can override it
+ADDON_PROVISION_TIMEOUT = 60 * 60
+
+# every config change is a new release of the app, so wait this many
+# seconds before setting an addon's config, and set the configs of all
+# the app's addons provisioned by then together
+ADDON_CONFIG_BATCH_WINDOW = 2
+
+# a worker claims the addons it calls the provider or backend for, and
+# others leave them alone for at most ADDON_CLAIM_TIMEOUT seconds. A
+# set_config task that finds its addon claimed checks again after
+# ADDON_CLAIM_RETRY_DELAY seconds
+ADDON_CLAIM_TIMEOUT = 10 * 60
+ADDON_CLAIM_RETRY_DELAY = 5
+
+# instead of one chain of tasks per addon, advance all addons in bulk
+# every ADDON_BULK_DRIVER_INTERVAL seconds, at most
+# ADDON_BULK_DRIVER_BATCH_SIZE addons per worker at a time
+ADDON_BULK_DRIVER = os.environ.get('ADDON_BULK_DRIVER') == 'true'
+ADDON_BULK_DRIVER_INTERVAL = 5
+ADDON_BULK_DRIVER_BATCH_SIZE = 500
+
+# addons that stay in a state with a task for longer than this (in seconds)
+# get their task started again. Provision gets ADDON_PROVISION_TIMEOUT more.
+# Not needed with the bulk driver, which looks at every addon anyways
+ADDON_RECONCILE_AFTER = 10 * 60
+
+# requests can wait up to ADDON_WAIT_MAX_TIMEOUT seconds for an addon's
+# state to change (?wait_for=ready&timeout=25). They are woken through
+# ADDON_STATE_NOTIFY_URL (redis) if set, and check the database every
+# ADDON_WAIT_POLL_INTERVAL seconds anyways. A waiting request holds one
+# of the gunicorn worker threads (bin/web.sh), not a whole worker.
+ADDON_WAIT_MAX_TIMEOUT = 25
+ADDON_WAIT_POLL_INTERVAL = 1
+ADDON_STATE_NOTIFY_URL = os.environ.get('ADDON_STATE_NOTIFY_URL')
+
+# api/v1/bulk/ takes at most BULK_MAX_OPERATIONS operations per request,
+# and runs at most BULK_MAX_WORKERS of them on the backends at a time.
+# A request holds a gunicorn worker until all of its operations are done,
+# so keep it small, the CLI sends longer lists in several requests.
+BULK_MAX_OPERATIONS = 50
+BULK_MAX_WORKERS = 8
+
+# the output of a one-off command run in the background is streamed for
+# at most RUN_STREAM_MAX_TIME seconds per request, checking for more
+# every RUN_STREAM_POLL_INTERVAL seconds. A request holds a gunicorn
+# worker, so keep it short, the CLI asks again for the rest after a pause
+RUN_STREAM_MAX_TIME = 5
+RUN_STREAM_POLL_INTERVAL = 1
+
+# a one-off command that is not done RUN_JOB_MAX_TIME seconds after it
+# started is reported as failed, so that the CLI stops waiting for it
+RUN_JOB_MAX_TIME = 60 * 60
+
+# one-off commands are deleted RUN_JOB_RETENTION seconds after they
+# started, checked every RUN_JOB_CLEANUP_INTERVAL seconds
+RUN_JOB_RETENTION = 24 * 60 * 60
+RUN_JOB_CLEANUP_INTERVAL = 60 * 60
+
+CELERYBEAT_SCHEDULE['delete-old-run-jobs'] = {
+    'task': 'api_server.tasks.delete_old_run_jobs',
+    'schedule': RUN_JOB_CLEANUP_INTERVAL,
+}
+
+if ADDON_BULK_DRIVER:
+    CELERYBEAT_SCHEDULE['advance-addons'] = {
+        'task': 'api_server.addons.tasks.advance_addons',
+        'schedule': ADDON_BULK_DRIVER_INTERVAL,
+    }
+else:
+    CELERYBEAT_SCHEDULE['reconcile-addons'] = {
+        'task': 'api_server.addons.tasks.reconcile_addons',
+        'schedule': ADDON_RECONCILE_AFTER,
+    }
+
 ADDON_PROVIDERS = {
     'secret': {
         'CLASS': 'api_server.addons.providers.secret_provider.SecretAddonProvider',
@@ -136,6 +254,7 @@ ADDON_PROVIDERS = {
         'KWARGS': {
             'container_type': AddonTypes.postgres,
             'config_name': 'DATABASE_URL',
+            'memory_limit': DOCKER_ADDON_MEMORY_LIMIT,
         },
     },
     'mongo': {
@@ -144,6 +263,7 @@ ADDON_PROVIDERS = {
         'KWARGS': {
             'container_type': AddonTypes.mongo,
             'config_name': 'DATABASE_URL',
+            'memory_limit': DOCKER_ADDON_MEMORY_LIMIT,
         },
     },
 }
@@ -167,6 +287,28 @@ CAS_EMAIL_DOMAIN = 'princeton.edu'
 
 LOGIN_URL = '/login'
 
+# WSSE secrets are cached in this redis URL, shared by all processes, for
+# WSSE_SECRET_CACHE_TIMEOUT seconds. Regenerating a secret removes it from
+# the cache. Without the URL, secrets are read from the database on every
+# request, so a regenerated secret is never accepted by another process.
+WSSE_SECRET_CACHE_URL = os.environ.get('WSSE_SECRET_CACHE_URL')
+WSSE_SECRET_CACHE_TIMEOUT = 5 * 60
+
+# WSSE tokens are rejected if their timestamp is more than this many
+# seconds off from the server's clock, or if their nonce was already used
+WSSE_MAX_AGE = 5 * 60
+
+# Nonces are remembered in memory, per process, unless this redis URL
+# is set, or while redis is down. Per process, a nonce can be replayed
+# against another gunicorn worker. The in-memory cache forgets the oldest
+# nonces when it is full.
+WSSE_NONCE_CACHE_URL = os.environ.get('WSSE_NONCE_CACHE_URL')
+WSSE_NONCE_CACHE_SIZE = 100000
+
+# Don't create a session for WSSE requests, the CLI sends a new token
+# every time instead of a session cookie
+WSSE_STATELESS = True
+
 # END AUTHENTICATION CONFIGURATION
 
 
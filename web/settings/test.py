@@ -1,3 +1,5 @@
+import dj_database_url
+
 from settings.dev import *  # NOQA
 
 ROOT_URLCONF = 'test_urls'
@@ -5,10 +7,16 @@ ROOT_URLCONF = 'test_urls'
 if 'aws_db_addons' not in INSTALLED_APPS:
     INSTALLED_APPS.append('aws_db_addons')
 
-DATABASES['default'] = {
-    'ENGINE': 'django.db.backends.sqlite3',
-    'NAME': os.path.join(BASE_DIR, 'testdb.sqlite3'),
-}
+# the query plan tests check the indexes on the database the tests run on.
+# Set TEST_DATABASE_URL to a PostgreSQL database to check the ones
+# production uses, e.g. postgres://postgres@db:5432/postgres in docker-compose
+if os.environ.get('TEST_DATABASE_URL'):
+    DATABASES['default'] = dj_database_url.parse(os.environ['TEST_DATABASE_URL'])
+else:
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'testdb.sqlite3'),
+    }
 
 PAAS_BACKENDS['test_backend'] = {
     'API_URL': 'http://fake.example.com',
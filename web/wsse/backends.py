@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.contrib.auth.models import User
 
-from wsse.utils import get_secret, verify_wsse_digest
+from wsse.nonces import get_nonce_cache
+from wsse.utils import get_ids, get_secret, verify_wsse_digest
 
 
 class WsseBackend(object):
@@ -19,11 +21,19 @@ class WsseBackend(object):
         secret = get_secret(username)
         if secret is None:
             return None
-        # TODO use the timestamp to handle stale requests
-        if not verify_wsse_digest(secret, nonce, timestamp, digest):
+        max_age = getattr(settings, 'WSSE_MAX_AGE', 300)
+        if not verify_wsse_digest(secret, nonce, timestamp, digest, max_age=max_age):
+            return None
+        # only remember nonces of valid tokens, so others cannot fill the
+        # cache. Without a max age, nonces would have to be kept forever.
+        if max_age is not None and not get_nonce_cache().add(
+                '{}:{}'.format(username.lower(), nonce)):
             return None
 
-        return User.objects.get(username__iexact=username)
+        ids = get_ids(username)
+        if ids is None:
+            return None
+        return self.get_user(ids[1])
 
     def get_user(self, user_id):
         """Retrieve the user's entry in the User model if it exists"""
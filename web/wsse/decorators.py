@@ -1,5 +1,6 @@
 from functools import wraps
 
+from django.conf import settings
 from django.contrib import auth
 from django.http import HttpResponse
 from django.utils.decorators import available_attrs
@@ -14,6 +15,10 @@ def check_wsse_token(view_func):
     If the user is already authenticated, this doesn't do anything.
 
     If the user is not successfully authenticated, this returns a HTTP 401
+
+    If the WSSE_STATELESS setting is True, the user is only attached to
+    this request, instead of being logged in. This saves creating a session
+    for clients that do not send cookies back anyway.
     """
     def create_401_response():
         response = HttpResponse('Unauthorized', status=401)
@@ -39,7 +44,10 @@ def check_wsse_token(view_func):
             username=username, digest=digest, nonce=nonce, timestamp=timestamp)
         if user is None:
             return create_401_response()
-        auth.login(request, user)
+        if getattr(settings, 'WSSE_STATELESS', False):
+            request.user = user
+        else:
+            auth.login(request, user)
         return view_func(request, *args, **kwargs)
 
     return wrapped_view
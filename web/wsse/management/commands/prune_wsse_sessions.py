@@ -0,0 +1,54 @@
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+WSSE_BACKEND = 'wsse.backends.WsseBackend'
+
+
+class Command(BaseCommand):
+    help = 'Delete the sessions created by WSSE logins, and expired sessions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Delete this many sessions per query.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count the sessions to delete.')
+
+    def handle(self, *args, **options):
+        """Before WSSE_STATELESS, every WSSE request logged in and created
+        a session that no client ever used again. Find them by the
+        authentication backend stored in the session, and delete them
+        in batches.
+        """
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+        num_expired = expired.count()
+        if not dry_run:
+            expired.delete()
+
+        num_wsse = 0
+        batch = []
+        sessions = Session.objects.filter(
+            expire_date__gte=timezone.now()).order_by('pk')
+        for session in sessions.iterator():
+            if session.get_decoded().get(BACKEND_SESSION_KEY) != WSSE_BACKEND:
+                continue
+            num_wsse += 1
+            batch.append(session.pk)
+            if len(batch) >= batch_size:
+                self._delete(batch, dry_run)
+                batch = []
+        self._delete(batch, dry_run)
+
+        self.stdout.write('{verb} {expired} expired and {wsse} WSSE sessions.\n'.format(
+            verb='Would delete' if dry_run else 'Deleted',
+            expired=num_expired,
+            wsse=num_wsse,
+        ))
+
+    def _delete(self, session_keys, dry_run):
+        if session_keys and not dry_run:
+            Session.objects.filter(pk__in=session_keys).delete()
@@ -3,9 +3,9 @@ from __future__ import unicode_literals
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 
-from wsse.utils import make_secret
+from wsse.utils import clear_cached_secret, make_secret
 
 
 class WsseProfile(models.Model):
@@ -37,3 +37,10 @@ def make_new_wsse_profile(sender, instance, created, **kwargs):
             raise e
 
 post_save.connect(make_new_wsse_profile, sender=User)
+
+
+def clear_wsse_profile_secret(sender, instance, **kwargs):
+    clear_cached_secret(instance.id)
+
+post_save.connect(clear_wsse_profile_secret, sender=WsseProfile)
+post_delete.connect(clear_wsse_profile_secret, sender=WsseProfile)
@@ -0,0 +1,138 @@
+"""Caches of recently used WSSE nonces, used to reject replayed tokens.
+
+A nonce only has to be remembered while its timestamp is still accepted,
+after that :py:func:`wsse.utils.verify_wsse_digest` rejects the token
+anyway. Both caches add and check a nonce in O(1).
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class LocalNonceCache(object):
+    """An in-memory LRU of nonces, for one process.
+
+    When the cache is full, the oldest nonce is dropped, and a token using
+    it could be replayed until its timestamp expires. Make ``max_size``
+    larger than the number of requests a process serves in ``timeout``
+    seconds.
+    """
+
+    def __init__(self, max_size, timeout):
+        """
+        :param int max_size: the maximum number of nonces to remember
+        :param int timeout: how long to remember a nonce, in seconds
+        """
+        self.max_size = max_size
+        self.timeout = timeout
+        self._expires = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, nonce):
+        """Remember a nonce.
+
+        :param str nonce:
+
+        :rtype: bool
+        :returns: False if the nonce was used in the last ``timeout`` seconds
+        """
+        now = time.time()
+        with self._lock:
+            # all nonces have the same timeout, so the oldest expire first
+            while self._expires:
+                oldest, expires = next(self._expires.iteritems())
+                if expires > now:
+                    break
+                del self._expires[oldest]
+
+            if nonce in self._expires:
+                return False
+            self._expires[nonce] = now + self.timeout
+            if len(self._expires) > self.max_size:
+                self._expires.popitem(last=False)
+            return True
+
+    def __len__(self):
+        return len(self._expires)
+
+
+class RedisNonceCache(object):
+    """Nonces shared by all processes, stored in redis with a TTL.
+
+    While redis cannot be reached, nonces are remembered in the fallback
+    cache, so requests are still served, and replays are only caught
+    within this process until redis is back.
+    """
+
+    def __init__(self, url, timeout, prefix='wsse:nonce:', fallback=None):
+        """
+        :param str url: the redis URL, like redis://localhost:6379/1
+        :param int timeout: how long to remember a nonce, in seconds
+        :param str prefix: the prefix of the redis keys
+        :param LocalNonceCache fallback: used while redis is down.
+            By default, one with room for 100000 nonces.
+        """
+        import redis
+        self.timeout = timeout
+        self.prefix = prefix
+        self.fallback = fallback or LocalNonceCache(100000, timeout)
+        self._redis = redis.StrictRedis.from_url(url)
+
+    def add(self, nonce):
+        """Remember a nonce.
+
+        :param str nonce:
+
+        :rtype: bool
+        :returns: False if the nonce was used in the last ``timeout`` seconds
+        """
+        import redis
+        try:
+            return bool(self._redis.set(
+                self.prefix + nonce, 1, ex=self.timeout, nx=True))
+        except redis.RedisError:
+            logging.getLogger(__name__).warning(
+                'Could not check the nonce in redis, using this process\'s cache.',
+                exc_info=True)
+            return self.fallback.add(nonce)
+
+
+_nonce_cache = None
+_nonce_cache_lock = threading.Lock()
+
+
+def get_nonce_cache():
+    """Get this process's nonce cache. It uses redis if
+    ``WSSE_NONCE_CACHE_URL`` is set, and memory otherwise or while
+    redis is down.
+
+    A token is accepted up to ``WSSE_MAX_AGE`` seconds before or after its
+    timestamp, so nonces are remembered for twice that long.
+
+    :rtype: LocalNonceCache or RedisNonceCache
+    """
+    global _nonce_cache
+    if _nonce_cache is None:
+        with _nonce_cache_lock:
+            if _nonce_cache is None:
+                timeout = 2 * getattr(settings, 'WSSE_MAX_AGE', 300)
+                url = getattr(settings, 'WSSE_NONCE_CACHE_URL', None)
+                local = LocalNonceCache(
+                    getattr(settings, 'WSSE_NONCE_CACHE_SIZE', 100000), timeout)
+                if url:
+                    _nonce_cache = RedisNonceCache(url, timeout, fallback=local)
+                else:
+                    _nonce_cache = local
+    return _nonce_cache
+
+
+def reset_nonce_cache():
+    """Forget the nonce cache, the next call to :py:func:`get_nonce_cache`
+    creates a new one, e.g. after the settings changed.
+    """
+    global _nonce_cache
+    with _nonce_cache_lock:
+        _nonce_cache = None
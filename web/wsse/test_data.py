@@ -4,7 +4,21 @@ valid_wsse_headers = [
         'digest': 'AD4+vZvomtVUcd7jhUAVXMpHUmD/SD2EXMvIu5kzIJQ=',
         'nonce': 'Wk5f2woTcpP5YTykn5W9mw==',
         'timestamp': '2015-05-18T14:50:17-04:00'
-    })
+    }),
+    # any order, other fields are ignored
+    ('''UsernameToken Created="2015-05-18T14:50:17-04:00",Nonce="Wk5f2woTcpP5YTykn5W9mw==", Realm="api", PasswordDigest="AD4+vZvomtVUcd7jhUAVXMpHUmD/SD2EXMvIu5kzIJQ=", Username="jdoe"''', {
+        'username': 'jdoe',
+        'digest': 'AD4+vZvomtVUcd7jhUAVXMpHUmD/SD2EXMvIu5kzIJQ=',
+        'nonce': 'Wk5f2woTcpP5YTykn5W9mw==',
+        'timestamp': '2015-05-18T14:50:17-04:00'
+    }),
+    # a value that looks like another field
+    ('''UsernameToken Username="jdoe PasswordDigest=", PasswordDigest="AD4+vZvomtVUcd7jhUAVXMpHUmD/SD2EXMvIu5kzIJQ=", Nonce="Wk5f2woTcpP5YTykn5W9mw==", Created="2015-05-18T14:50:17-04:00"''', {
+        'username': 'jdoe PasswordDigest=',
+        'digest': 'AD4+vZvomtVUcd7jhUAVXMpHUmD/SD2EXMvIu5kzIJQ=',
+        'nonce': 'Wk5f2woTcpP5YTykn5W9mw==',
+        'timestamp': '2015-05-18T14:50:17-04:00'
+    }),
 ]
 
 invalid_wsse_headers = [
@@ -15,6 +29,15 @@ invalid_wsse_headers = [
     '''UsernameToken Username="jdoe", PasswordDigest="quR/EWLAV4xLf9Zqyw4pDmfV9OY=", Created="2015-05-18T14:50:17-04:00"''',
 
     '''UsernameToken Username="jdoe", PasswordDigest="quR/EWLAV4xLf9Zqyw4pDmfV9OY=", Nonce="Wk5f2woTcpP5YTykn5W9mw=="''',
+
+    # duplicate field
+    '''UsernameToken Username="jdoe", PasswordDigest="quR/EWLAV4xLf9Zqyw4pDmfV9OY=", Nonce="Wk5f2woTcpP5YTykn5W9mw==", Created="2015-05-18T14:50:17-04:00", Username="admin"''',
+
+    # too long
+    '''UsernameToken Username="{}", PasswordDigest="quR/EWLAV4xLf9Zqyw4pDmfV9OY=", Nonce="Wk5f2woTcpP5YTykn5W9mw==", Created="2015-05-18T14:50:17-04:00"'''.format('a' * 1024),
+
+    # field names must follow a separator
+    '''UsernameToken XUsername="jdoe", PasswordDigest="quR/EWLAV4xLf9Zqyw4pDmfV9OY=", Nonce="Wk5f2woTcpP5YTykn5W9mw==", Created="2015-05-18T14:50:17-04:00"''',
 ]
 
 valid_wsse_digests = [{
@@ -1,12 +1,21 @@
 import pytest
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from django.contrib.auth.models import User
 from django.utils import crypto
 
 from wsse.utils import get_secret, wsse_digest
 
 
+def _make_wsse_header(username, created=None):
+    secret = get_secret(username)
+    nonce = crypto.get_random_string()
+    timestamp = (created or datetime.utcnow()).isoformat()
+    digest = wsse_digest(secret, nonce, timestamp)
+    return '''UsernameToken Username="{username}", PasswordDigest="{digest}", Nonce="{nonce}", Created="{timestamp}"'''.format(
+        username=username, digest=digest, nonce=nonce, timestamp=timestamp)
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize('path', [
     '/wsse_test/',
@@ -14,17 +23,32 @@ from wsse.utils import get_secret, wsse_digest
 ])
 def test_success(path, client, username, password, email):
     User.objects.create_user(username, email, password)
-    secret = get_secret(username)
-    nonce = crypto.get_random_string()
-    timestamp = datetime.utcnow().isoformat()
-    digest = wsse_digest(secret, nonce, timestamp)
-    wsse_header = '''UsernameToken Username="{username}", PasswordDigest="{digest}", Nonce="{nonce}", Created="{timestamp}"'''.format(
-        username=username, digest=digest, nonce=nonce, timestamp=timestamp)
+    wsse_header = _make_wsse_header(username)
     resp = client.get(path, HTTP_AUTHORIZATION='WSSE profile="UsernameToken"', HTTP_X_WSSE=wsse_header)
     assert resp.status_code == 200
     assert resp.content == username
 
 
+@pytest.mark.django_db
+def test_failure_replay(client, username, password, email):
+    User.objects.create_user(username, email, password)
+    wsse_header = _make_wsse_header(username)
+    resp = client.get('/wsse_test/', HTTP_AUTHORIZATION='WSSE profile="UsernameToken"', HTTP_X_WSSE=wsse_header)
+    assert resp.status_code == 200
+    client.logout()
+    resp = client.get('/wsse_test/', HTTP_AUTHORIZATION='WSSE profile="UsernameToken"', HTTP_X_WSSE=wsse_header)
+    assert resp.status_code == 401
+
+
+@pytest.mark.django_db
+def test_failure_stale(client, username, password, email, settings):
+    User.objects.create_user(username, email, password)
+    created = datetime.utcnow() - timedelta(seconds=settings.WSSE_MAX_AGE + 60)
+    wsse_header = _make_wsse_header(username, created)
+    resp = client.get('/wsse_test/', HTTP_AUTHORIZATION='WSSE profile="UsernameToken"', HTTP_X_WSSE=wsse_header)
+    assert resp.status_code == 401
+
+
 @pytest.mark.parametrize('path', [
     '/wsse_test/',
     '/wsse_class_test/',
@@ -1,7 +1,28 @@
 import pytest
 
+from django.core.cache import cache
 from django.utils import crypto
 
+from wsse import nonces, utils
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Secrets are cached by ID, and IDs are reused after the
+    test database rolls back.
+    """
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_nonce_cache():
+    nonces.reset_nonce_cache()
+
+
+@pytest.fixture(autouse=True)
+def reset_secret_cache():
+    utils.reset_secret_cache()
+
 
 @pytest.fixture(scope='function')
 def username():
@@ -0,0 +1,70 @@
+"""Benchmarks of the WSSE verification path. Run with -s to see
+the timings, and with --benchmark to check them. The limits are generous,
+they only catch large regressions.
+"""
+import base64
+import datetime
+import mock
+import pytest
+import timeit
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import crypto
+
+from wsse.backends import WsseBackend
+from wsse.nonces import LocalNonceCache
+from wsse.test_data import valid_wsse_headers
+from wsse.utils import get_secret, parse_wsse_header, wsse_digest
+
+NUMBER = 1000
+
+
+def _make_tokens(username, number):
+    secret = get_secret(username)
+    timestamp = datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+    tokens = []
+    for _ in xrange(number):
+        nonce = base64.standard_b64encode(crypto.get_random_string())
+        tokens.append({
+            'username': username,
+            'digest': wsse_digest(secret, nonce, timestamp),
+            'nonce': nonce,
+            'timestamp': timestamp,
+        })
+    return tokens
+
+
+@pytest.mark.django_db
+def test_benchmark_authenticate(check_time, username, email, password):
+    User.objects.create_user(username, email, password)
+    tokens = iter(_make_tokens(username, NUMBER))
+    backend = WsseBackend()
+
+    # loading the user is not part of verifying the token
+    with mock.patch.object(WsseBackend, 'get_user') as mock_get_user, \
+            CaptureQueriesContext(connection) as context:
+        seconds = timeit.timeit(
+            lambda: backend.authenticate(**next(tokens)), number=NUMBER)
+    assert mock_get_user.call_count == NUMBER
+    # without WSSE_SECRET_CACHE_URL, only the secret is read per token
+    assert len(context.captured_queries) == NUMBER
+    print('\nauthenticate: {:.1f} us per token'.format(seconds / NUMBER * 1e6))
+    check_time(seconds / NUMBER, 0.001)
+
+
+def test_benchmark_local_nonce_cache(check_time):
+    cache = LocalNonceCache(max_size=NUMBER * 10, timeout=600)
+    nonces = iter(str(i) for i in xrange(NUMBER * 100))
+    seconds = timeit.timeit(lambda: cache.add(next(nonces)), number=NUMBER * 100)
+    print('\nLocalNonceCache.add: {:.2f} us per nonce'.format(seconds / (NUMBER * 100) * 1e6))
+    assert len(cache) == NUMBER * 10
+    check_time(seconds / (NUMBER * 100), 0.0001)
+
+
+def test_benchmark_parse_wsse_header(check_time):
+    header = valid_wsse_headers[0][0]
+    seconds = timeit.timeit(lambda: parse_wsse_header(header), number=NUMBER * 10)
+    print('\nparse_wsse_header: {:.2f} us per header'.format(seconds / (NUMBER * 10) * 1e6))
+    check_time(seconds / (NUMBER * 10), 0.0001)
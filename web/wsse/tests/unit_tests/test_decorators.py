@@ -73,3 +73,22 @@ def test_check_wsse_token_not_authenticated(mock_request, mock_user):
     assert response.status_code == 401
     assert response[
         'WWW-Authenticate'] == 'WSSE realm="api", profile="UsernameToken"'
+
+
+def test_check_wsse_token_stateless(mock_request, mock_user, settings):
+    settings.WSSE_STATELESS = True
+    with mock.patch('django.contrib.auth.authenticate') as mock_authenticate, mock.patch('django.contrib.auth.login') as mock_login_:
+        mock_authenticate.return_value = mock_user
+        response = _dummy_view(mock_request)
+    assert response.status_code == 200
+    assert mock_request.user == mock_user
+    assert not mock_login_.called
+
+
+def test_check_wsse_token_login(mock_request, mock_user, settings):
+    settings.WSSE_STATELESS = False
+    with mock.patch('django.contrib.auth.authenticate') as mock_authenticate, mock.patch('django.contrib.auth.login', side_effect=mock_login) as mock_login_:
+        mock_authenticate.return_value = mock_user
+        response = _dummy_view(mock_request)
+    assert response.status_code == 200
+    mock_login_.assert_called_once_with(mock_request, mock_user)
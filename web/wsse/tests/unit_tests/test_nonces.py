@@ -0,0 +1,78 @@
+import mock
+import pytest
+import redis
+
+from wsse import nonces
+
+
+@pytest.yield_fixture(scope='function')
+def mock_time():
+    with mock.patch('wsse.nonces.time.time') as mocked:
+        mocked.return_value = 1000.0
+        yield mocked
+
+
+def test_local_nonce_cache_replay(mock_time):
+    cache = nonces.LocalNonceCache(max_size=10, timeout=60)
+    assert cache.add('nonce1')
+    assert cache.add('nonce2')
+    assert not cache.add('nonce1')
+
+
+def test_local_nonce_cache_expires(mock_time):
+    cache = nonces.LocalNonceCache(max_size=10, timeout=60)
+    assert cache.add('nonce1')
+    mock_time.return_value = 1059.0
+    assert not cache.add('nonce1')
+    mock_time.return_value = 1061.0
+    assert cache.add('nonce2')
+    assert len(cache) == 1
+    assert cache.add('nonce1')
+
+
+def test_local_nonce_cache_max_size(mock_time):
+    cache = nonces.LocalNonceCache(max_size=2, timeout=60)
+    assert cache.add('nonce1')
+    assert cache.add('nonce2')
+    assert cache.add('nonce3')
+    assert len(cache) == 2
+    assert not cache.add('nonce3')
+    # the oldest one was dropped
+    assert cache.add('nonce1')
+
+
+def test_redis_nonce_cache():
+    with mock.patch('redis.StrictRedis.from_url') as mock_from_url:
+        cache = nonces.RedisNonceCache('redis://localhost:6379/1', timeout=60)
+    mock_redis = mock_from_url.return_value
+    mock_redis.set.return_value = True
+    assert cache.add('nonce1')
+    mock_redis.set.assert_called_once_with('wsse:nonce:nonce1', 1, ex=60, nx=True)
+    mock_redis.set.return_value = None
+    assert not cache.add('nonce1')
+
+
+def test_redis_nonce_cache_redis_down():
+    with mock.patch('redis.StrictRedis.from_url') as mock_from_url:
+        cache = nonces.RedisNonceCache('redis://localhost:6379/1', timeout=60)
+    mock_from_url.return_value.set.side_effect = redis.ConnectionError
+    assert cache.add('nonce1')
+    assert not cache.add('nonce1')
+    assert cache.fallback.timeout == 60
+
+
+def test_get_nonce_cache_local(settings):
+    settings.WSSE_NONCE_CACHE_URL = None
+    settings.WSSE_MAX_AGE = 10
+    cache = nonces.get_nonce_cache()
+    assert isinstance(cache, nonces.LocalNonceCache)
+    assert cache.timeout == 20
+    assert nonces.get_nonce_cache() is cache
+
+
+def test_get_nonce_cache_redis(settings):
+    settings.WSSE_NONCE_CACHE_URL = 'redis://localhost:6379/1'
+    with mock.patch('redis.StrictRedis.from_url'):
+        cache = nonces.get_nonce_cache()
+    assert isinstance(cache, nonces.RedisNonceCache)
+    assert isinstance(cache.fallback, nonces.LocalNonceCache)
@@ -0,0 +1,49 @@
+import datetime
+import pytest
+
+from django.contrib.auth import BACKEND_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.six import StringIO
+
+
+def _make_session(user, backend, expire_date=None):
+    store = SessionStore()
+    store[SESSION_KEY] = str(user.pk)
+    store[BACKEND_SESSION_KEY] = backend
+    store.create()
+    if expire_date is not None:
+        Session.objects.filter(pk=store.session_key).update(expire_date=expire_date)
+    return store.session_key
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('batch_size', [1, 2, 1000])
+def test_prune_wsse_sessions(username, email, password, batch_size):
+    user = User.objects.create_user(username, email, password)
+    wsse_sessions = [_make_session(user, 'wsse.backends.WsseBackend') for _ in range(3)]
+    cas_session = _make_session(user, 'cas.backends.CASBackend')
+    expired_session = _make_session(
+        user, 'cas.backends.CASBackend', timezone.now() - datetime.timedelta(days=1))
+
+    out = StringIO()
+    call_command('prune_wsse_sessions', batch_size=batch_size, stdout=out)
+    assert out.getvalue() == 'Deleted 1 expired and 3 WSSE sessions.\n'
+    remaining = set(Session.objects.values_list('pk', flat=True))
+    assert remaining == {cas_session}
+    assert not remaining & set(wsse_sessions + [expired_session])
+
+
+@pytest.mark.django_db
+def test_prune_wsse_sessions_dry_run(username, email, password):
+    user = User.objects.create_user(username, email, password)
+    _make_session(user, 'wsse.backends.WsseBackend')
+    _make_session(user, 'cas.backends.CASBackend', timezone.now() - datetime.timedelta(days=1))
+
+    out = StringIO()
+    call_command('prune_wsse_sessions', dry_run=True, stdout=out)
+    assert out.getvalue() == 'Would delete 1 expired and 1 WSSE sessions.\n'
+    assert Session.objects.count() == 2
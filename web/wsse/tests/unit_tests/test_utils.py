@@ -1,9 +1,18 @@
+import datetime
+import mock
 import pytest
+import random
+import redis
+import string
 
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from wsse.test_data import valid_wsse_headers, invalid_wsse_headers, valid_wsse_digests
-from wsse.utils import parse_wsse_header, verify_wsse_digest, wsse_digest, get_secret, regenerate_secret
+from wsse.models import WsseProfile
+from wsse.utils import MAX_WSSE_HEADER_LENGTH, parse_wsse_header, verify_wsse_digest, wsse_digest, get_ids, get_secret, regenerate_secret, is_timestamp_fresh, make_secret
 
 
 @pytest.mark.parametrize('wsse_header,correct', valid_wsse_headers)
@@ -21,6 +30,58 @@ def test_parse_wsse_header_success_failure(wsse_header):
         parse_wsse_header(wsse_header)
 
 
+def _random_value(rand):
+    # anything but a quote
+    chars = string.ascii_letters + string.digits + ' =,+/:-_'
+    return ''.join(rand.choice(chars) for _ in range(rand.randint(0, 40)))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_parse_wsse_header_fuzz(seed):
+    rand = random.Random(seed)
+    for _ in range(50):
+        correct = {name: _random_value(rand) for name in ['Username', 'PasswordDigest', 'Nonce', 'Created']}
+        fields = list(correct.items())
+        fields += [('Extra{}'.format(i), _random_value(rand)) for i in range(rand.randint(0, 3))]
+        rand.shuffle(fields)
+        separators = [rand.choice([', ', ',', ' ', ',  ']) for _ in fields]
+        header = rand.choice(['UsernameToken ', '']) + ''.join(
+            '{}{}="{}"'.format(sep if i else '', name, value) for i, ((name, value), sep) in enumerate(zip(fields, separators)))
+        assert parse_wsse_header(header) == (
+            correct['Username'], correct['PasswordDigest'], correct['Nonce'], correct['Created'])
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_parse_wsse_header_fuzz_garbage(seed):
+    rand = random.Random(seed)
+    header = valid_wsse_headers[0][0]
+    for _ in range(200):
+        chars = list(header)
+        for _ in range(rand.randint(1, 10)):
+            i = rand.randrange(len(chars))
+            op = rand.choice(['delete', 'insert', 'replace'])
+            if op == 'delete':
+                del chars[i]
+            elif op == 'insert':
+                chars.insert(i, rand.choice(string.printable))
+            else:
+                chars[i] = rand.choice(string.printable)
+        try:
+            result = parse_wsse_header(''.join(chars))
+        except ValueError:
+            continue
+        assert len(result) == 4
+        assert all('"' not in field for field in result)
+
+
+def test_parse_wsse_header_max_length():
+    header = valid_wsse_headers[0][0]
+    padded = header + ' ' * (MAX_WSSE_HEADER_LENGTH - len(header))
+    assert parse_wsse_header(padded) == parse_wsse_header(header)
+    with pytest.raises(ValueError):
+        parse_wsse_header(padded + ' ')
+
+
 @pytest.mark.parametrize('data', valid_wsse_digests)
 def test_wsse_digest(data):
     digest = wsse_digest(data['secret'], data['nonce'], data['timestamp'])
@@ -53,3 +114,113 @@ def test_regenerate_secret(username, email, password):
     regenerate_secret(username)
     secret2 = get_secret(username)
     assert secret1 != secret2
+
+
+@pytest.mark.django_db
+def test_get_secret_not_cached(settings, username, email, password):
+    settings.WSSE_SECRET_CACHE_URL = None
+    User.objects.create_user(username, email, password)
+    secret1 = get_secret(username)
+    # as if another process regenerated the secret, the signal
+    # cannot clear anything in this process
+    WsseProfile.objects.filter(user__username=username).update(
+        secret=make_secret())
+    with CaptureQueriesContext(connection) as context:
+        secret2 = get_secret(username.upper())
+    assert secret1 != secret2
+    assert len(context.captured_queries) == 1
+
+
+@pytest.mark.django_db
+def test_get_secret_cached(settings, username, email, password):
+    settings.WSSE_SECRET_CACHE_URL = 'redis://localhost:6379/1'
+    with mock.patch('redis.StrictRedis.from_url') as mock_from_url:
+        mock_redis = mock_from_url.return_value
+        mock_redis.get.return_value = None
+        User.objects.create_user(username, email, password)
+        secret1 = get_secret(username)
+        key, secret = mock_redis.set.call_args[0]
+        assert secret == secret1
+        assert mock_redis.set.call_args[1] == {'ex': 300}
+
+        mock_redis.get.return_value = secret1
+        with CaptureQueriesContext(connection) as context:
+            secret2 = get_secret(username.upper())
+        assert secret1 == secret2
+        assert len(context.captured_queries) == 0
+
+        regenerate_secret(username)
+        mock_redis.delete.assert_called_with(key)
+
+
+@pytest.mark.django_db
+def test_get_secret_redis_down(settings, username, email, password):
+    settings.WSSE_SECRET_CACHE_URL = 'redis://localhost:6379/1'
+    with mock.patch('redis.StrictRedis.from_url') as mock_from_url:
+        mock_redis = mock_from_url.return_value
+        mock_redis.get.side_effect = redis.ConnectionError
+        mock_redis.set.side_effect = redis.ConnectionError
+        mock_redis.delete.side_effect = redis.ConnectionError
+        # saving the profile still works
+        User.objects.create_user(username, email, password)
+        secret1 = get_secret(username)
+        regenerate_secret(username)
+        secret2 = get_secret(username)
+    assert secret1 is not None
+    assert secret1 != secret2
+    assert mock_redis.set.call_count == 0
+
+
+@pytest.mark.django_db
+def test_get_secret_redis_set_fails(settings, username, email, password):
+    settings.WSSE_SECRET_CACHE_URL = 'redis://localhost:6379/1'
+    with mock.patch('redis.StrictRedis.from_url') as mock_from_url:
+        mock_redis = mock_from_url.return_value
+        mock_redis.get.return_value = None
+        mock_redis.set.side_effect = redis.ConnectionError
+        User.objects.create_user(username, email, password)
+        assert get_secret(username) is not None
+
+
+@pytest.mark.django_db
+def test_get_secret_user_deleted(username, email, password):
+    user = User.objects.create_user(username, email, password)
+    get_secret(username)
+    user.delete()
+    assert get_secret(username) is None
+
+
+@pytest.mark.django_db
+def test_get_ids(username, email, password):
+    user = User.objects.create_user(username, email, password)
+    assert get_ids(username) == (user.wsseprofile.id, user.id)
+    assert get_ids('doesnotexist') is None
+
+
+@pytest.mark.parametrize('timestamp,fresh', [
+    ('2016-05-01T12:00:00Z', True),
+    ('2016-05-01T08:04:00-04:00', True),
+    ('2016-05-01T12:00:00', True),
+    ('2016-05-01T11:55:00Z', True),
+    ('2016-05-01T11:54:59Z', False),
+    ('2016-05-01T12:05:01Z', False),
+    ('2016-05-01', False),
+    ('2016-13-01T12:00:00Z', False),
+    ('not a timestamp', False),
+])
+def test_is_timestamp_fresh(timestamp, fresh):
+    now = datetime.datetime(2016, 5, 1, 12, 0, 0, tzinfo=timezone.utc)
+    with mock.patch('wsse.utils.timezone.now', return_value=now):
+        assert is_timestamp_fresh(timestamp, 300) == fresh
+
+
+@pytest.mark.parametrize('data', valid_wsse_digests)
+def test_verify_wsse_digest_max_age(data):
+    assert not verify_wsse_digest(data['secret'], data['nonce'], data[
+                                  'timestamp'], data['digest'], max_age=300)
+
+
+@pytest.mark.parametrize('data', valid_wsse_digests)
+def test_verify_wsse_digest_wrong_digest(data):
+    assert not verify_wsse_digest(data['secret'], data['nonce'], data[
+                                  'timestamp'], data['digest'][:-2])
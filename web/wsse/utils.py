@@ -1,17 +1,45 @@
 import base64
 import hashlib
+import logging
+import re
+import threading
 
+from django.conf import settings
+from django.core.cache import cache
 from django.core.signing import Signer
-from django.utils import crypto
+from django.utils import crypto, timezone
+from django.utils.dateparse import parse_datetime
 
 
 def make_secret():
     return crypto.get_random_string(length=50)
 
 
+# longer headers are rejected without being parsed
+MAX_WSSE_HEADER_LENGTH = 1024
+
+# the position of each field in the result of parse_wsse_header
+_wsse_fields = {
+    'Username': 0,
+    'PasswordDigest': 1,
+    'Nonce': 2,
+    'Created': 3,
+}
+
+# the header as the CLI sends it, matched in one go
+_wsse_header_regexp = re.compile(
+    r'^(?:UsernameToken )?Username="([^"]*)", PasswordDigest="([^"]*)", Nonce="([^"]*)", Created="([^"]*)"\Z')
+
+# a name="value" pair. A name must follow a separator, and values are
+# consumed whole, so a value that looks like another field is not one
+_wsse_field_regexp = re.compile(r'(?:^|[\s,])(\w+)="([^"]*)"')
+
+
 def parse_wsse_header(wsse_header):
     """Take a wsse header and parses it, returning a tuple of username,
-    password digest, nonce, and timestamp.
+    password digest, nonce, and timestamp. Headers in the usual field order
+    are matched by one regex, others are scanned once, and fields other
+    than these four are ignored.
 
     :param str wsse_header:
 
@@ -19,16 +47,27 @@ def parse_wsse_header(wsse_header):
     :returns: (username, digest, nonce, timestamp) - all str
 
     :raises ValueError:
-        if the header is not in a valid format
+        if the header is not in a valid format, is longer than
+        MAX_WSSE_HEADER_LENGTH, or has a field twice
     """
-    try:
-        username = wsse_header.split('Username="')[1].split('"')[0]
-        digest = wsse_header.split('PasswordDigest="')[1].split('"')[0]
-        nonce = wsse_header.split('Nonce="')[1].split('"')[0]
-        timestamp = wsse_header.split('Created="')[1].split('"')[0]
-    except IndexError:
-        raise ValueError
-    return username, digest, nonce, timestamp
+    if len(wsse_header) > MAX_WSSE_HEADER_LENGTH:
+        raise ValueError('WSSE header too long')
+    match = _wsse_header_regexp.match(wsse_header)
+    if match is not None:
+        return match.groups()
+
+    # other clients may order the fields differently, or add others
+    fields = [None] * 4
+    for match in _wsse_field_regexp.finditer(wsse_header):
+        index = _wsse_fields.get(match.group(1))
+        if index is None:
+            continue
+        if fields[index] is not None:
+            raise ValueError('Duplicate WSSE field {}'.format(match.group(1)))
+        fields[index] = match.group(2)
+    if None in fields:
+        raise ValueError('Missing WSSE field')
+    return tuple(fields)
 
 
 def wsse_digest(secret, b64_encoded_nonce, timestamp):
@@ -40,6 +79,28 @@ def wsse_digest(secret, b64_encoded_nonce, timestamp):
     return base64.standard_b64encode(digest)
 
 
+def is_timestamp_fresh(timestamp, max_age):
+    """Check that an ISO 8601 timestamp is at most max_age seconds
+    away from now, in either direction, to allow for clock skew.
+    A timestamp without a time zone is taken to be UTC.
+
+    :param str timestamp: like 2015-05-18T14:50:17Z
+    :param int max_age: time in seconds
+
+    :rtype: bool
+    :returns: False if the timestamp is too old, too new, or invalid
+    """
+    try:
+        created = parse_datetime(timestamp)
+    except ValueError:
+        return False
+    if created is None:
+        return False
+    if timezone.is_naive(created):
+        created = timezone.make_aware(created, timezone.utc)
+    return abs((timezone.now() - created).total_seconds()) <= max_age
+
+
 def verify_wsse_digest(secret, b64_encoded_nonce, timestamp, digest, max_age=None):
     """Verify the WSSE digest, which means to check the output
     of the digest and to verify that the timestamp is within max_age.
@@ -54,15 +115,82 @@ def verify_wsse_digest(secret, b64_encoded_nonce, timestamp, digest, max_age=Non
     :rtype: bool
     :returns: True if the WSSE digest is valid
     """
-    if max_age is not None:
-        # TODO verify max age
-        pass
+    if max_age is not None and not is_timestamp_fresh(timestamp, max_age):
+        return False
     correct_digest = wsse_digest(secret, b64_encoded_nonce, timestamp)
-    return correct_digest == digest
+    return crypto.constant_time_compare(correct_digest, digest)
+
+
+def _ids_cache_key(username):
+    return 'wsse:ids:{}'.format(username.lower())
+
+
+def _secret_cache_key(profile_id):
+    return 'wsse:secret:{}'.format(profile_id)
+
+
+def _get_cache_timeout():
+    return getattr(settings, 'WSSE_SECRET_CACHE_TIMEOUT', 300)
+
+
+def get_ids(username):
+    """Get the WSSE profile ID and user ID for this user. The result
+    is cached, so usually this does not query the database.
+
+    :param str username: str
+
+    :rtype: tuple
+    :returns: (profile ID, user ID), or None if the user does not exist.
+    """
+    from wsse.models import WsseProfile
+    ids = cache.get(_ids_cache_key(username))
+    if ids is None:
+        try:
+            profile = WsseProfile.objects.only('id', 'user_id').get(
+                user__username__iexact=username)
+        except WsseProfile.DoesNotExist:
+            return None
+        ids = (profile.id, profile.user_id)
+        cache.set(_ids_cache_key(username), ids, _get_cache_timeout())
+    return ids
+
+
+_secret_cache = None
+_secret_cache_lock = threading.Lock()
+
+
+def _get_secret_cache():
+    """Get the redis client secrets are cached in, if
+    ``WSSE_SECRET_CACHE_URL`` is set. Secrets are never cached per process,
+    otherwise other processes would keep accepting a regenerated secret.
+
+    :rtype: redis.StrictRedis
+    :returns: the client, or None if secrets are not cached
+    """
+    global _secret_cache
+    url = getattr(settings, 'WSSE_SECRET_CACHE_URL', None)
+    if not url:
+        return None
+    if _secret_cache is None:
+        with _secret_cache_lock:
+            if _secret_cache is None:
+                import redis
+                _secret_cache = redis.StrictRedis.from_url(url)
+    return _secret_cache
+
+
+def reset_secret_cache():
+    """Forget the redis client, e.g. after the settings changed.
+    """
+    global _secret_cache
+    with _secret_cache_lock:
+        _secret_cache = None
 
 
 def get_secret(username):
-    """Get the secret for this user.
+    """Get the secret for this user. If ``WSSE_SECRET_CACHE_URL`` is set,
+    the secret is cached there by profile ID, so usually this does not
+    query the database.
 
     :param str username: str
 
@@ -70,12 +198,57 @@ def get_secret(username):
     :returns: a base64 encoded string, or None if the user does not exist.
     """
     from wsse.models import WsseProfile
+    ids = get_ids(username)
+    if ids is None:
+        return None
+    profile_id = ids[0]
+    secret_cache = _get_secret_cache()
+    if secret_cache is not None:
+        import redis
+        try:
+            secret = secret_cache.get(_secret_cache_key(profile_id))
+        except redis.RedisError:
+            # authenticate from the database while redis is down
+            logging.getLogger(__name__).warning(
+                'Could not get the cached WSSE secret.', exc_info=True)
+            secret_cache = None
+        else:
+            if secret is not None:
+                return secret
     try:
-        profile = WsseProfile.objects.get(user__username__iexact=username)
+        profile = WsseProfile.objects.only('secret').get(pk=profile_id)
     except WsseProfile.DoesNotExist:
+        # the user was deleted after the IDs were cached
+        cache.delete(_ids_cache_key(username))
         return None
     signer = Signer()
-    return base64.standard_b64encode(signer.sign(profile.secret))
+    secret = base64.standard_b64encode(signer.sign(profile.secret))
+    if secret_cache is not None:
+        try:
+            secret_cache.set(_secret_cache_key(profile_id), secret,
+                             ex=_get_cache_timeout())
+        except redis.RedisError:
+            logging.getLogger(__name__).warning(
+                'Could not cache the WSSE secret.', exc_info=True)
+    return secret
+
+
+def clear_cached_secret(profile_id):
+    """Remove a secret from the cache, e.g. after it changed.
+
+    :param int profile_id: the WSSE profile ID
+    """
+    secret_cache = _get_secret_cache()
+    if secret_cache is not None:
+        import redis
+        try:
+            secret_cache.delete(_secret_cache_key(profile_id))
+        except redis.RedisError:
+            # don't fail saving the new secret. The old one is accepted
+            # until it expires from the cache, or redis comes back empty
+            logging.getLogger(__name__).error(
+                'Could not remove the WSSE secret of profile {} from the cache.'.format(profile_id),
+                exc_info=True)
 
 
 def regenerate_secret(username):